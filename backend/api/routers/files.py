@@ -39,8 +39,11 @@ def update_custom_data(data: dict):
     # ✅ FIX: Only restart if it is ALREADY running
     sim_status = SimulatorManager.status()
     if sim_status.get("running"):
-        SimulatorManager.restart()
-        msg = "Simulator restarted with new data"
+        msg = {
+            "applied": "Simulator updated with new data",
+            "pending": "Data saved; the simulator is still loading or applying it",
+            "restarted": "Simulator restarted with new data",
+        }[SimulatorManager.apply("custom_data")]
     else:
         msg = "Data saved (Simulator is currently stopped)"
 
@@ -0,0 +1,84 @@
+import json
+import time
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from services.timeseries import timeseries_store, downsample
+from core.config import settings
+
+router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+def _json_array(values) -> str:
+    # Straight from the float64 array, no intermediate list
+    return "[" + ",".join(map(repr, values)) + "]"
+
+def _series_meta(key, buf) -> dict:
+    agent, metric, index = key
+    return {"agent": agent, "metric": metric, "index": index, "labels": buf.labels}
+
+@router.get("/series")
+def list_series(metric: Optional[str] = None, agent: Optional[str] = None, limit: int = 1000):
+    matches = timeseries_store.find(metric, agent)
+    return {
+        "count": len(matches),
+        "series": [
+            dict(_series_meta(key, buf), points=len(buf), last=buf.last_time)
+            for key, buf in matches[:limit]
+        ]
+    }
+
+@router.get("/query")
+def query_series(
+    metric: str,
+    agent: Optional[str] = None,
+    index: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    step: Optional[float] = None
+):
+    """
+    Points of every series of `metric` (optionally one agent "host:port" and
+    one index) between `since` and `until` (unix seconds; a negative `since`
+    is relative to now). Columnar: "t" and "v", or with `step` the
+    per-bucket "t", "min", "max" and "avg".
+    """
+    now = time.time()
+    until = now if until is None else until
+    if since is None:
+        since = until - timeseries_store.retention
+    elif since < 0:
+        since = now + since
+    if step is not None and step <= 0:
+        raise HTTPException(status_code=400, detail="step must be positive")
+
+    matches = timeseries_store.find(metric, agent, index)
+    if len(matches) > settings.TS_QUERY_MAX_SERIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(matches)} series match, limit is {settings.TS_QUERY_MAX_SERIES}; filter by agent or index"
+        )
+
+    # Assemble the body directly from the arrays
+    parts = []
+    for key, buf in matches:
+        times, values = buf.range(since, until)
+        meta = json.dumps(dict(_series_meta(key, buf), points=len(times)))[:-1]
+        if step:
+            t, vmin, vmax, vavg = downsample(times, values, step)
+            parts.append(f'{meta},"t":{_json_array(t)},"min":{_json_array(vmin)},'
+                         f'"max":{_json_array(vmax)},"avg":{_json_array(vavg)}}}')
+        else:
+            parts.append(f'{meta},"t":{_json_array(times)},"v":{_json_array(values)}}}')
+
+    header = json.dumps({"metric": metric, "since": since, "until": until, "step": step, "count": len(parts)})[:-1]
+    body = header + ',"series":[' + ",".join(parts) + "]}"
+    return Response(content=body, media_type="application/json")
+
+@router.get("/stats")
+def get_stats():
+    return timeseries_store.get_stats()
+
+@router.delete("/")
+def clear_history():
+    timeseries_store.clear()
+    return {"status": "cleared"}
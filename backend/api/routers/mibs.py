@@ -224,8 +224,12 @@ def reload_mibs():
         
         sim_status = SimulatorManager.status()
         if sim_status.get("running"):
-            SimulatorManager.restart()
-            sim_msg = "Simulator restarted"
+            # Recompiled inside the simulator, which keeps serving the old MIBs meanwhile
+            sim_msg = {
+                "applied": "Simulator reloaded",
+                "pending": "Simulator still loading, reload pending",
+                "restarted": "Simulator restarted",
+            }[SimulatorManager.apply("reload")]
         else:
             sim_msg = "Simulator not running"
         
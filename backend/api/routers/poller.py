@@ -0,0 +1,69 @@
+import logging
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from services.poller import poller
+from services.openmetrics import OpenMetricsWriter, CONTENT_TYPE
+
+router = APIRouter(prefix="/poller", tags=["Poller"])
+metrics_router = APIRouter(tags=["Metrics"])
+
+logger = logging.getLogger(__name__)
+
+@router.get("/status")
+def get_status():
+    return poller.get_status()
+
+@router.get("/config")
+def get_config():
+    return poller.load_config()
+
+@router.put("/config")
+async def update_config(config: dict):
+    """
+    Replace the poller config:
+    {"enabled": bool, "targets": [{"target", "port", "community", "oids": [...], "interval", "use_mibs"}]}
+    """
+    try:
+        poller.save_config(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to save poller config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # Pick up the new targets if it is already running
+    if poller.running:
+        await poller.restart()
+        msg = "Poller restarted with new config"
+    else:
+        msg = "Config saved (Poller is currently stopped)"
+
+    return {"status": "saved", "message": msg}
+
+@router.post("/start")
+async def start_poller():
+    try:
+        return await poller.start()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/stop")
+async def stop_poller():
+    return await poller.stop()
+
+@metrics_router.get("/metrics")
+def get_metrics():
+    """Latest polled values in OpenMetrics text format, for Prometheus to scrape"""
+    writer = OpenMetricsWriter()
+    for job in poller.jobs:
+        if job.rows:
+            writer.add_rows(job.rows, job.types, job.port)
+
+    for job in poller.jobs:
+        labels = {"agent_host": job.target, "agent_port": job.port, "oid": job.oid}
+        writer.add("snmp_poll_up", "gauge", "1 if the last poll of this target/OID succeeded", labels, int(job.up))
+        if job.last_duration is not None:
+            writer.add("snmp_poll_duration_seconds", "gauge", "Duration of the last poll",
+                       labels, round(job.last_duration, 6))
+
+    return Response(content=writer.render(), media_type=CONTENT_TYPE)
@@ -32,6 +32,14 @@ def start_simulator(config: SimConfig = None):
 def stop_simulator():
     return SimulatorManager.stop()
 
+@router.get("/stats")
+def get_stats():
+    """Requests answered, in total and per worker process"""
+    reply = SimulatorManager.control("stats")
+    if reply is None:
+        raise HTTPException(status_code=503, detail="Simulator is not running or not reachable")
+    return reply
+
 @router.post("/restart")
 def restart_simulator():
     return SimulatorManager.restart()
@@ -53,7 +61,7 @@ def get_custom_data():
 
 @router.post("/data")
 def update_custom_data(data: dict):
-    """Update custom data and restart simulator if running"""
+    """Update custom data and apply it to the simulator if running"""
     try:
         # Ensure directory exists
         os.makedirs(os.path.dirname(CUSTOM_DATA_FILE), exist_ok=True)
@@ -62,11 +70,14 @@ def update_custom_data(data: dict):
         with open(CUSTOM_DATA_FILE, 'w') as f:
             json.dump(data, f, indent=2)
         
-        # Restart simulator if running
+        # Apply to the running simulator, restarting it if it reports an error
         sim_status = SimulatorManager.status()
         if sim_status.get("running"):
-            SimulatorManager.restart()
-            msg = "Data saved and simulator restarted"
+            msg = {
+                "applied": "Data saved and applied to the running simulator",
+                "pending": "Data saved; the simulator is still loading or applying it",
+                "restarted": "Data saved and simulator restarted",
+            }[SimulatorManager.apply("custom_data")]
         else:
             msg = "Data saved (Simulator is currently stopped)"
         
@@ -76,3 +87,146 @@ def update_custom_data(data: dict):
     except Exception as e:
         logger.error(f"Failed to save custom data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+# ==================== Table Size Endpoints ====================
+
+@router.get("/tables")
+def get_table_config():
+    """Rows per simulated table: {"default_rows": n, "tables": {"MODULE::table": n}}"""
+    try:
+        if not os.path.exists(settings.SIM_TABLES_FILE):
+            return {"default_rows": settings.SIM_TABLE_ROWS, "tables": {}}
+
+        with open(settings.SIM_TABLES_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load table config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/tables")
+def update_table_config(data: dict):
+    """Update table row counts and apply them to the simulator if running"""
+    tables = data.get("tables", {})
+    counts = list(tables.values()) if isinstance(tables, dict) else [None]
+    if "default_rows" in data:
+        counts.append(data["default_rows"])
+    if not all(isinstance(n, int) and n >= 0 for n in counts):
+        raise HTTPException(status_code=400, detail="Row counts must be non-negative integers")
+
+    try:
+        os.makedirs(os.path.dirname(settings.SIM_TABLES_FILE), exist_ok=True)
+        with open(settings.SIM_TABLES_FILE, 'w') as f:
+            json.dump(data, f, indent=2)
+
+        sim_status = SimulatorManager.status()
+        if sim_status.get("running"):
+            msg = {
+                "applied": "Table sizes saved and applied to the running simulator",
+                "pending": "Table sizes saved; the simulator is still loading or applying them",
+                "restarted": "Table sizes saved and simulator restarted",
+            }[SimulatorManager.apply("tables")]
+        else:
+            msg = "Table sizes saved (Simulator is currently stopped)"
+
+        return {"status": "saved", "message": msg}
+
+    except Exception as e:
+        logger.error(f"Failed to save table config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ==================== Value Behavior Endpoints ====================
+
+BEHAVIOR_TYPES = ("counter", "gauge", "uptime", "replay", "static")
+
+@router.get("/behaviors")
+def get_behaviors():
+    """Dynamic value config: {"defaults": {...}, "objects": {"MODULE::object[.index]": {"type": ...}}}"""
+    try:
+        if not os.path.exists(settings.SIM_BEHAVIORS_FILE):
+            return {"defaults": {}, "objects": {}}
+
+        with open(settings.SIM_BEHAVIORS_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load value behaviors: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/behaviors")
+def update_behaviors(data: dict):
+    """Update value behaviors and apply them to the simulator if running"""
+    objects = data.get("objects", {})
+    defaults = data.get("defaults", {})
+    if not isinstance(objects, dict) or not isinstance(defaults, dict):
+        raise HTTPException(status_code=400, detail="'objects' and 'defaults' must be objects")
+    for name, spec in objects.items():
+        if not isinstance(spec, dict) or spec.get("type") not in BEHAVIOR_TYPES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{name}: type must be one of {', '.join(BEHAVIOR_TYPES)}"
+            )
+
+    try:
+        os.makedirs(os.path.dirname(settings.SIM_BEHAVIORS_FILE), exist_ok=True)
+        with open(settings.SIM_BEHAVIORS_FILE, 'w') as f:
+            json.dump(data, f, indent=2)
+
+        sim_status = SimulatorManager.status()
+        if sim_status.get("running"):
+            msg = {
+                "applied": "Behaviors saved and applied to the running simulator",
+                "pending": "Behaviors saved; the simulator is still loading or applying them",
+                "restarted": "Behaviors saved and simulator restarted",
+            }[SimulatorManager.apply("behaviors")]
+        else:
+            msg = "Behaviors saved (Simulator is currently stopped)"
+
+        return {"status": "saved", "message": msg}
+
+    except Exception as e:
+        logger.error(f"Failed to save value behaviors: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ==================== Multi-Agent Endpoints ====================
+
+@router.get("/agents")
+def get_agents_config():
+    """Extra simulated agents: {"count": n, "mode": "port" | "address" | "community", ...}"""
+    try:
+        if not os.path.exists(settings.SIM_AGENTS_FILE):
+            return {"count": 0, "mode": "port"}
+
+        with open(settings.SIM_AGENTS_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Failed to load agents config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/agents")
+def update_agents_config(data: dict):
+    """Update the agents config and restart the simulator if running"""
+    count = data.get("count", 0)
+    if not isinstance(count, int) or not 0 <= count <= settings.SIM_MAX_AGENTS:
+        raise HTTPException(status_code=400, detail=f"count must be an integer from 0 to {settings.SIM_MAX_AGENTS}")
+    if data.get("mode", "port") not in settings.SIM_AGENT_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(settings.SIM_AGENT_MODES)}")
+    if not isinstance(data.get("template", {}), dict) or not isinstance(data.get("overrides", {}), dict):
+        raise HTTPException(status_code=400, detail="'template' and 'overrides' must be objects")
+
+    try:
+        os.makedirs(os.path.dirname(settings.SIM_AGENTS_FILE), exist_ok=True)
+        with open(settings.SIM_AGENTS_FILE, 'w') as f:
+            json.dump(data, f, indent=2)
+
+        # Agents change the sockets the simulator listens on, so this needs a restart
+        sim_status = SimulatorManager.status()
+        if sim_status.get("running"):
+            SimulatorManager.restart()
+            msg = "Agents saved and simulator restarted"
+        else:
+            msg = "Agents saved (Simulator is currently stopped)"
+
+        return {"status": "saved", "message": msg}
+
+    except Exception as e:
+        logger.error(f"Failed to save agents config: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
+import asyncio
 import logging
 from pysnmp.hlapi.v3arch.asyncio import *
 from pysnmp.proto.rfc1902 import *
-from services.trap_manager import trap_manager
+from services.trap_manager import trap_manager, TrapStoreUnavailable
+from services.trap_stream import trap_broadcaster
 
 router = APIRouter(prefix="/traps", tags=["Traps"])
 logger = logging.getLogger(__name__)
@@ -109,8 +112,81 @@ def stop_receiver():
     return trap_manager.stop()
 
 @router.get("/")
-def get_received_traps(limit: int = 50): 
-    return {"data": trap_manager.get_traps(limit)}
+def get_received_traps(
+    limit: int = 50,
+    source: Optional[str] = None,
+    trap_type: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+    cursor: Optional[int] = None
+):
+    """Received traps, newest first. Pass next_cursor back as cursor for the next page."""
+    try:
+        return trap_manager.query_traps(
+            limit=limit, source=source, trap_type=trap_type,
+            since=since, until=until, cursor=cursor
+        )
+    except TrapStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+@router.get("/count")
+def count_received_traps(
+    source: Optional[str] = None,
+    trap_type: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None
+):
+    try:
+        return {"count": trap_manager.count_traps(source, trap_type, since, until)}
+    except TrapStoreUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Trap count failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/stream")
+async def stream_traps(request: Request):
+    """Server-Sent Events feed of newly received traps"""
+    try:
+        await trap_broadcaster.ensure_started()
+    except OSError as e:
+        logger.error(f"Trap stream unavailable: {e}")
+        raise HTTPException(status_code=503, detail=f"Trap stream unavailable: {e}")
+    
+    subscriber = trap_broadcaster.subscribe()
+    
+    async def event_source():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(subscriber.queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    # Keep-alive so proxies do not close an idle stream
+                    yield ": ping\n\n"
+                    continue
+                subscriber.delivered += 1
+                yield f"data: {payload}\n\n"
+        finally:
+            trap_broadcaster.unsubscribe(subscriber)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stream/stats")
+def get_stream_stats():
+    return trap_broadcaster.get_stats()
+
+@router.get("/stats")
+def get_receiver_stats():
+    """Resolution cache hit/miss/eviction, log writer and stream counters of the receiver"""
+    return {
+        "running": trap_manager.get_status()["running"],
+        "receiver": trap_manager.get_stats()
+    }
 
 @router.delete("/")
 def clear_traps(): 
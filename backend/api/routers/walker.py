@@ -1,8 +1,18 @@
+import json
+import time
+import asyncio
 import logging
 import traceback
-from fastapi import APIRouter, HTTPException
+from typing import List, Literal, Optional
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from services.walk_engine import WalkEngine
+from services.walk_engine import WalkEngine, WalkParser
+from services.snmp_walker import snmp_walker, WalkError
+from services.walk_scheduler import WalkScheduler
+from services.walk_cache import walk_cache
+from services.counter_rates import counter_rates, SYS_UPTIME_OID
 from core.config import settings
 
 router = APIRouter(prefix="/walk", tags=["Walker"])
@@ -16,42 +26,319 @@ class WalkRequest(BaseModel):
     oid: str
     parse: bool = True
     use_mibs: bool = True  # <--- Ensure this exists
+    timeout: Optional[float] = None  # seconds per request, defaults to WALK_TIMEOUT
+    retries: Optional[int] = None
+    stream: bool = False  # NDJSON, rows (or raw lines) sent while the walk runs
+    cache: Literal["use", "refresh", "bypass"] = "use"  # refresh: walk and store, bypass: no cache
+    rates: bool = False   # add per-second "rate" to counter rows from the previous walk (never cached)
 
-@router.post("/execute")
-def execute_walk(req: WalkRequest):
+class WalkTarget(BaseModel):
+    target: str
+    port: int = 1061
+    community: str = "public"
+
+class BulkWalkRequest(BaseModel):
+    targets: List[WalkTarget]
+    oids: List[str]
+    parse: bool = True
+    use_mibs: bool = True
+    timeout: Optional[float] = None
+    retries: Optional[int] = None
+    concurrency: Optional[int] = None       # defaults to WALK_BULK_CONCURRENCY
+    host_concurrency: Optional[int] = None  # per agent (host:port), defaults to WALK_HOST_CONCURRENCY
+    host_rate: Optional[float] = None       # requests/sec per agent, defaults to WALK_HOST_RATE
+    stream: bool = False                    # NDJSON, one line per result as it completes
+    rates: bool = False                     # per-second rates for counter rows, see WalkRequest
+
+async def run_walk(req: WalkRequest, throttle=None):
+    """Walk with the configured backend. Returns output lines or {"error": ...}"""
+    if settings.WALK_BACKEND == "subprocess":
+        if throttle:
+            await throttle()
+        return await run_in_threadpool(
+            WalkEngine.run_snmpwalk,
+            host=req.target,
+            port=req.port,
+            community=req.community,
+            oid=req.oid,
+            use_mibs=req.use_mibs,
+            timeout=req.timeout,
+            retries=req.retries
+        )
+
+    async def collect():
+        return [
+            line async for line in snmp_walker.walk_lines(
+                req.target, req.port, req.community, req.oid,
+                use_mibs=req.use_mibs, timeout=req.timeout, retries=req.retries,
+                throttle=throttle
+            )
+        ]
+
+    try:
+        lines = await asyncio.wait_for(collect(), timeout=settings.WALK_DEADLINE)
+    except WalkError as e:
+        return {"error": f"snmpwalk failed: {e}"}
+    except asyncio.TimeoutError:
+        return {"error": f"Walk did not finish within {settings.WALK_DEADLINE:g}s"}
+
+    logger.debug(f"received {len(lines)} varbinds from {req.target}:{req.port}")
+    return lines
+
+async def fetch_uptime(req: WalkRequest):
+    """sysUpTime of the walked agent (ticks) for restart detection, or None"""
+    if settings.WALK_BACKEND == "subprocess":
+        return None
     try:
-        # 1. Run Walk (Pass all arguments explicitly)
-        raw_lines = WalkEngine.run_snmpwalk(
-            host=req.target, 
-            port=req.port, 
-            community=req.community, 
-            oid=req.oid, 
-            use_mibs=req.use_mibs
+        value = await snmp_walker.get(
+            req.target, req.port, req.community, SYS_UPTIME_OID,
+            timeout=req.timeout, retries=req.retries
         )
-        
-        # 2. Check for Engine Errors (returned as dict)
-        if isinstance(raw_lines, dict) and "error" in raw_lines:
-            print(f"Engine Error: {raw_lines['error']}") # Log it
-            raise HTTPException(status_code=500, detail=raw_lines["error"])
-            
-        # 3. Return Raw Lines if parsing disabled
-        if not req.parse:
-            return {
-                "mode": "raw",
-                "count": len(raw_lines),
-                "data": raw_lines
-            }
-
-        # 4. Parse
-        json_result = WalkEngine.parse_output(raw_lines, req.target, req.oid)
+    except WalkError as e:
+        logger.debug(f"No sysUpTime from {req.target}:{req.port}: {e}")
+        return None
+    return int(value) if value is not None and value.__class__.__name__ == "TimeTicks" else None
+
+async def parse_lines(lines, req: WalkRequest):
+    """Parse walk output into rows (in the threadpool), with counter rates when requested"""
+    if not req.rates:
+        return await run_in_threadpool(WalkEngine.parse_output, lines, req.target, req.oid)
+
+    rows, types = await run_in_threadpool(WalkEngine.parse_rows, lines, req.target, req.oid)
+    return counter_rates.update(f"{req.target}:{req.port}", rows, types, await fetch_uptime(req))
+
+def encode_json(result) -> bytes:
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def encode_ndjson(items) -> str:
+    return "".join(json.dumps(item) + "\n" for item in items)
+
+async def stream_walk(req: WalkRequest):
+    """
+    NDJSON body for a streamed walk: one parsed row (or raw line) per line,
+    and a final {"error": ...} line if the walk fails part way. With rates,
+    parsed tables are held until the walk is done and sysUpTime is read, so
+    an agent restart during the walk resets their counter history.
+    """
+    parser = WalkParser(req.target, req.oid) if req.parse else None
+    agent = f"{req.target}:{req.port}"
+    pending = []    # finished tables waiting for the sysUpTime read after the walk
+    encode = encode_ndjson
+
+    if settings.WALK_BACKEND == "subprocess":
+        # snmpwalk output only arrives in full; stream it once it is done
+        lines = await run_walk(req)
+        if isinstance(lines, dict):
+            yield encode([lines])
+        elif parser:
+            yield await run_in_threadpool(encode, await parse_lines(lines, req))
+        else:
+            yield await run_in_threadpool(encode, lines)
+        return
+
+    if req.use_mibs:
+        await snmp_walker.load_resolver()
+
+    deadline = time.monotonic() + settings.WALK_DEADLINE
+    table = None
+    try:
+        async for oid_tuple, value in snmp_walker.walk(
+            req.target, req.port, req.community, req.oid,
+            timeout=req.timeout, retries=req.retries
+        ):
+            if time.monotonic() > deadline:
+                raise WalkError(f"Walk did not finish within {settings.WALK_DEADLINE:g}s")
+
+            line = snmp_walker.format_line(oid_tuple, value, req.use_mibs)
+            if parser is None:
+                yield encode([line])
+                continue
+
+            parsed = parser.parse_line(line)
+            if not parsed:
+                continue
+
+            # OID minus column and index: rows are complete once the walk leaves a table
+            index = parsed[2]
+            row_table = oid_tuple[:len(oid_tuple) - index.count(".") - 2]
+            if row_table != table:
+                # A finished table can be large: build and encode its rows off the loop
+                rows = await run_in_threadpool(parser.flush)
+                if rows and req.rates:
+                    pending.append(rows)
+                elif rows:
+                    yield await run_in_threadpool(encode, rows)
+                table = row_table
+
+            parser.add(*parsed)
+
+        if parser and req.rates:
+            pending.append(await run_in_threadpool(parser.flush))
+            uptime = await fetch_uptime(req)
+            types = parser.metric_types()
+            while pending:
+                rows = counter_rates.update(agent, pending.pop(0), types, uptime)
+                yield await run_in_threadpool(encode, rows)
+        elif parser:
+            rows = await run_in_threadpool(parser.flush)
+            yield await run_in_threadpool(encode, rows)
+
+    except WalkError as e:
+        error = {"error": f"snmpwalk failed: {e}"}
+    except Exception as e:
+        logger.exception(f"Streamed walk of {req.target}:{req.port} {req.oid} failed")
+        error = {"error": str(e)}
+    else:
+        return
 
+    # Tables finished before the failure, without rates: the walk has no sysUpTime to trust
+    for rows in pending:
+        yield await run_in_threadpool(encode, rows)
+    yield encode([error])
+
+async def walk_response(req: WalkRequest):
+    """Run one walk and build the /execute response body"""
+    # 1. Run Walk (Pass all arguments explicitly)
+    raw_lines = await run_walk(req)
+    
+    # 2. Check for Engine Errors (returned as dict)
+    if isinstance(raw_lines, dict) and "error" in raw_lines:
+        print(f"Engine Error: {raw_lines['error']}") # Log it
+        raise HTTPException(status_code=500, detail=raw_lines["error"])
+        
+    # 3. Return Raw Lines if parsing disabled
+    if not req.parse:
         return {
-            "mode": "parsed",
-            "count": len(json_result),
-            "data": json_result
+            "mode": "raw",
+            "count": len(raw_lines),
+            "data": raw_lines
         }
+
+    # 4. Parse
+    json_result = await parse_lines(raw_lines, req)
+
+    return {
+        "mode": "parsed",
+        "count": len(json_result),
+        "data": json_result
+    }
+
+@router.post("/execute")
+async def execute_walk(req: WalkRequest):
+    if req.stream:
+        return StreamingResponse(stream_walk(req), media_type="application/x-ndjson")
+
+    async def run():
+        # Cache the encoded body so hits skip re-serializing large results
+        result = await walk_response(req)
+        body = await run_in_threadpool(encode_json, result)
+        return body, result["count"]
+
+    try:
+        key = walk_cache.make_key(req.target, req.port, req.community, req.oid, req.use_mibs, req.parse)
+        # Rates depend on the previous walk, so they are never served from cache
+        mode = "bypass" if req.rates else req.cache
+        body, cache_status = await walk_cache.get_or_run(key, run, mode=mode)
+        return Response(content=body, media_type="application/json", headers={"X-Walk-Cache": cache_status})
         
     except Exception as e:
         # LOG THE FULL TRACEBACK so we can see it in docker logs
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/cache")
+def get_cache_stats():
+    return walk_cache.get_stats()
+
+@router.delete("/cache")
+def clear_cache():
+    walk_cache.clear()
+    return {"status": "cleared"}
+
+@router.get("/rates")
+def get_rate_stats():
+    return counter_rates.get_stats()
+
+@router.delete("/rates")
+def clear_rates():
+    counter_rates.clear()
+    return {"status": "cleared"}
+
+@router.post("/bulk")
+async def bulk_walk(req: BulkWalkRequest):
+    """Walk every target x OID concurrently, per-host limits applied"""
+    jobs = [
+        WalkRequest(
+            target=t.target, port=t.port, community=t.community, oid=oid,
+            parse=req.parse, use_mibs=req.use_mibs, timeout=req.timeout, retries=req.retries,
+            rates=req.rates
+        )
+        for t in req.targets for oid in req.oids
+    ]
+    if not jobs:
+        raise HTTPException(status_code=400, detail="At least one target and one OID are required")
+    if len(jobs) > settings.WALK_BULK_MAX_JOBS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{len(jobs)} walks requested, limit is {settings.WALK_BULK_MAX_JOBS}"
+        )
+
+    scheduler = WalkScheduler(
+        concurrency=req.concurrency or settings.WALK_BULK_CONCURRENCY,
+        host_concurrency=req.host_concurrency or settings.WALK_HOST_CONCURRENCY,
+        host_rate=settings.WALK_HOST_RATE if req.host_rate is None else req.host_rate
+    )
+
+    indexed = list(enumerate(jobs))
+    results = scheduler.run(indexed, lambda item: f"{item[1].target}:{item[1].port}", _bulk_job)
+
+    if req.stream:
+        async def ndjson():
+            async for result in results:
+                yield await run_in_threadpool(encode_ndjson, [result])
+
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+    started = time.monotonic()
+    collected = [result async for result in results]
+    collected.sort(key=lambda r: r["index"])
+
+    body = await run_in_threadpool(encode_json, {
+        "count": len(collected),
+        "failed": sum(1 for r in collected if r["status"] != "ok"),
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "results": collected
+    })
+    return Response(content=body, media_type="application/json")
+
+async def _bulk_job(item, throttle):
+    index, job = item
+    result = {
+        "index": index,
+        "target": job.target,
+        "port": job.port,
+        "oid": job.oid,
+        "started": time.time()
+    }
+    started = time.monotonic()
+
+    try:
+        lines = await run_walk(job, throttle)
+    except Exception as e:
+        logger.exception(f"Bulk walk of {job.target}:{job.port} {job.oid} failed")
+        lines = {"error": str(e)}
+
+    result["elapsed_ms"] = round((time.monotonic() - started) * 1000, 1)
+
+    if isinstance(lines, dict):
+        result.update({"status": "error", "error": lines["error"], "count": 0, "data": []})
+        return result
+
+    data = await parse_lines(lines, job) if job.parse else lines
+    result.update({
+        "status": "ok",
+        "mode": "parsed" if job.parse else "raw",
+        "count": len(data),
+        "data": data
+    })
+    return result
@@ -0,0 +1,89 @@
+"""Helpers shared by the benchmark scripts"""
+import importlib.util
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def quiet():
+    """Keep the modules' INFO logging out of the benchmark output"""
+    logging.getLogger().setLevel(logging.WARNING)
+
+def module_at(revision, path, name):
+    """
+    Import backend/<path> as it was at a git revision, to compare with the
+    current code. The module still imports its dependencies from the
+    working tree.
+    """
+    source = subprocess.run(
+        ["git", "show", f"{revision}:./{path}"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{name}_", suffix=".py")
+    with os.fdopen(fd, "w") as f:
+        f.write(source)
+    try:
+        spec = importlib.util.spec_from_file_location(name, tmp_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        os.remove(tmp_path)
+    quiet()
+    return module
+
+def baseline_revision(revision, introduced_by):
+    """
+    Revision for a --baseline option: `revision` if one was given, else the
+    parent of the oldest commit whose message contains `introduced_by`.
+    Default baselines are named by the change they predate, since commit
+    hashes do not survive a rebase.
+    """
+    if revision:
+        return revision
+    commits = subprocess.run(
+        ["git", "log", "--format=%h", "--fixed-strings", f"--grep={introduced_by}"],
+        cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+    ).stdout.split()
+    if not commits:
+        raise SystemExit(f"No commit mentions {introduced_by!r}; pass --baseline REV")
+    return f"{commits[-1]}^"
+
+# Enough of the SNMPv2 SMI sources for pysmi to resolve synthetic modules' imports
+# without fetching them; the modules loaded for them are still pysnmp's own
+SMI_STUBS = {
+    "SNMPv2-SMI": """SNMPv2-SMI DEFINITIONS ::= BEGIN
+org            OBJECT IDENTIFIER ::= { iso 3 }
+dod            OBJECT IDENTIFIER ::= { org 6 }
+internet       OBJECT IDENTIFIER ::= { dod 1 }
+private        OBJECT IDENTIFIER ::= { internet 4 }
+enterprises    OBJECT IDENTIFIER ::= { private 1 }
+Integer32 ::= INTEGER (-2147483648..2147483647)
+Counter32 ::= [APPLICATION 1] IMPLICIT INTEGER (0..4294967295)
+Gauge32 ::= [APPLICATION 2] IMPLICIT INTEGER (0..4294967295)
+END
+""",
+    "SNMPv2-TC": "SNMPv2-TC DEFINITIONS ::= BEGIN\nEND\n",
+    "SNMPv2-CONF": "SNMPv2-CONF DEFINITIONS ::= BEGIN\nEND\n",
+}
+
+def write_smi_stubs(mib_dir):
+    for name, source in SMI_STUBS.items():
+        with open(os.path.join(mib_dir, f"{name}.mib"), "w") as f:
+            f.write(source)
+
+def best_of(fn, repeat=3):
+    """Shortest wall time of `repeat` runs of fn(), in seconds, and the last result"""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
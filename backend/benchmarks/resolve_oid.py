@@ -0,0 +1,111 @@
+"""
+MibService.resolve_oid(mode="name") time per call against the number of
+loaded MIB symbols.
+
+Synthetic modules (SYNTH<k>-MIB, --objects OBJECT-TYPEs each) are written
+to a temporary MIB directory, compiled once into a temporary cache and
+resolved with and without a baseline revision. Results of the two must
+match. Minimal SNMPv2 SMI sources go alongside so they compile without
+fetching it over the network; the modules loaded for them are still pysnmp's own.
+--baseline alone compares with MibService before its reverse OID index.
+
+    python -m benchmarks.resolve_oid --modules 4 40
+    python -m benchmarks.resolve_oid --modules 4 40 --baseline
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+from benchmarks._common import baseline_revision, best_of, module_at, quiet, write_smi_stubs
+from core.config import settings
+from services import mib_service
+
+quiet()
+
+SYNTH_BASE = 88000
+BASELINE_CHANGE = "Resolve OID owners through a precomputed reverse index"
+
+def write_modules(mib_dir, count, objects):
+    write_smi_stubs(mib_dir)
+    for k in range(1, count + 1):
+        lines = [
+            f"SYNTH{k}-MIB DEFINITIONS ::= BEGIN",
+            "IMPORTS MODULE-IDENTITY, OBJECT-TYPE, Integer32, enterprises FROM SNMPv2-SMI;",
+            f"synth{k}MIB MODULE-IDENTITY",
+            '    LAST-UPDATED "202601010000Z"',
+            '    ORGANIZATION "benchmark"',
+            '    CONTACT-INFO "none"',
+            '    DESCRIPTION "Synthetic module for benchmarks.resolve_oid"',
+            f"    ::= {{ enterprises {SYNTH_BASE + k} }}",
+        ]
+        for j in range(1, objects + 1):
+            lines += [
+                f"s{k}o{j} OBJECT-TYPE",
+                "    SYNTAX Integer32",
+                "    MAX-ACCESS read-only",
+                "    STATUS current",
+                '    DESCRIPTION "x"',
+                f"    ::= {{ synth{k}MIB {j} }}",
+            ]
+        lines.append("END")
+        with open(os.path.join(mib_dir, f"SYNTH{k}-MIB.mib"), "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+def load_service(module, work_dir):
+    """A fresh MibService of `module` (a singleton class, so reset it) over the synthetic MIBs"""
+    module.MibService._instance = None
+    settings.MIB_DIR = Path(work_dir) / "mibs"
+    settings.MIB_CACHE_DIR = Path(work_dir) / "cache"
+    service = module.MibService()
+    quiet()
+    return service
+
+def sample_oids(count, objects, samples):
+    rng = random.Random(1)
+    oids = []
+    for _ in range(samples):
+        k, j = rng.randint(1, count), rng.randint(1, objects)
+        oids.append(f"1.3.6.1.4.1.{SYNTH_BASE + k}.{j}.{rng.randint(0, 99)}")
+    return oids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--modules", type=int, nargs="+", default=[4, 40])
+    parser.add_argument("--objects", type=int, default=50, help="OBJECT-TYPEs per synthetic module")
+    parser.add_argument("--samples", type=int, default=2000, help="OIDs resolved per run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", nargs="?", const="", metavar="REV",
+                        help="git revision to compare with (default: the parent of the reverse index change)")
+    args = parser.parse_args()
+
+    implementations = [("current", mib_service)]
+    if args.baseline is not None:
+        revision = baseline_revision(args.baseline, BASELINE_CHANGE)
+        implementations.append((revision, module_at(revision, "services/mib_service.py", "baseline_mib_service")))
+
+    print(f"{'implementation':<16}{'modules':>8}{'symbols':>9}{'per call':>12}")
+    for count in args.modules:
+        work_dir = tempfile.mkdtemp(prefix="resolve_oid_")
+        try:
+            os.makedirs(os.path.join(work_dir, "mibs"))
+            write_modules(os.path.join(work_dir, "mibs"), count, args.objects)
+            oids = sample_oids(count, args.objects, args.samples)
+
+            results = {}
+            for name, module in implementations:
+                service = load_service(module, work_dir)
+                symbols = sum(len(symbols) for symbols in service.mib_builder.mibSymbols.values())
+                seconds, resolved = best_of(lambda: [service.resolve_oid(oid, "name") for oid in oids], args.repeat)
+                results[name] = resolved
+                print(f"{name:<16}{count:>8}{symbols:>9}{seconds / len(oids) * 1e6:>9.1f} us")
+
+            if len(results) > 1 and len({tuple(r) for r in results.values()}) != 1:
+                print("  results differ between implementations")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Full GETNEXT walk of the simulator's MockController against store size.
+
+Each step is a read_next_variables call, the way the SNMP engine drives a
+walk, so the time per walk should grow linearly with the number of
+instances (O(log n) per GETNEXT). --baseline alone compares with the
+simulator before its GETNEXT lookup used bisect.
+
+    python -m benchmarks.simulator_getnext --sizes 50000 200000
+    python -m benchmarks.simulator_getnext --baseline --baseline-max 20000
+"""
+import argparse
+
+from benchmarks._common import baseline_revision, best_of, module_at, quiet
+from workers import snmp_simulator
+from pysnmp.proto.api import v2c
+
+quiet()
+
+BASELINE_CHANGE = "Use bisect successor lookup for simulator GETNEXT"
+
+def make_store(size, columns=10):
+    """A table of `columns` columns with size / columns rows"""
+    rows = max(size // columns, 1)
+    return {
+        (1, 3, 6, 1, 4, 1, 99999, 1, 1, column, row): v2c.Integer32(row)
+        for column in range(1, columns + 1)
+        for row in range(1, rows + 1)
+    }
+
+def walk(controller):
+    oid, steps = (1, 3, 6), 0
+    while True:
+        (next_oid, value), = controller.read_next_variables((oid, None))
+        if isinstance(value, v2c.EndOfMibView):
+            return steps
+        oid, steps = tuple(next_oid), steps + 1
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50000, 200000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", nargs="?", const="", metavar="REV",
+                        help="git revision to compare with (default: the parent of the bisect GETNEXT change)")
+    parser.add_argument("--baseline-max", type=int, default=20000,
+                        help="largest store walked with the baseline (a linear scan per GETNEXT)")
+    args = parser.parse_args()
+
+    implementations = [("current", snmp_simulator)]
+    if args.baseline is not None:
+        revision = baseline_revision(args.baseline, BASELINE_CHANGE)
+        implementations.append((revision, module_at(revision, "workers/snmp_simulator.py", "baseline_simulator")))
+
+    print(f"{'implementation':<16}{'instances':>10}{'walk':>10}{'per GETNEXT':>14}")
+    for name, module in implementations:
+        for size in args.sizes:
+            if module is not snmp_simulator and size > args.baseline_max:
+                continue
+            controller = module.MockController(make_store(size))
+            seconds, steps = best_of(lambda: walk(controller), args.repeat)
+            print(f"{name:<16}{steps:>10}{seconds:>9.2f}s{seconds / steps * 1e6:>11.1f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Trap persistence throughput.
+
+The writer benchmark appends the same trap records to traps.jsonl the way
+the receiver used to (open, append, flush and close per trap) and through
+TrapLogWriter. --end-to-end instead starts workers/trap_receiver.py,
+offers it SNMPv2c traps over UDP at each of --rates for --duration seconds
+and counts what was persisted once the log stops growing. Traps the
+receiver cannot keep up with are dropped from its socket buffer, so the
+loss column shows the sustainable rate. --baseline alone also runs the
+receiver from before the write-behind buffer.
+
+    python -m benchmarks.trap_ingest --records 200000 --fsync
+    python -m benchmarks.trap_ingest --end-to-end --baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks._common import BACKEND_DIR, baseline_revision, best_of, quiet
+from workers.trap_receiver import TrapLogWriter
+from pyasn1.codec.ber import encoder
+from pysnmp.proto.api import v2c
+
+quiet()
+
+BASELINE_CHANGE = "Batch trap log writes behind a write-behind buffer"
+
+def make_records(count):
+    records = []
+    for i in range(count):
+        records.append({
+            "timestamp": time.time(),
+            "time_str": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "source": "127.0.0.1:50000",
+            "varbinds": [
+                {"oid": "1.3.6.1.2.1.1.3.0", "name": "1.3.6.1.2.1.1.3.0", "value": str(i), "resolved": False},
+                {"oid": "1.3.6.1.6.3.1.1.4.1.0", "name": "1.3.6.1.6.3.1.1.4.1.0", "value": "1.3.6.1.6.3.1.1.5.3", "resolved": False},
+                {"oid": f"1.3.6.1.2.1.2.2.1.1.{i}", "name": f"1.3.6.1.2.1.2.2.1.1.{i}", "value": str(i), "resolved": False},
+            ],
+            "trap_type": "1.3.6.1.6.3.1.1.5.3",
+            "resolved": False
+        })
+    return records
+
+def write_per_record(path, records):
+    """The receiver's write path before TrapLogWriter"""
+    for record in records:
+        with open(path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+
+def write_batched(path, records, batch_size, fsync):
+    writer = TrapLogWriter(path, batch_size=batch_size, fsync=fsync)
+    for record in records:
+        writer.append(record)
+    writer.close()
+
+def count_lines(path):
+    try:
+        with open(path, "rb") as f:
+            return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 20), b""))
+    except FileNotFoundError:
+        return 0
+
+def bench_writer(args):
+    records = make_records(args.records)
+    work_dir = tempfile.mkdtemp(prefix="trap_ingest_")
+    path = os.path.join(work_dir, "traps.jsonl")
+
+    def run(fn, *fn_args):
+        def once():
+            if os.path.exists(path):
+                os.remove(path)
+            fn(path, records, *fn_args)
+        seconds, _ = best_of(once, args.repeat)
+        assert count_lines(path) == len(records)
+        return seconds
+
+    cases = [("per-record open/append", write_per_record, ())]
+    cases.append((f"TrapLogWriter batch={args.batch}", write_batched, (args.batch, False)))
+    if args.fsync:
+        cases.append((f"TrapLogWriter batch={args.batch} fsync", write_batched, (args.batch, True)))
+
+    print(f"{'writer':<36}{'records':>9}{'time':>10}{'traps/s':>12}")
+    try:
+        for name, fn, fn_args in cases:
+            seconds = run(fn, *fn_args)
+            print(f"{name:<36}{len(records):>9}{seconds:>9.2f}s{len(records) / seconds:>12,.0f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def make_packets(count, community="public"):
+    """Encoded SNMPv2c coldStart-style traps with distinct request ids"""
+    packets = []
+    for i in range(count):
+        pdu = v2c.SNMPv2TrapPDU()
+        v2c.apiTrapPDU.set_defaults(pdu)
+        v2c.apiPDU.set_request_id(pdu, i + 1)
+        var_binds = v2c.apiPDU.get_varbinds(pdu)
+        var_binds.append((v2c.ObjectIdentifier((1, 3, 6, 1, 2, 1, 2, 2, 1, 1, i % 1000)), v2c.Integer32(i)))
+        v2c.apiPDU.set_varbinds(pdu, var_binds)
+
+        message = v2c.Message()
+        v2c.apiMessage.set_defaults(message)
+        v2c.apiMessage.set_community(message, community)
+        v2c.apiMessage.set_pdu(message, pdu)
+        packets.append(encoder.encode(message))
+    return packets
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def send_paced(sock, port, packets, rate, duration):
+    """Send rate traps/s for duration seconds, in 10ms bursts. Returns the number sent"""
+    burst = max(1, rate // 100)
+    total = int(rate * duration)
+    started = time.monotonic()
+    sent = 0
+    while sent < total:
+        for _ in range(min(burst, total - sent)):
+            sock.sendto(packets[sent % len(packets)], ("127.0.0.1", port))
+            sent += 1
+        delay = started + sent / rate - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+    return sent
+
+def wait_quiet(path, quiet_period):
+    """Line count of path once it has not grown for quiet_period seconds"""
+    lines, last_growth = count_lines(path), time.monotonic()
+    while time.monotonic() - last_growth < quiet_period:
+        time.sleep(0.05)
+        current = count_lines(path)
+        if current != lines:
+            lines, last_growth = current, time.monotonic()
+    return lines
+
+def run_receiver(script, packets, rates, duration, quiet_period):
+    """Persisted trap count per offered rate, against one receiver process"""
+    work_dir = tempfile.mkdtemp(prefix="trap_ingest_")
+    output = os.path.join(work_dir, "traps.jsonl")
+    port = free_udp_port()
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    proc = subprocess.Popen(
+        [sys.executable, script, "--port", str(port), "--mib-path", work_dir, "--output", output,
+         "--resolve-mibs", "false"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        # Wait for the listener: probe until a trap is persisted
+        deadline = time.monotonic() + 30
+        while count_lines(output) == 0:
+            if time.monotonic() > deadline or proc.poll() is not None:
+                raise RuntimeError(f"{script} did not start")
+            sock.sendto(packets[0], ("127.0.0.1", port))
+            time.sleep(0.2)
+
+        results = []
+        persisted = wait_quiet(output, quiet_period)
+        for rate in rates:
+            sent = send_paced(sock, port, packets, rate, duration)
+            lines = wait_quiet(output, quiet_period)
+            results.append((rate, sent, lines - persisted))
+            persisted = lines
+
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(timeout=10)
+        return results
+    finally:
+        sock.close()
+        if proc.poll() is None:
+            proc.kill()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def bench_end_to_end(args):
+    packets = make_packets(1000)
+    receivers = [("current", os.path.join(BACKEND_DIR, "workers", "trap_receiver.py"))]
+
+    tmp_script = None
+    if args.baseline is not None:
+        revision = baseline_revision(args.baseline, BASELINE_CHANGE)
+        source = subprocess.run(["git", "show", f"{revision}:./workers/trap_receiver.py"],
+                                cwd=BACKEND_DIR, check=True, capture_output=True, text=True).stdout
+        fd, tmp_script = tempfile.mkstemp(prefix="baseline_trap_receiver_", suffix=".py")
+        with os.fdopen(fd, "w") as f:
+            f.write(source)
+        receivers.append((revision, tmp_script))
+
+    print(f"{'receiver':<16}{'offered/s':>10}{'sent':>9}{'persisted':>11}{'lost':>8}")
+    try:
+        for name, script in receivers:
+            for rate, sent, persisted in run_receiver(script, packets, args.rates, args.duration, args.quiet_period):
+                print(f"{name:<16}{rate:>10}{sent:>9}{persisted:>11}{(sent - persisted) / sent:>8.1%}")
+    finally:
+        if tmp_script:
+            os.remove(tmp_script)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=200000, help="records for the writer benchmark")
+    parser.add_argument("--batch", type=int, default=256, help="TrapLogWriter batch size")
+    parser.add_argument("--fsync", action="store_true", help="also time TrapLogWriter with fsync per batch")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--end-to-end", action="store_true", help="send traps to workers/trap_receiver.py instead")
+    parser.add_argument("--rates", type=int, nargs="+", default=[1000, 1500, 2000, 3000],
+                        help="offered trap rates for the end-to-end run")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds each rate is offered")
+    parser.add_argument("--quiet-period", type=float, default=2.0,
+                        help="seconds without log growth after which the receiver is considered done")
+    parser.add_argument("--baseline", nargs="?", const="", metavar="REV",
+                        help="git revision of workers/trap_receiver.py to compare with "
+                             "(default: the parent of the write-behind buffer change)")
+    args = parser.parse_args()
+
+    if args.end_to_end:
+        bench_end_to_end(args)
+    else:
+        bench_writer(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Latest-traps read (GET /api/traps without the store) against trap log size.
+
+Reads the last --limit lines of a multi-GB traps.jsonl with readlines()
+(what get_traps did before it read the log tail backwards) and with
+TrapLog.tail. Each read runs in a forked child so its peak RSS can be
+reported and readlines() on a large file cannot take the benchmark down
+with it. The file is generated in a temporary directory unless --file is
+given.
+
+    python -m benchmarks.trap_tail --size-mb 2048
+    python -m benchmarks.trap_tail --file data/traps.jsonl --skip-readlines
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+from benchmarks._common import quiet
+from services.trap_log import TrapLog
+
+quiet()
+
+def write_log(path, size_mb):
+    """A traps.jsonl of about size_mb MiB, written in 4 MiB batches of distinct records"""
+    target = size_mb * 1024 * 1024
+    written, i = 0, 0
+    with open(path, "w") as f:
+        while written < target:
+            lines = []
+            batch_bytes = 0
+            while batch_bytes < 4 * 1024 * 1024:
+                line = json.dumps({
+                    "timestamp": 1760000000.0 + i,
+                    "time_str": "2025-10-09 08:53:20",
+                    "source": f"10.0.{i % 256}.{i % 250 + 1}:162",
+                    "varbinds": [
+                        {"oid": "1.3.6.1.2.1.1.3.0", "name": "SNMPv2-MIB::sysUpTime.0", "value": str(i), "resolved": True},
+                        {"oid": "1.3.6.1.6.3.1.1.4.1.0", "name": "SNMPv2-MIB::snmpTrapOID.0", "value": "IF-MIB::linkDown", "resolved": True},
+                        {"oid": f"1.3.6.1.2.1.2.2.1.1.{i % 48}", "name": f"IF-MIB::ifIndex.{i % 48}", "value": str(i % 48), "resolved": True},
+                    ],
+                    "trap_type": "IF-MIB::linkDown",
+                    "resolved": True
+                })
+                lines.append(line)
+                batch_bytes += len(line) + 1
+                i += 1
+            f.write("\n".join(lines) + "\n")
+            written += batch_bytes
+    return i
+
+def read_readlines(path, limit):
+    with open(path, "r") as f:
+        return f.readlines()[-limit:]
+
+def read_tail(path, limit):
+    return TrapLog(path).tail(limit)
+
+def _child(fn, path, limit, repeat, results):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        lines = fn(path, limit)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    results.put((best, len(lines), lines[-1].rstrip("\n"), resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+def measure(fn, path, limit, repeat):
+    """(best seconds, lines returned, last line, peak RSS in KiB) of fn run in a forked child"""
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    child = context.Process(target=_child, args=(fn, path, limit, repeat, results))
+    child.start()
+    child.join()
+    if child.exitcode != 0:
+        raise RuntimeError(f"{fn.__name__} exited with {child.exitcode}")
+    return results.get()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=2048, help="size of the generated log")
+    parser.add_argument("--file", help="existing trap log to read instead of generating one")
+    parser.add_argument("--limits", type=int, nargs="+", default=[50, 1000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-readlines", action="store_true", help="only time TrapLog.tail")
+    args = parser.parse_args()
+
+    work_dir = None
+    path = args.file
+    if path is None:
+        work_dir = tempfile.mkdtemp(prefix="trap_tail_")
+        path = os.path.join(work_dir, "traps.jsonl")
+        started = time.perf_counter()
+        records = write_log(path, args.size_mb)
+        print(f"generated {records:,} traps ({os.path.getsize(path) / 2**20:,.0f} MiB) in {time.perf_counter() - started:.1f}s")
+
+    methods = [("TrapLog.tail", read_tail)]
+    if not args.skip_readlines:
+        methods.append(("readlines()[-limit:]", read_readlines))
+
+    print(f"{'read':<24}{'limit':>7}{'time':>12}{'peak RSS':>12}")
+    try:
+        for limit in args.limits:
+            last_lines = set()
+            for name, fn in methods:
+                seconds, count, last_line, rss_kb = measure(fn, path, limit, args.repeat)
+                assert count == limit
+                last_lines.add(last_line)
+                print(f"{name:<24}{limit:>7}{seconds * 1000:>9.2f} ms{rss_kb / 1024:>9.0f} MiB")
+            if len(last_lines) != 1:
+                print("  last lines differ between reads")
+    finally:
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Simulator value generation: one get_value call per instance against
+instances grouped by value source and filled with one batch() call each,
+as generate_data does.
+
+The workload mixes the syntaxes simulated MIBs use (integers, counters,
+gauges, TimeTicks, strings, MAC and IP addresses, OIDs, textual
+conventions derived from them). --baseline also runs the per-instance
+loop of an older MibDataGenerator, by default the one before batched
+generation, and every path must give each instance a value of the same
+type.
+
+    python -m benchmarks.value_generation --sizes 10000 100000 500000
+    python -m benchmarks.value_generation --baseline
+"""
+import argparse
+
+from benchmarks._common import baseline_revision, best_of, module_at, quiet
+from workers import snmp_simulator
+from pysnmp.proto.api import v2c
+
+quiet()
+
+BASELINE_CHANGE = "Generate simulator values in batches from per-syntax factories"
+
+# Textual conventions are classified by class name, like the MIB's own classes
+class DisplayString(v2c.OctetString): pass
+class PhysAddress(v2c.OctetString): pass
+class InterfaceIndex(v2c.Integer32): pass
+
+SYNTAXES = [
+    v2c.Integer32(), v2c.Counter32(), v2c.Counter64(), v2c.Gauge32(), DisplayString(), PhysAddress(),
+    v2c.TimeTicks(), v2c.ObjectIdentifier(), v2c.IpAddress(), v2c.Unsigned32(), InterfaceIndex()
+]
+
+def make_jobs(size):
+    return [((1, 3, 6, 1, 4, 1, 99999, i, 0), SYNTAXES[i % len(SYNTAXES)]) for i in range(size)]
+
+def per_instance(module, jobs):
+    generator = module.MibDataGenerator()
+    return {oid: generator.get_value(syntax, None) for oid, syntax in jobs}
+
+def batched(jobs):
+    generator = snmp_simulator.MibDataGenerator()
+    pending = {}
+    for oid, syntax in jobs:
+        pending.setdefault(generator.source_for(syntax), []).append(oid)
+    store = {}
+    for source, oids in pending.items():
+        store.update(zip(oids, source.batch(len(oids))))
+    return store
+
+def value_types(store):
+    return {oid: type(value) for oid, value in store.items()}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", nargs="?", const="", metavar="REV",
+                        help="git revision to compare with (default: the parent of the batched generation change)")
+    args = parser.parse_args()
+
+    paths = []
+    if args.baseline is not None:
+        revision = baseline_revision(args.baseline, BASELINE_CHANGE)
+        baseline = module_at(revision, "workers/snmp_simulator.py", "baseline_simulator")
+        paths.append((f"{revision} get_value", lambda jobs: per_instance(baseline, jobs)))
+    paths.append(("get_value", lambda jobs: per_instance(snmp_simulator, jobs)))
+    paths.append(("batched", batched))
+
+    print(f"{'path':<22}{'instances':>10}{'time':>10}{'per instance':>15}")
+    for size in args.sizes:
+        jobs = make_jobs(size)
+        expected = None
+        for name, fn in paths:
+            seconds, store = best_of(lambda: fn(jobs), args.repeat)
+            print(f"{name:<22}{size:>10}{seconds:>9.2f}s{seconds / size * 1e6:>12.2f} us")
+
+            types = value_types(store)
+            if expected is None:
+                expected = types
+            elif types != expected:
+                print(f"  {name} value types differ")
+
+if __name__ == "__main__":
+    main()
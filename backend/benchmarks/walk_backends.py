@@ -0,0 +1,192 @@
+"""
+Walk time of the in-process SnmpWalker against the snmpwalk subprocess.
+
+Both backends walk the same subtree and produce the same output lines,
+numeric (-On) and with MIB names (-Oe). Without --host a local simulator
+is started serving a synthetic table (BENCH-WALK-MIB, --rows rows of five
+columns). The subprocess backend is skipped when Net-SNMP's snmpwalk is
+not installed.
+
+    python -m benchmarks.walk_backends --rows 2000 10000
+    python -m benchmarks.walk_backends --host 192.0.2.10 --port 161 --oid IF-MIB::ifTable
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks._common import BACKEND_DIR, best_of, quiet, write_smi_stubs
+from core.config import settings
+from services.walk_engine import WalkEngine
+from pyasn1.codec.ber import encoder
+from pysnmp.proto.api import v2c
+
+quiet()
+
+BENCH_MIB = """BENCH-WALK-MIB DEFINITIONS ::= BEGIN
+IMPORTS MODULE-IDENTITY, OBJECT-TYPE, Integer32, Counter32, Gauge32, enterprises FROM SNMPv2-SMI;
+benchWalkMIB MODULE-IDENTITY
+    LAST-UPDATED "202601010000Z"
+    ORGANIZATION "benchmark"
+    CONTACT-INFO "none"
+    DESCRIPTION "Synthetic table for benchmarks.walk_backends"
+    ::= { enterprises 88999 }
+benchTable OBJECT-TYPE SYNTAX SEQUENCE OF BenchEntry MAX-ACCESS not-accessible STATUS current DESCRIPTION "t" ::= { benchWalkMIB 1 }
+benchEntry OBJECT-TYPE SYNTAX BenchEntry MAX-ACCESS not-accessible STATUS current DESCRIPTION "t" INDEX { benchIndex } ::= { benchTable 1 }
+BenchEntry ::= SEQUENCE { benchIndex Integer32, benchName OCTET STRING, benchInOctets Counter32, benchOutOctets Counter32, benchSpeed Gauge32 }
+benchIndex OBJECT-TYPE SYNTAX Integer32 (1..2147483647) MAX-ACCESS read-only STATUS current DESCRIPTION "c" ::= { benchEntry 1 }
+benchName OBJECT-TYPE SYNTAX OCTET STRING MAX-ACCESS read-only STATUS current DESCRIPTION "c" ::= { benchEntry 2 }
+benchInOctets OBJECT-TYPE SYNTAX Counter32 MAX-ACCESS read-only STATUS current DESCRIPTION "c" ::= { benchEntry 3 }
+benchOutOctets OBJECT-TYPE SYNTAX Counter32 MAX-ACCESS read-only STATUS current DESCRIPTION "c" ::= { benchEntry 4 }
+benchSpeed OBJECT-TYPE SYNTAX Gauge32 MAX-ACCESS read-only STATUS current DESCRIPTION "c" ::= { benchEntry 5 }
+END
+"""
+BENCH_OID = "1.3.6.1.4.1.88999.1"
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_simulator(work_dir, rows):
+    """Simulator serving BENCH-WALK-MIB with `rows` rows; returns (process, port)"""
+    mib_dir = os.path.join(work_dir, "mibs")
+    os.makedirs(mib_dir)
+    write_smi_stubs(mib_dir)
+    with open(os.path.join(mib_dir, "BENCH-WALK-MIB.mib"), "w") as f:
+        f.write(BENCH_MIB)
+    data_file = os.path.join(work_dir, "custom_data.json")
+    with open(data_file, "w") as f:
+        f.write("{}")
+
+    port = free_udp_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "workers", "snmp_simulator.py"), "--port", str(port),
+         "--mib-dir", mib_dir, "--data-file", data_file, "--table-rows", str(rows)],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    return proc, port
+
+class NativeWalks:
+    """
+    SnmpWalker kept on one event loop, as in the API, so its engine is
+    only set up on the first walk
+    """
+
+    def __init__(self):
+        from services.snmp_walker import SnmpWalker
+        self.walker = SnmpWalker()
+        self.loop = asyncio.new_event_loop()
+
+    async def _collect(self, host, port, community, oid, use_mibs):
+        return [line async for line in self.walker.walk_lines(host, port, community, oid, use_mibs)]
+
+    def __call__(self, host, port, community, oid, use_mibs):
+        return self.loop.run_until_complete(self._collect(host, port, community, oid, use_mibs))
+
+    async def _close_engine(self):
+        self.walker.engine.close_dispatcher()
+
+    def close(self):
+        self.loop.run_until_complete(self._close_engine())
+        self.loop.close()
+
+def walk_subprocess(host, port, community, oid, use_mibs):
+    result = WalkEngine.run_snmpwalk(host, port, community, oid, use_mibs)
+    if isinstance(result, dict):
+        raise RuntimeError(result["error"])
+    return result
+
+def get_request(community, oid=(1, 3, 6, 1, 2, 1, 1, 1, 0)):
+    """Encoded SNMPv2c GET of one object"""
+    pdu = v2c.GetRequestPDU()
+    v2c.apiPDU.set_defaults(pdu)
+    v2c.apiPDU.set_varbinds(pdu, [(v2c.ObjectIdentifier(oid), v2c.Null())])
+    message = v2c.Message()
+    v2c.apiMessage.set_defaults(message)
+    v2c.apiMessage.set_community(message, community)
+    v2c.apiMessage.set_pdu(message, pdu)
+    return encoder.encode(message)
+
+def wait_ready(host, port, community, deadline=120):
+    """Wait until the agent answers a GET, without warming up the walker"""
+    request = get_request(community)
+    started = time.monotonic()
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.settimeout(0.5)
+        while time.monotonic() - started < deadline:
+            s.sendto(request, (host, port))
+            try:
+                s.recvfrom(65535)
+                return
+            except socket.timeout:
+                pass
+    raise RuntimeError(f"agent at {host}:{port} did not answer within {deadline}s")
+
+def bench_target(host, port, community, oid, repeat, label):
+    native = NativeWalks()
+    backends = [("SnmpWalker", native)]
+    if shutil.which("snmpwalk"):
+        backends.append(("snmpwalk subprocess", walk_subprocess))
+
+    try:
+        for use_mibs in (False, True):
+            counts = set()
+            for name, fn in backends:
+                walk = lambda: fn(host, port, community, oid, use_mibs)
+                first, _ = best_of(walk, 1)
+                seconds, lines = best_of(walk, repeat)
+                counts.add(len(lines))
+                print(f"{label:<12}{name:<22}{'-Oe' if use_mibs else '-On':>5}{len(lines):>9}"
+                      f"{first:>9.2f}s{seconds:>9.2f}s{len(lines) / seconds:>12,.0f}")
+            if len(counts) != 1:
+                print("  line counts differ between backends")
+    finally:
+        native.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[2000, 10000], help="rows of the simulated table")
+    parser.add_argument("--host", help="walk this agent instead of a local simulator")
+    parser.add_argument("--port", type=int, default=161)
+    parser.add_argument("--community", default="public")
+    parser.add_argument("--oid", default=BENCH_OID)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if not shutil.which("snmpwalk"):
+        print("snmpwalk not found, timing SnmpWalker only")
+
+    print(f"{'target':<12}{'backend':<22}{'mode':>5}{'lines':>9}{'first':>10}{'best':>10}{'lines/s':>12}")
+    if args.host:
+        bench_target(args.host, args.port, args.community, args.oid, args.repeat, args.host)
+        return
+
+    for rows in args.rows:
+        work_dir = tempfile.mkdtemp(prefix="walk_backends_")
+        proc = None
+        try:
+            # Resolve names from the synthetic MIB, as the API would with it uploaded
+            settings.MIB_DIR = Path(work_dir) / "mibs"
+            settings.MIB_CACHE_DIR = Path(work_dir) / "cache"
+            proc, port = start_simulator(work_dir, rows)
+            wait_ready("127.0.0.1", port, args.community)
+            bench_target("127.0.0.1", port, args.community, args.oid, args.repeat, f"{rows} rows")
+        finally:
+            if proc is not None:
+                proc.send_signal(signal.SIGTERM)
+                try:
+                    proc.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+WalkEngine.parse_output time on a large snmpwalk -Oe output.
+
+The input is an ifTable-like walk: ten columns (strings, enumerations,
+gauges, timeticks, counters) of --rows rows each. Every --baseline
+revision's parser must give the same rows as the current one; --baseline
+without a revision is the parser before the single-pass rewrite. --stages
+also splits the current time into WalkParser.feed_lines and flush.
+
+    python -m benchmarks.walk_parser --rows 100000
+    python -m benchmarks.walk_parser --baseline --baseline main --stages
+"""
+import argparse
+import gc
+import time
+
+from benchmarks._common import baseline_revision, best_of, module_at, quiet
+from services import walk_engine
+
+quiet()
+
+BASELINE_CHANGE = "Single-pass walk output parser with cached classification"
+
+COLUMNS = [
+    ("ifDescr", 'STRING: "eth{}"'),
+    ("ifType", "INTEGER: ethernetCsmacd(6)"),
+    ("ifMtu", "INTEGER: 1500"),
+    ("ifSpeed", "Gauge32: 1000000000"),
+    ("ifPhysAddress", "STRING: 0:c:29:1:2:3"),
+    ("ifAdminStatus", "INTEGER: up(1)"),
+    ("ifOperStatus", "INTEGER: up(1)"),
+    ("ifLastChange", "Timeticks: (1234) 0:00:12.34"),
+    ("ifInOctets", "Counter32: {}"),
+    ("ifOutOctets", "Counter32: {}"),
+]
+
+def make_lines(rows):
+    # Column by column, in walk order
+    return [f"IF-MIB::{name}.{i} = {value.format(i)}" for name, value in COLUMNS for i in range(1, rows + 1)]
+
+def parse(module, lines):
+    return module.WalkEngine.parse_output(lines, "bench-host", "IF-MIB::ifTable")
+
+def timed_parse(module, lines):
+    """Row count only, so no run's output is alive (and scanned by the GC) during the next one"""
+    return len(parse(module, lines))
+
+def digest(output):
+    """Hash of parse_output rows, ignoring timestamps and int/float differences"""
+    return hash(tuple(
+        (row["metric_name"], float(row["value"]), row["mib_module"], tuple(sorted(row["labels"].items())))
+        for row in output
+    ))
+
+def stages(lines, repeat):
+    """Best feed_lines and flush times of the current WalkParser"""
+    feed_best = flush_best = None
+    for _ in range(repeat):
+        parser = walk_engine.WalkParser("bench-host", "IF-MIB::ifTable")
+        started = time.perf_counter()
+        parser.feed_lines(lines)
+        fed = time.perf_counter()
+        output = parser.flush()
+        flushed = time.perf_counter()
+        feed_best = fed - started if feed_best is None else min(feed_best, fed - started)
+        flush_best = flushed - fed if flush_best is None else min(flush_best, flushed - fed)
+        del output, parser
+        gc.collect()
+    return feed_best, flush_best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="rows per column")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--baseline", action="append", nargs="?", const="", default=[], metavar="REV",
+                        help="git revision to compare with (default: the parent of the single-pass parser "
+                             "change; repeatable)")
+    parser.add_argument("--stages", action="store_true", help="split the current time into feed and flush")
+    args = parser.parse_args()
+
+    lines = make_lines(args.rows)
+    implementations = [("current", walk_engine)]
+    for revision in args.baseline:
+        revision = baseline_revision(revision, BASELINE_CHANGE)
+        implementations.append((revision, module_at(revision, "services/walk_engine.py", "baseline_walk_engine")))
+
+    print(f"{'implementation':<16}{'lines':>10}{'rows out':>10}{'parse':>10}{'per line':>12}")
+    expected = None
+    for name, module in implementations:
+        gc.collect()
+        seconds, count = best_of(lambda: timed_parse(module, lines), args.repeat)
+        print(f"{name:<16}{len(lines):>10}{count:>10}{seconds:>9.2f}s{seconds / len(lines) * 1e6:>9.2f} us")
+
+        rows = digest(parse(module, lines))
+        if expected is None:
+            expected = rows
+        elif rows != expected:
+            print(f"  {name} rows differ from the current parser")
+
+    if args.stages:
+        feed, flush = stages(lines, args.repeat)
+        print(f"current stages: feed_lines {feed:.2f}s, flush {flush:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -9,16 +9,85 @@ class Settings:
     MIB_DIR = DATA_DIR / "mibs"
     CONFIG_DIR = DATA_DIR / "configs"
     LOG_DIR = DATA_DIR / "logs"
+    MIB_CACHE_DIR = DATA_DIR / "cache" / "mibs"
     
     # SNMP Settings (with env overrides)
     SNMP_PORT = int(os.getenv("SNMP_PORT", "1061"))
     COMMUNITY = os.getenv("SNMP_COMMUNITY", "public")
     TRAP_PORT = int(os.getenv("TRAP_PORT", "1162"))
+    SIM_TABLE_ROWS = int(os.getenv("SIM_TABLE_ROWS", "2"))   # default rows per simulated table
+    SIM_CONTROL_PORT = int(os.getenv("SIM_CONTROL_PORT", "11161"))          # loopback TCP, live data updates
+    SIM_CONTROL_TIMEOUT = float(os.getenv("SIM_CONTROL_TIMEOUT", "60"))     # seconds for a live custom data change
+    SIM_RELOAD_TIMEOUT = float(os.getenv("SIM_RELOAD_TIMEOUT", "300"))      # seconds for a live MIB recompile or table/behavior regeneration
+    SIM_START_TIMEOUT = float(os.getenv("SIM_START_TIMEOUT", "300"))        # seconds to wait for a starting simulator's MIBs
+    SIM_MAX_AGENTS = int(os.getenv("SIM_MAX_AGENTS", "10000"))              # virtual agents per simulator
+    SIM_AGENT_MODES = ("port", "address", "community")                     # how virtual agents are told apart
+    SIM_WORKERS = int(os.getenv("SIM_WORKERS", "1"))                        # processes sharing the port (SO_REUSEPORT)
+    SIM_SNAPSHOT = os.getenv("SIM_SNAPSHOT", "true").lower() == "true"      # serve the static store from a mapped file
+    TRAP_RESOLVE_CACHE_SIZE = int(os.getenv("TRAP_RESOLVE_CACHE_SIZE", "4096"))
+    TRAP_STATS_INTERVAL = float(os.getenv("TRAP_STATS_INTERVAL", "5"))      # seconds between receiver stats snapshots
+    
+    # Trap persistence (write-behind batching)
+    TRAP_FLUSH_BATCH = int(os.getenv("TRAP_FLUSH_BATCH", "256"))          # records per write
+    TRAP_FLUSH_INTERVAL = float(os.getenv("TRAP_FLUSH_INTERVAL", "1.0"))  # seconds
+    TRAP_FSYNC = os.getenv("TRAP_FSYNC", "false").lower() == "true"
+    
+    # Trap log segments (rotation, compression, retention; 0 disables a limit)
+    TRAP_SEGMENT_MAX_BYTES = int(os.getenv("TRAP_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+    TRAP_SEGMENT_MAX_AGE = int(os.getenv("TRAP_SEGMENT_MAX_AGE", "86400"))          # seconds
+    TRAP_SEGMENT_COMPRESSION = os.getenv("TRAP_SEGMENT_COMPRESSION", "none")        # none, gzip, zstd
+    TRAP_RETENTION_SEGMENTS = int(os.getenv("TRAP_RETENTION_SEGMENTS", "20"))
+    TRAP_RETENTION_BYTES = int(os.getenv("TRAP_RETENTION_BYTES", "0"))
+    TRAP_RETENTION_AGE = int(os.getenv("TRAP_RETENTION_AGE", "0"))                  # seconds
+    TRAP_STORE_MAX_ROWS = int(os.getenv("TRAP_STORE_MAX_ROWS", "5000000"))          # indexed store cap
+    
+    # Live trap streaming (receiver -> API over loopback UDP)
+    TRAP_STREAM_PORT = int(os.getenv("TRAP_STREAM_PORT", "11162"))
+    TRAP_STREAM_QUEUE_SIZE = int(os.getenv("TRAP_STREAM_QUEUE_SIZE", "256"))        # per client
+    
+    # SNMP walker
+    WALK_BACKEND = os.getenv("WALK_BACKEND", "native")                            # native, subprocess (snmpwalk)
+    WALK_TIMEOUT = float(os.getenv("WALK_TIMEOUT", "1.0"))                        # seconds per request PDU
+    WALK_RETRIES = int(os.getenv("WALK_RETRIES", "5"))
+    WALK_DEADLINE = float(os.getenv("WALK_DEADLINE", "120"))                      # seconds for a whole walk
+    WALK_MAX_REPETITIONS = int(os.getenv("WALK_MAX_REPETITIONS", "25"))
+    WALK_RESOLVE_CACHE_SIZE = int(os.getenv("WALK_RESOLVE_CACHE_SIZE", "16384"))
+    WALK_BULK_CONCURRENCY = int(os.getenv("WALK_BULK_CONCURRENCY", "64"))         # walks in flight
+    WALK_HOST_CONCURRENCY = int(os.getenv("WALK_HOST_CONCURRENCY", "2"))          # walks in flight per agent (host:port)
+    WALK_HOST_RATE = float(os.getenv("WALK_HOST_RATE", "0"))                      # requests/sec per agent, 0 = unlimited
+    WALK_CACHE_TTL = float(os.getenv("WALK_CACHE_TTL", "30"))                     # seconds, 0 disables the result cache
+    WALK_CACHE_MAX_ENTRIES = int(os.getenv("WALK_CACHE_MAX_ENTRIES", "256"))
+    WALK_CACHE_MAX_ROWS = int(os.getenv("WALK_CACHE_MAX_ROWS", "1000000"))        # rows/lines held across all entries
+    WALK_BULK_MAX_JOBS = int(os.getenv("WALK_BULK_MAX_JOBS", "10000"))            # targets x OIDs per call
+    
+    # Counter rates (incremental walks)
+    COUNTER_RATE_MAX_SERIES = int(os.getenv("COUNTER_RATE_MAX_SERIES", "1000000"))    # counters tracked for rates
+    COUNTER_RATE_STALE_AFTER = float(os.getenv("COUNTER_RATE_STALE_AFTER", "3600"))   # seconds without a sample
+    
+    # Scheduled poller / OpenMetrics export
+    POLLER_CONCURRENCY = int(os.getenv("POLLER_CONCURRENCY", "32"))               # walks in flight
+    POLLER_JITTER = float(os.getenv("POLLER_JITTER", "0.1"))                      # +/- fraction of the interval
+    POLLER_DEFAULT_INTERVAL = float(os.getenv("POLLER_DEFAULT_INTERVAL", "60"))   # seconds
+    POLLER_MIN_INTERVAL = float(os.getenv("POLLER_MIN_INTERVAL", "1"))            # seconds
+    METRICS_AUTH = os.getenv("METRICS_AUTH", "false").lower() == "true"           # require a session token on /metrics
+    
+    # Polled metric history (in-memory ring buffers)
+    TS_RETENTION = float(os.getenv("TS_RETENTION", "86400"))                      # seconds of history per series
+    TS_MAX_POINTS = int(os.getenv("TS_MAX_POINTS", "10080"))                      # per series, caps retention/interval
+    TS_MAX_SERIES = int(os.getenv("TS_MAX_SERIES", "100000"))
+    TS_QUERY_MAX_SERIES = int(os.getenv("TS_QUERY_MAX_SERIES", "500"))            # series returned per query
     
     # File paths
     CUSTOM_DATA_FILE = CONFIG_DIR / "custom_data.json"
     SECRETS_FILE = CONFIG_DIR / "secrets.json"
+    POLLER_CONFIG_FILE = CONFIG_DIR / "poller.json"
+    SIM_TABLES_FILE = CONFIG_DIR / "sim_tables.json"
+    SIM_BEHAVIORS_FILE = CONFIG_DIR / "sim_behaviors.json"
+    SIM_AGENTS_FILE = CONFIG_DIR / "sim_agents.json"
+    SIM_SNAPSHOT_FILE = DATA_DIR / "cache" / "sim_store.snap"
     TRAPS_FILE = DATA_DIR / "traps.jsonl"
+    TRAPS_DB_FILE = DATA_DIR / "traps.db"
+    TRAP_STATS_FILE = DATA_DIR / "trap_receiver_stats.json"
     
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")   # Options: DEBUG, INFO, WARNING, ERROR
@@ -39,6 +108,7 @@ class Settings:
         self.MIB_DIR.mkdir(exist_ok=True)
         self.CONFIG_DIR.mkdir(exist_ok=True)
         self.LOG_DIR.mkdir(exist_ok=True)
+        self.MIB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
         
         # Create default files if they don't exist
         if not self.CUSTOM_DATA_FILE.exists():
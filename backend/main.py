@@ -1,14 +1,29 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.security import validate_auth
 from core.logging import setup_logging
-from api.routers import simulator, walker, settings, traps, mibs
-from core.config import meta
+from api.routers import simulator, walker, settings, traps, mibs, poller, metrics
+from core.config import meta, settings as app_settings
+from services.poller import poller as poll_service
 
 setup_logging()
 
-app = FastAPI(title=meta.NAME, version=meta.VERSION)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Resume scheduled polling if it was enabled in the saved config
+    if poll_service.load_config().get("enabled"):
+        try:
+            await poll_service.start(persist=False)
+        except ValueError as e:
+            logging.getLogger(__name__).error(f"Poller not started: {e}")
+    yield
+    # Shutting down is not switching it off: keep "enabled" for the next start
+    await poll_service.stop(persist=False)
+
+app = FastAPI(title=meta.NAME, version=meta.VERSION, lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -41,6 +56,9 @@ app.include_router(simulator.router, prefix="/api", dependencies=[Depends(valida
 app.include_router(walker.router, prefix="/api", dependencies=[Depends(validate_auth)])
 app.include_router(traps.router, prefix="/api", dependencies=[Depends(validate_auth)])
 app.include_router(mibs.router, prefix="/api", dependencies=[Depends(validate_auth)])
+app.include_router(poller.router, prefix="/api", dependencies=[Depends(validate_auth)])
+app.include_router(metrics.router, prefix="/api", dependencies=[Depends(validate_auth)])
+app.include_router(poller.metrics_router, dependencies=[Depends(validate_auth)] if app_settings.METRICS_AUTH else [])
 app.include_router(settings.router, prefix="/api")
 
 if __name__ == "__main__":
@@ -0,0 +1,161 @@
+import time
+import logging
+from array import array
+from typing import Dict, List, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+COUNTER_MODULUS = {"Counter32": 2 ** 32, "Counter64": 2 ** 64}
+
+# sysUpTime.0, used to detect agent restarts
+SYS_UPTIME_OID = "1.3.6.1.2.1.1.3.0"
+
+class CounterRates:
+    """
+    Per-second rates for Counter32/Counter64 metrics across successive walks.
+
+    The previous sample of every (agent, object, index) series lives in
+    flat arrays addressed by a slot number, so tracking many thousands of
+    interfaces costs a dict entry plus a few bytes per series.
+
+    A decrease is taken as a counter wrap at the type's width. If the
+    wrapped delta is more than half the counter range it is far more
+    likely a reset (agent or interface), and no rate is emitted for that
+    sample. When sysUpTime is supplied and goes backwards the agent has
+    restarted, so every series of that agent starts over.
+    """
+
+    def __init__(self, max_series: int = 1000000, stale_after: float = 3600):
+        self.max_series = max_series
+        self.stale_after = stale_after
+
+        self._slots: Dict[Tuple[str, str, str], int] = {}
+        self._free: List[int] = []
+        self._values = array('Q')   # last raw value
+        self._times = array('d')    # when it was taken
+        self._epochs = array('I')   # agent epoch it belongs to
+
+        self._agent_epochs: Dict[str, int] = {}
+        self._agent_uptimes: Dict[str, int] = {}
+
+        self.restarts = 0
+        self.wraps = 0
+        self.resets = 0
+
+    def observe_uptime(self, agent: str, uptime) -> bool:
+        """Record the agent's sysUpTime (ticks). Returns True if it restarted since the last sample."""
+        if uptime is None:
+            return False
+
+        uptime = int(uptime)
+        previous = self._agent_uptimes.get(agent)
+        self._agent_uptimes[agent] = uptime
+        if previous is not None and uptime < previous:
+            self._agent_epochs[agent] = self._agent_epochs.get(agent, 0) + 1
+            self.restarts += 1
+            logger.info(f"Agent {agent} restarted (sysUpTime {previous} -> {uptime}), counter history reset")
+            return True
+        return False
+
+    def update(self, agent: str, rows: List[dict], types: Dict[str, str],
+               uptime=None, now: float = None) -> List[dict]:
+        """
+        Add "rate" (per second, or None) to every counter row in place and
+        return the rows. `types` maps metric names to their SNMP value type,
+        as returned by WalkParser.metric_types().
+        """
+        now = time.time() if now is None else now
+        self.observe_uptime(agent, uptime)
+        epoch = self._agent_epochs.get(agent, 0)
+
+        for row in rows:
+            modulus = COUNTER_MODULUS.get(types.get(row["metric_name"]))
+            value = row["value"]
+            if modulus is None or not isinstance(value, int) or not 0 <= value < modulus:
+                continue
+
+            row["rate"] = self._sample(
+                (agent, row["metric_name"], row["labels"].get("snmp_index", "")),
+                value, modulus, epoch, now
+            )
+        return rows
+
+    def _sample(self, key, value: int, modulus: int, epoch: int, now: float) -> Optional[float]:
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._allocate(key, now)
+            if slot is not None:
+                self._store(slot, value, now, epoch)
+            return None
+
+        prev_value = self._values[slot]
+        prev_time = self._times[slot]
+        prev_epoch = self._epochs[slot]
+        self._store(slot, value, now, epoch)
+
+        elapsed = now - prev_time
+        if prev_epoch != epoch or elapsed <= 0:
+            return None
+
+        delta = value - prev_value
+        if delta < 0:
+            delta += modulus
+            if delta > modulus // 2:
+                self.resets += 1
+                return None
+            self.wraps += 1
+
+        return delta / elapsed
+
+    def _store(self, slot: int, value: int, now: float, epoch: int):
+        self._values[slot] = value
+        self._times[slot] = now
+        self._epochs[slot] = epoch & 0xFFFFFFFF
+
+    def _allocate(self, key, now: float) -> Optional[int]:
+        if len(self._slots) >= self.max_series:
+            self.prune(now)
+            if len(self._slots) >= self.max_series:
+                return None
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._values)
+            self._values.append(0)
+            self._times.append(0.0)
+            self._epochs.append(0)
+
+        self._slots[key] = slot
+        return slot
+
+    def prune(self, now: float = None) -> int:
+        """Forget series not sampled within `stale_after` seconds"""
+        cutoff = (time.time() if now is None else now) - self.stale_after
+        times = self._times
+        stale = [key for key, slot in self._slots.items() if times[slot] < cutoff]
+        for key in stale:
+            self._free.append(self._slots.pop(key))
+        return len(stale)
+
+    def clear(self):
+        self._slots.clear()
+        self._free.clear()
+        self._values = array('Q')
+        self._times = array('d')
+        self._epochs = array('I')
+        self._agent_epochs.clear()
+        self._agent_uptimes.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "series": len(self._slots),
+            "max_series": self.max_series,
+            "agents": len(self._agent_uptimes),
+            "restarts": self.restarts,
+            "wraps": self.wraps,
+            "resets": self.resets
+        }
+
+counter_rates = CounterRates(settings.COUNTER_RATE_MAX_SERIES, settings.COUNTER_RATE_STALE_AFTER)
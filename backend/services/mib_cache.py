@@ -0,0 +1,116 @@
+import os
+import json
+import glob
+import hashlib
+import logging
+import tempfile
+from typing import Dict, List
+from pysnmp.smi import builder, compiler
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class MibCache:
+    """
+    On-disk cache of pysmi-compiled MIB modules shared by every process that
+    loads MIBs (API, simulator, trap receiver).
+
+    Compiled modules live in a single destination directory that the
+    MibBuilder loads from directly. A manifest records the SHA-256 of each
+    source file in the MIB directory; when a source changes (or disappears)
+    only that module's compiled artefacts are dropped, so it alone is
+    recompiled on the next load.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = str(cache_dir or settings.MIB_CACHE_DIR)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.cache_dir, self.MANIFEST_FILE)
+
+    def create_builder(self, sources: List[str]) -> builder.MibBuilder:
+        """Return a MibBuilder that loads from the cache and compiles misses into it"""
+        mib_builder = builder.MibBuilder()
+        compiler.add_mib_compiler(mib_builder, sources=sources, destination=self.cache_dir)
+        return mib_builder
+
+    def sync(self, mib_files: Dict[str, str]) -> int:
+        """
+        Invalidate cached modules whose source changed since they were compiled.
+        mib_files maps module name to source file path. Returns the number of
+        modules invalidated.
+        """
+        manifest = self._read_manifest()
+        updated = {}
+        invalidated = 0
+
+        for mib_name, file_path in mib_files.items():
+            try:
+                digest = self._hash_file(file_path)
+            except OSError as e:
+                logger.debug(f"Cannot hash MIB source {file_path}: {e}")
+                continue
+
+            if manifest.get(mib_name) != digest:
+                if self._drop_compiled(mib_name):
+                    invalidated += 1
+            updated[mib_name] = digest
+
+        # Sources removed from the MIB directory
+        for mib_name in set(manifest) - set(updated):
+            if self._drop_compiled(mib_name):
+                invalidated += 1
+
+        if updated != manifest:
+            self._write_manifest(updated)
+
+        if invalidated:
+            logger.info(f"MIB cache: invalidated {invalidated} changed module(s)")
+        return invalidated
+
+    def _drop_compiled(self, mib_name: str) -> bool:
+        """Remove compiled artefacts of one module. Returns True if any existed"""
+        paths = [
+            os.path.join(self.cache_dir, f"{mib_name}.py"),
+            os.path.join(self.cache_dir, f"{mib_name}.pyc"),
+        ]
+        paths.extend(glob.glob(os.path.join(self.cache_dir, "__pycache__", f"{glob.escape(mib_name)}.*.pyc")))
+
+        removed = False
+        for path in paths:
+            try:
+                os.remove(path)
+                removed = True
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove cached MIB {path}: {e}")
+        return removed
+
+    @staticmethod
+    def _hash_file(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _read_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest: Dict[str, str]):
+        # Atomic replace: several processes may sync the same cache
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"Could not write MIB cache manifest: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
@@ -1,11 +1,13 @@
 import os
 import re
 import logging
-from typing import List, Dict, Optional, Set
+from collections import OrderedDict
+from typing import List, Dict, Optional, Set, Tuple
 from pathlib import Path
-from pysnmp.smi import builder, view, compiler
+from pysnmp.smi import view
 from pysnmp.proto.api import v2c
 from core.config import settings
+from services.mib_cache import MibCache
 
 logger = logging.getLogger(__name__)
 
@@ -57,19 +59,21 @@ class MibService:
         if self._initialized:
             return
         
-        self.mib_builder = builder.MibBuilder()
-        self.mib_view = view.MibViewController(self.mib_builder)
+        self.mib_cache = MibCache()
         self.loaded_mibs: Dict[str, MibInfo] = {}
         self.failed_mibs: Dict[str, MibInfo] = {}
+        self.oid_index: Dict[Tuple[int, ...], str] = {}
+        self.generation = 0
         
         self._configure_sources()
         self._load_all_mibs()
+        self._build_oid_index()
         
         self._initialized = True
         logger.info(f"MibService initialized: {len(self.loaded_mibs)} MIBs loaded")
     
     def _configure_sources(self):
-        """Configure MIB search paths"""
+        """Configure MIB search paths and the compiled-module cache"""
         sources = [
             f'file://{os.path.abspath(settings.MIB_DIR)}',
             'file:///usr/share/snmp/mibs',
@@ -78,7 +82,8 @@ class MibService:
             'https://mibs.pysnmp.com/asn1/@mib@'
         ]
         
-        compiler.add_mib_compiler(self.mib_builder, sources=sources)
+        self.mib_builder = self.mib_cache.create_builder(sources)
+        self.mib_view = view.MibViewController(self.mib_builder)
         logger.debug(f"MIB sources configured: {sources}")
     
     def _load_all_mibs(self):
@@ -90,6 +95,8 @@ class MibService:
         mib_files = self._discover_mib_files()
         logger.info(f"Found {len(mib_files)} MIB files")
         
+        self.mib_cache.sync(mib_files)
+        
         for mib_name, file_path in mib_files.items():
             self._load_single_mib(mib_name, file_path)
         
@@ -163,6 +170,26 @@ class MibService:
                 elif class_name in ['MibScalar', 'MibTableColumn']:
                     mib_info.objects_count += 1
     
+    def _build_oid_index(self):
+        """Build the OID → 'MODULE::symbol' reverse index used by resolve_oid"""
+        oid_index = {}
+        
+        for module_name, symbols in self.mib_builder.mibSymbols.items():
+            for symbol_name, symbol_obj in symbols.items():
+                if not hasattr(symbol_obj, 'name'):
+                    continue
+                
+                try:
+                    oid_tuple = tuple(symbol_obj.name)
+                except TypeError:
+                    continue
+                
+                # First definition wins, matching module load order
+                oid_index.setdefault(oid_tuple, f"{module_name}::{symbol_name}")
+        
+        self.oid_index = oid_index
+        logger.debug(f"OID index built: {len(oid_index)} symbols")
+    
     def _is_standard_mib(self, mib_name: str) -> bool:
         """Check if a MIB is a standard/system MIB"""
         standard_mibs = {
@@ -182,13 +209,13 @@ class MibService:
         """Hot-reload all MIBs"""
         logger.info("Reloading MIB service...")
         
-        self.mib_builder = builder.MibBuilder()
-        self.mib_view = view.MibViewController(self.mib_builder)
         self.loaded_mibs.clear()
         self.failed_mibs.clear()
         
         self._configure_sources()
         self._load_all_mibs()
+        self._build_oid_index()
+        self.generation += 1
         
         logger.info(f"Reload complete: {len(self.loaded_mibs)} loaded, {len(self.failed_mibs)} failed")
     
@@ -384,14 +411,12 @@ class MibService:
                 try:
                     oid_obj, label, suffix = self.mib_view.getNodeName(oid_tuple)
                     
-                    # Try to find MIB module name
-                    for module_name, symbols in self.mib_builder.mibSymbols.items():
-                        for symbol_name, symbol_obj in symbols.items():
-                            if hasattr(symbol_obj, 'name') and symbol_obj.name == oid_obj:
-                                result = f"{module_name}::{symbol_name}"
-                                if suffix:
-                                    result += "." + ".".join(map(str, suffix))
-                                return result
+                    # Find MIB module name via the reverse index
+                    result = self.oid_index.get(tuple(oid_obj))
+                    if result:
+                        if suffix:
+                            result += "." + ".".join(map(str, suffix))
+                        return result
                     
                     # Fallback
                     meaningful_labels = [l for l in label if l not in ['iso', 'org', 'dod', 'internet', 'mgmt', 'mib-2', 'private', 'enterprises']]
@@ -425,6 +450,61 @@ class MibService:
         
         return None
 
+class ResolutionCache:
+    """
+    Size-bounded LRU cache in front of MibService.resolve_oid.
+    Entries are dropped automatically when the service reloads its MIBs.
+    """
+    
+    def __init__(self, mib_service: MibService, maxsize: int = 4096):
+        self.mib_service = mib_service
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+        self._generation = mib_service.generation
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def resolve_oid(self, oid: str, mode: str = "name") -> str:
+        """Cached equivalent of MibService.resolve_oid"""
+        if self._generation != self.mib_service.generation:
+            self.clear()
+            self._generation = self.mib_service.generation
+        
+        key = (oid, mode)
+        entries = self._entries
+        
+        if key in entries:
+            entries.move_to_end(key)
+            self.hits += 1
+            return entries[key]
+        
+        self.misses += 1
+        result = self.mib_service.resolve_oid(oid, mode)
+        
+        entries[key] = result
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+        
+        return result
+    
+    def clear(self):
+        """Drop all cached resolutions"""
+        self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
 _mib_service_instance = None
 
 def get_mib_service() -> MibService:
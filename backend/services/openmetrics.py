@@ -0,0 +1,90 @@
+import re
+from typing import Dict, Iterable, List, Tuple
+
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+NAME_RE = re.compile(r'[^a-zA-Z0-9_]')
+FIXED_LABELS = ("agent_host", "agent_port", "mib_module")
+
+def metric_name(name: str) -> str:
+    return "snmp_" + NAME_RE.sub("_", name)
+
+def label_name(name: str) -> str:
+    name = NAME_RE.sub("_", name).lstrip("_")
+    if not name or name[0].isdigit():
+        name = "label_" + name
+    return name
+
+def escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def family_type(val_type: str) -> str:
+    """OpenMetrics type for an SNMP value type"""
+    if val_type.startswith("Counter"):
+        return "counter"
+    if val_type in ("Gauge32", "Unsigned32", "INTEGER", "Integer", "Integer32"):
+        return "gauge"
+    return "unknown"
+
+def format_number(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+class OpenMetricsWriter:
+    """
+    Collects samples into metric families and renders the OpenMetrics text
+    exposition. Samples of one family are kept together as the format
+    requires, and a repeated series (same name and labels) is only written
+    once.
+    """
+
+    def __init__(self):
+        self._families: Dict[str, Tuple[str, str, List[str]]] = {}
+        self._seen = set()
+
+    def add(self, name: str, mtype: str, help_text: str, labels: Dict[str, object], value):
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = (mtype, help_text, [])
+        mtype = family[0]
+
+        label_str = ",".join(f'{k}="{escape(v)}"' for k, v in labels.items())
+        series = (name, label_str)
+        if series in self._seen:
+            return
+        self._seen.add(series)
+
+        sample = name + "_total" if mtype == "counter" else name
+        family[2].append(f"{sample}{{{label_str}}} {format_number(value)}")
+
+    def add_rows(self, rows: Iterable[dict], types: Dict[str, str], port: int):
+        """Add flattened WalkParser rows as samples. Rows without an object name (numeric walks) are skipped."""
+        for row in rows:
+            if not row["metric_name"]:
+                continue
+            val_type = types.get(row["metric_name"], "")
+            labels = {
+                "agent_host": row["agent_host"],
+                "agent_port": port,
+                "mib_module": row["mib_module"]
+            }
+            for key, value in row["labels"].items():
+                key = label_name(key)
+                if key not in labels:
+                    labels[key] = value
+
+            self.add(
+                metric_name(row["metric_name"]), family_type(val_type),
+                f"{row['mib_module']}::{row['metric_name']} ({val_type or 'unknown type'})",
+                labels, row["value"]
+            )
+
+    def render(self) -> str:
+        out = []
+        for name, (mtype, help_text, samples) in self._families.items():
+            out.append(f"# TYPE {name} {mtype}")
+            out.append(f"# HELP {name} {escape(help_text)}")
+            out.extend(samples)
+        out.append("# EOF")
+        return "\n".join(out) + "\n"
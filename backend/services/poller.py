@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import heapq
+import random
+import asyncio
+import logging
+from typing import Dict, List, Optional
+from core.config import settings
+from services.snmp_walker import snmp_walker, WalkError
+from services.walk_engine import WalkEngine
+from services.timeseries import timeseries_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG = {"enabled": False, "targets": []}
+
+class PollJob:
+    """One target x OID subtree polled on an interval, with its latest result"""
+
+    def __init__(self, target: str, port: int, community: str, oid: str,
+                 interval: float, use_mibs: bool = True):
+        self.target = target
+        self.port = port
+        self.community = community
+        self.oid = oid
+        self.interval = interval
+        self.use_mibs = use_mibs
+
+        self.rows: List[dict] = []
+        self.types: Dict[str, str] = {}
+        self.last_poll: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.next_due = 0.0
+        self.running = False
+
+        self.polls = 0
+        self.failures = 0
+        self.overruns = 0
+
+    @property
+    def up(self) -> bool:
+        return self.last_poll is not None and self.last_error is None
+
+    def to_dict(self):
+        return {
+            "target": self.target,
+            "port": self.port,
+            "oid": self.oid,
+            "interval": self.interval,
+            "up": self.up,
+            "rows": len(self.rows),
+            "last_poll": self.last_poll,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "next_in": round(max(0.0, self.next_due - time.monotonic()), 1) if self.next_due else None,
+            "polls": self.polls,
+            "failures": self.failures,
+            "overruns": self.overruns
+        }
+
+class Poller:
+    """
+    Walks the configured targets on their intervals inside the API process.
+
+    Every target x OID is its own job. First polls are spread randomly over
+    one interval and each later poll is jittered by POLLER_JITTER, so a
+    large fleet does not get walked in bursts. At most POLLER_CONCURRENCY
+    walks run at once. A job whose previous poll is still running skips
+    that turn and counts an overrun. The latest rows per job are kept for
+    /metrics, and every poll is appended to the time-series store.
+    """
+
+    def __init__(self, config_file: str = None):
+        self.config_file = str(config_file or settings.POLLER_CONFIG_FILE)
+        self.jobs: List[PollJob] = []
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = set()
+
+    # ==================== Configuration ====================
+
+    def load_config(self) -> dict:
+        if not os.path.exists(self.config_file):
+            return dict(DEFAULT_CONFIG)
+        try:
+            with open(self.config_file, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load poller config: {e}")
+            return dict(DEFAULT_CONFIG)
+
+    def save_config(self, config: dict):
+        self.build_jobs(config)  # validate before writing
+        self._write_config(config)
+
+    def _save_enabled(self, enabled: bool):
+        """Remember whether the poller runs, so it resumes (or not) after a restart"""
+        config = self.load_config()
+        if config.get("enabled") != enabled:
+            self._write_config(dict(config, enabled=enabled))
+
+    def _write_config(self, config: dict):
+        os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+        tmp_path = self.config_file + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(config, f, indent=2)
+        os.replace(tmp_path, self.config_file)
+
+    @staticmethod
+    def build_jobs(config: dict) -> List[PollJob]:
+        """Expand the config into jobs. Raises ValueError for invalid entries."""
+        jobs = []
+        for entry in config.get("targets", []):
+            target = str(entry.get("target", "")).strip()
+            oids = entry.get("oids") or []
+            if not target or not oids:
+                raise ValueError("Each poller target needs 'target' and at least one OID in 'oids'")
+
+            interval = float(entry.get("interval", settings.POLLER_DEFAULT_INTERVAL))
+            if interval < settings.POLLER_MIN_INTERVAL:
+                raise ValueError(f"Poll interval must be at least {settings.POLLER_MIN_INTERVAL:g}s")
+
+            for oid in oids:
+                jobs.append(PollJob(
+                    target=target,
+                    port=int(entry.get("port", 161)),
+                    community=str(entry.get("community", "public")),
+                    oid=str(oid).strip(),
+                    interval=interval,
+                    use_mibs=bool(entry.get("use_mibs", True))
+                ))
+        return jobs
+
+    # ==================== Lifecycle ====================
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self, persist: bool = True) -> dict:
+        """Start polling; `persist` records it as enabled in the config"""
+        if self.running:
+            return {"status": "already_running", "jobs": len(self.jobs)}
+
+        self.jobs = self.build_jobs(self.load_config())
+        if persist:
+            self._save_enabled(True)
+        self._task = asyncio.ensure_future(self._run())
+        logger.info(f"Poller started with {len(self.jobs)} job(s)")
+        return {"status": "started", "jobs": len(self.jobs)}
+
+    async def stop(self, persist: bool = True) -> dict:
+        """Stop polling; `persist` records it as disabled (not on shutdown, so it resumes)"""
+        if persist:
+            self._save_enabled(False)
+        if not self.running:
+            return {"status": "stopped"}
+
+        self._task.cancel()
+        for task in list(self._inflight):
+            task.cancel()
+        await asyncio.gather(self._task, *self._inflight, return_exceptions=True)
+        self._task = None
+        logger.info("Poller stopped")
+        return {"status": "stopped"}
+
+    async def restart(self) -> dict:
+        await self.stop(persist=False)
+        return await self.start(persist=False)
+
+    # ==================== Scheduling ====================
+
+    async def _run(self):
+        slots = asyncio.Semaphore(max(1, settings.POLLER_CONCURRENCY))
+        now = time.monotonic()
+
+        heap = []
+        for i, job in enumerate(self.jobs):
+            job.next_due = now + random.uniform(0, job.interval)
+            heap.append((job.next_due, i))
+        heapq.heapify(heap)
+
+        while heap:
+            due, i = heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            heapq.heappop(heap)
+            job = self.jobs[i]
+            if job.running:
+                job.overruns += 1
+            else:
+                task = asyncio.ensure_future(self._poll(job, slots))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+
+            # Fixed-rate schedule with jitter; never schedule in the past
+            jitter = job.interval * settings.POLLER_JITTER
+            job.next_due = max(due + job.interval + random.uniform(-jitter, jitter), time.monotonic())
+            heapq.heappush(heap, (job.next_due, i))
+
+    async def _poll(self, job: PollJob, slots: asyncio.Semaphore):
+        job.running = True
+        try:
+            async with slots:
+                started = time.monotonic()
+
+                async def collect():
+                    return [
+                        line async for line in snmp_walker.walk_lines(
+                            job.target, job.port, job.community, job.oid, use_mibs=job.use_mibs
+                        )
+                    ]
+
+                try:
+                    # Same overall limit as /walk, so a slow agent fails instead of holding its slot
+                    lines = await asyncio.wait_for(collect(), timeout=settings.WALK_DEADLINE)
+                    # Parsing a large walk is CPU-bound: keep it off the event loop
+                    job.rows, job.types = await asyncio.get_running_loop().run_in_executor(
+                        None, WalkEngine.parse_rows, lines, job.target, job.oid
+                    )
+                    job.last_error = None
+                    timeseries_store.record(f"{job.target}:{job.port}", job.rows, job.interval)
+                except WalkError as e:
+                    job.rows = []
+                    job.last_error = str(e)
+                    job.failures += 1
+                except asyncio.TimeoutError:
+                    job.rows = []
+                    job.last_error = f"Walk did not finish within {settings.WALK_DEADLINE:g}s"
+                    job.failures += 1
+                except Exception as e:
+                    logger.exception(f"Poll of {job.target}:{job.port} {job.oid} failed")
+                    job.rows = []
+                    job.last_error = str(e)
+                    job.failures += 1
+
+                job.last_duration = time.monotonic() - started
+                job.last_poll = time.time()
+                job.polls += 1
+        finally:
+            job.running = False
+
+    def get_status(self) -> dict:
+        return {
+            "running": self.running,
+            "jobs": [job.to_dict() for job in self.jobs],
+            "inflight": len(self._inflight)
+        }
+
+poller = Poller()
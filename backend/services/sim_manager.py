@@ -1,6 +1,9 @@
 import subprocess
+import socket
+import json
 import sys
 import os
+import time
 import logging
 from core.config import settings
 
@@ -30,8 +33,16 @@ class SimulatorManager:
             "--port", str(cls._port),
             "--community", cls._community,
             "--mib-dir", mib_dir,
-            "--data-file", data_file
+            "--data-file", data_file,
+            "--tables-file", str(settings.SIM_TABLES_FILE),
+            "--table-rows", str(settings.SIM_TABLE_ROWS),
+            "--behaviors-file", str(settings.SIM_BEHAVIORS_FILE),
+            "--agents-file", str(settings.SIM_AGENTS_FILE),
+            "--workers", str(settings.SIM_WORKERS),
+            "--control-port", str(settings.SIM_CONTROL_PORT)
         ]
+        if settings.SIM_SNAPSHOT:
+            cmd += ["--snapshot-file", str(settings.SIM_SNAPSHOT_FILE)]
 
         # Redirect stdout and stderr to main process
         cls._process = subprocess.Popen(
@@ -65,13 +76,84 @@ class SimulatorManager:
     @classmethod
     def restart(cls):
         cls.stop()
-        import time
         time.sleep(0.5)
         return cls.start()
 
+    @classmethod
+    def _running(cls):
+        return cls._process is not None and cls._process.poll() is None
+
+    @classmethod
+    def _send(cls, op, timeout):
+        with socket.create_connection(("127.0.0.1", settings.SIM_CONTROL_PORT), timeout=timeout) as sock:
+            sock.sendall(json.dumps({"op": op}).encode() + b"\n")
+            reply = sock.makefile("rb").readline()
+        return json.loads(reply)
+
+    @classmethod
+    def control(cls, op, timeout=10):
+        """Send a command over the simulator's control channel. Returns its reply, or None if undelivered."""
+        if not cls._running():
+            return None
+        try:
+            return cls._send(op, timeout)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Simulator control '{op}' failed: {e}")
+            return None
+
+    @classmethod
+    def wait_ready(cls, deadline=None):
+        """
+        Wait until a starting simulator listens on its control port and has
+        its MIBs loaded. Returns False if it exits or the deadline passes first.
+        """
+        deadline = time.monotonic() + (settings.SIM_START_TIMEOUT if deadline is None else deadline)
+        while cls._running():
+            try:
+                if not cls._send("status", 5).get("loading_mibs"):
+                    return True
+            except (OSError, ValueError):
+                # Not listening yet: the MIBs are still compiling before the control channel opens
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.5)
+        return False
+
+    @classmethod
+    def apply(cls, op):
+        """
+        Apply saved changes to the running simulator in place ("custom_data",
+        "tables", "behaviors" or "reload"). Returns "applied", "pending" when
+        the simulator is still starting or still working on the change (it
+        reads the saved files either way), or "restarted" when it replied
+        with an error or had exited.
+        """
+        if not cls.wait_ready():
+            if not cls._running():
+                logger.warning(f"Simulator exited before '{op}' could be applied, starting it again")
+                cls.start()
+                return "restarted"
+            logger.warning(f"Simulator still starting after {settings.SIM_START_TIMEOUT:g}s, '{op}' not sent")
+            return "pending"
+
+        timeout = settings.SIM_CONTROL_TIMEOUT if op == "custom_data" else settings.SIM_RELOAD_TIMEOUT
+        try:
+            reply = cls._send(op, timeout)
+        except (OSError, ValueError) as e:
+            # Slow, not failed: restarting would throw away the work in progress
+            logger.warning(f"No reply to simulator control '{op}' within {timeout:g}s: {e}")
+            return "pending"
+
+        if reply.get("status") == "ok":
+            return "applied"
+        logger.warning(f"Simulator could not apply '{op}': {reply.get('error')}, restarting")
+        cls.restart()
+        return "restarted"
+
     @classmethod
     def status(cls):
-        running = cls._process is not None and cls._process.poll() is None
+        running = cls._running()
         return {
             "running": running,
             "pid": cls._process.pid if running else None,
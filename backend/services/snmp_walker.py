@@ -0,0 +1,400 @@
+import asyncio
+import functools
+import logging
+import threading
+from typing import AsyncIterator, Awaitable, Callable, Optional, Tuple
+
+from pysnmp.hlapi.v3arch.asyncio import (
+    SnmpEngine, CommunityData, UdpTransportTarget, ContextData,
+    ObjectType, ObjectIdentity, bulk_cmd, get_cmd
+)
+from pysnmp.proto import errind, rfc1902, rfc1905
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Response markers that end a walk or mean "nothing here"
+END_OF_VIEW = (rfc1905.EndOfMibView, rfc1905.NoSuchObject, rfc1905.NoSuchInstance)
+
+# Net-SNMP type label of each integer value class
+INTEGER_LABELS = {
+    "Integer": "INTEGER", "Integer32": "INTEGER", "Gauge32": "Gauge32", "Unsigned32": "Gauge32",
+    "Counter32": "Counter32", "Counter64": "Counter64"
+}
+
+class WalkError(Exception):
+    """Walk failed (bad OID, timeout or agent error)"""
+
+class SnmpWalker:
+    """
+    In-process SNMPv2c walker built on the pysnmp asyncio API.
+
+    Walks a subtree with GETBULK and yields varbinds as they arrive. Output
+    lines use the same layout as `snmpwalk -Oe` (or `-On` without MIBs) so
+    WalkEngine.parse_output and the /walk/execute contract are unchanged.
+    Names are resolved with the MibService already loaded in the API, and
+    with MIBs their syntax renders enumerations, BITS and DISPLAY-HINTs as
+    snmpwalk -m ALL does.
+    """
+
+    def __init__(self):
+        self._engine: Optional[SnmpEngine] = None
+        self._engine_loop = None
+        self._resolver = None
+        self._resolver_lock = threading.Lock()
+        self._syntaxes = {}
+        self._syntax_generation = None
+
+    @property
+    def engine(self) -> SnmpEngine:
+        # One engine shared by all walks, bound to the loop it was created in
+        loop = asyncio.get_running_loop()
+        if self._engine is None or self._engine_loop is not loop:
+            self._engine = SnmpEngine()
+            self._engine_loop = loop
+        return self._engine
+
+    @property
+    def resolver(self):
+        if self._resolver is None:
+            self._build_resolver()
+        return self._resolver
+
+    def _build_resolver(self):
+        # The first use loads every MIB; concurrent first walks share one load
+        with self._resolver_lock:
+            if self._resolver is None:
+                from services.mib_service import get_mib_service, ResolutionCache
+                self._resolver = ResolutionCache(get_mib_service(), settings.WALK_RESOLVE_CACHE_SIZE)
+
+    async def load_resolver(self):
+        """Build the name resolver in a worker thread, so the MIB load never blocks the event loop"""
+        if self._resolver is None:
+            await asyncio.get_running_loop().run_in_executor(None, self._build_resolver)
+        return self._resolver
+
+    # ==================== Walking ====================
+
+    async def walk(self, host: str, port: int, community: str, oid: str,
+                   timeout: float = None, retries: int = None,
+                   max_repetitions: int = None,
+                   throttle: Callable[[], Awaitable[None]] = None) -> AsyncIterator[Tuple[tuple, object]]:
+        """
+        Yield (oid_tuple, value) for every object under `oid`, in order.
+        `throttle`, if given, is awaited before each request sent to the agent.
+        """
+        host = str(host).strip()
+        community = str(community).strip()
+        if not host:
+            raise WalkError("Host cannot be empty")
+
+        root = await self.to_numeric_async(oid)
+        transport = await self._transport(host, port, timeout, retries)
+        auth = CommunityData(community, mpModel=1)
+        max_repetitions = max_repetitions or settings.WALK_MAX_REPETITIONS
+
+        current = root
+        found = 0
+        while True:
+            if throttle:
+                await throttle()
+            error_indication, error_status, error_index, var_binds = await bulk_cmd(
+                self.engine, auth, transport, ContextData(),
+                0, max_repetitions, ObjectType(ObjectIdentity(current)),
+                lookupMib=False
+            )
+            self._check_response(error_indication, error_status, host, port)
+            if not var_binds:
+                break
+
+            done = False
+            for name, value in var_binds:
+                oid_tuple = tuple(name)
+                if isinstance(value, END_OF_VIEW) or oid_tuple[:len(root)] != root:
+                    done = True
+                    break
+                if oid_tuple <= current:
+                    raise WalkError(f"Error: OID not increasing: {self.format_oid(current, False)}")
+                found += 1
+                current = oid_tuple
+                yield oid_tuple, value
+
+            if done:
+                break
+
+        # Like snmpwalk, fall back to a GET when the root itself is a leaf
+        if not found:
+            if throttle:
+                await throttle()
+            error_indication, error_status, error_index, var_binds = await get_cmd(
+                self.engine, auth, transport, ContextData(),
+                ObjectType(ObjectIdentity(root)),
+                lookupMib=False
+            )
+            self._check_response(error_indication, error_status, host, port)
+            for name, value in var_binds:
+                if not isinstance(value, END_OF_VIEW):
+                    yield tuple(name), value
+
+    async def get(self, host: str, port: int, community: str, oid: str,
+                  timeout: float = None, retries: int = None):
+        """Value of a single object, or None if the agent does not have it"""
+        host = str(host).strip()
+        root = await self.to_numeric_async(oid)
+        transport = await self._transport(host, port, timeout, retries)
+        error_indication, error_status, error_index, var_binds = await get_cmd(
+            self.engine, CommunityData(str(community).strip(), mpModel=1), transport, ContextData(),
+            ObjectType(ObjectIdentity(root)),
+            lookupMib=False
+        )
+        self._check_response(error_indication, error_status, host, port)
+        for name, value in var_binds:
+            if not isinstance(value, END_OF_VIEW):
+                return value
+        return None
+
+    async def walk_lines(self, host: str, port: int, community: str, oid: str,
+                         use_mibs: bool = True, **options) -> AsyncIterator[str]:
+        """Same as walk() but yields snmpwalk-style output lines"""
+        if use_mibs:
+            await self.load_resolver()
+        async for oid_tuple, value in self.walk(host, port, community, oid, **options):
+            yield self.format_line(oid_tuple, value, use_mibs)
+
+    @staticmethod
+    async def _transport(host, port, timeout, retries):
+        return await UdpTransportTarget.create(
+            (host, port),
+            timeout=settings.WALK_TIMEOUT if timeout is None else timeout,
+            retries=settings.WALK_RETRIES if retries is None else retries
+        )
+
+    @staticmethod
+    def _check_response(error_indication, error_status, host, port):
+        if error_indication:
+            if isinstance(error_indication, errind.RequestTimedOut):
+                raise WalkError(f"Timeout: No Response from {host}:{port}.")
+            raise WalkError(str(error_indication))
+        if error_status:
+            raise WalkError(f"Error in packet: {error_status.prettyPrint()}")
+
+    # ==================== OIDs ====================
+
+    async def to_numeric_async(self, oid: str) -> tuple:
+        """to_numeric, loading the resolver off the loop first if the OID is symbolic"""
+        if not str(oid).strip().lstrip(".").replace(".", "").isdigit():
+            await self.load_resolver()
+        return self.to_numeric(oid)
+
+    def to_numeric(self, oid: str) -> tuple:
+        """Convert a numeric, 'name[.index]' or 'MODULE::name[.index]' OID to a tuple"""
+        oid = str(oid).strip()
+        if not oid:
+            raise WalkError("OID cannot be empty")
+
+        dotted = oid.lstrip(".")
+        if dotted.replace(".", "").isdigit():
+            return tuple(int(x) for x in dotted.split("."))
+
+        module, _, symbol = oid.rpartition("::")
+        name, _, suffix = symbol.partition(".")
+        try:
+            mib_view = self.resolver.mib_service.mib_view
+            node_oid, _, _ = mib_view.get_node_name_by_desc(name, module)
+            index = tuple(int(x) for x in suffix.split(".")) if suffix else ()
+        except Exception:
+            raise WalkError(f"{oid}: Unknown Object Identifier")
+
+        return tuple(node_oid) + index
+
+    def format_oid(self, oid_tuple: tuple, use_mibs: bool) -> str:
+        numeric = "." + ".".join(map(str, oid_tuple))
+        if not use_mibs:
+            return numeric
+        return self.resolver.resolve_oid(numeric, mode="name")
+
+    def object_syntax(self, name: str):
+        """MIB syntax of the object a resolved 'MODULE::symbol[.index]' name belongs to, or None"""
+        mib_service = self.resolver.mib_service
+        if self._syntax_generation != mib_service.generation:
+            self._syntaxes = {}
+            self._syntax_generation = mib_service.generation
+
+        symbol = name.partition(".")[0]
+        try:
+            return self._syntaxes[symbol]
+        except KeyError:
+            pass
+
+        module, _, obj_name = symbol.partition("::")
+        node = mib_service.mib_builder.mibSymbols.get(module, {}).get(obj_name)
+        syntax = None
+        if node.__class__.__name__ in ("MibScalar", "MibTableColumn"):
+            syntax = node.getSyntax()
+        self._syntaxes[symbol] = syntax
+        return syntax
+
+    # ==================== Values ====================
+
+    def format_line(self, oid_tuple: tuple, value, use_mibs: bool = True) -> str:
+        name = self.format_oid(oid_tuple, use_mibs)
+        syntax = self.object_syntax(name) if use_mibs else None
+        return f"{name} = {self.format_value(value, use_mibs, syntax)}"
+
+    def format_value(self, value, use_mibs: bool = True, syntax=None) -> str:
+        """
+        Render a value the way Net-SNMP prints it. `syntax`, the object's MIB
+        syntax, adds enumeration labels, BITS names and DISPLAY-HINTs.
+        """
+        kind = value.__class__.__name__
+
+        if syntax is not None:
+            try:
+                hinted = format_with_syntax(kind, value, syntax)
+            except (ValueError, IndexError, UnicodeError):
+                # Malformed DISPLAY-HINT, or a value that does not fit it
+                hinted = None
+            if hinted is not None:
+                return hinted
+
+        if kind in INTEGER_LABELS:
+            return f"{INTEGER_LABELS[kind]}: {int(value)}"
+        if kind == "TimeTicks":
+            return f"Timeticks: ({int(value)}) {format_timeticks(int(value))}"
+        if kind == "IpAddress":
+            return f"IpAddress: {'.'.join(str(b) for b in value.asOctets())}"
+        if kind in ("ObjectIdentifier", "ObjectName"):
+            return f"OID: {self.format_oid(tuple(value), use_mibs)}"
+        if kind == "Opaque":
+            return f"OPAQUE: {value.asOctets().hex().upper()}"
+        if kind == "Null":
+            return "NULL"
+        if kind in ("OctetString", "Bits"):
+            return format_octets(value.asOctets())
+
+        return f"{kind}: {value.prettyPrint()}"
+
+def format_with_syntax(kind: str, value, syntax) -> Optional[str]:
+    """Net-SNMP rendering of an enumeration, BITS or DISPLAY-HINT value, or None for the plain one"""
+    if kind in INTEGER_LABELS:
+        number = int(value)
+        named = getattr(syntax, "namedValues", None)
+        if named:
+            label = named.getName(number)
+            return f"{INTEGER_LABELS[kind]}: {label}({number})" if label else None
+        hint = getattr(syntax, "displayHint", "")
+        if hint:
+            return f"{INTEGER_LABELS[kind]}: {format_integer_hint(hint, number)}"
+        return None
+
+    if kind == "OctetString":
+        raw = value.asOctets()
+        if isinstance(syntax, rfc1902.Bits):
+            names = [
+                f"{syntax.namedValues.getName(bit) or ''}({bit})"
+                for bit in range(len(raw) * 8)
+                if raw[bit // 8] & (0x80 >> (bit % 8))
+            ]
+            return "BITS: " + " ".join(f"{b:02X}" for b in raw) + " " + " ".join(names)
+        hint = getattr(syntax, "displayHint", "")
+        if hint and raw:
+            return f"STRING: {format_octet_hint(hint, raw)}"
+    return None
+
+def format_integer_hint(hint: str, number: int) -> str:
+    """INTEGER DISPLAY-HINT (RFC 2579): 'd[-n]', 'x', 'o' or 'b'"""
+    fmt, _, shift = hint.partition("-")
+    if fmt == "d" and shift:
+        places = int(shift)
+        digits = str(abs(number)).rjust(places + 1, "0")
+        text = f"{digits[:-places]}.{digits[-places:]}" if places else digits
+        return f"-{text}" if number < 0 else text
+    if fmt in ("d", "x", "o", "b"):
+        return format(number, fmt)
+    raise ValueError(f"bad DISPLAY-HINT {hint!r}")
+
+@functools.lru_cache(maxsize=256)
+def parse_octet_hint(hint: str) -> tuple:
+    """OCTET STRING DISPLAY-HINT (RFC 2579) as (repeat, length, format, separator, terminator) specs"""
+    specs = []
+    i = 0
+    while i < len(hint):
+        repeat = hint[i] == "*"
+        if repeat:
+            i += 1
+        start = i
+        while i < len(hint) and hint[i].isdigit():
+            i += 1
+        if i == start or i >= len(hint) or hint[i] not in "dxoat":
+            raise ValueError(f"bad DISPLAY-HINT {hint!r}")
+        length, fmt = int(hint[start:i]), hint[i]
+        i += 1
+        separator = terminator = ""
+        if i < len(hint) and not hint[i].isdigit() and hint[i] != "*":
+            separator = hint[i]
+            i += 1
+        if repeat and i < len(hint) and not hint[i].isdigit() and hint[i] != "*":
+            terminator = hint[i]
+            i += 1
+        specs.append((repeat, length, fmt, separator, terminator))
+    return tuple(specs)
+
+def format_octet_hint(hint: str, raw: bytes) -> str:
+    """Apply an OCTET STRING DISPLAY-HINT; the last spec repeats until the value runs out, as in Net-SNMP"""
+    specs = parse_octet_hint(hint)
+    out = []
+    pos = 0
+    spec_index = 0
+    while pos < len(raw):
+        repeat, length, fmt, separator, terminator = specs[min(spec_index, len(specs) - 1)]
+        spec_index += 1
+        count = 1
+        if repeat:
+            count = raw[pos]
+            pos += 1
+        for n in range(count):
+            if pos >= len(raw):
+                break
+            chunk = raw[pos:pos + length]
+            pos += length
+            if fmt == "a":
+                out.append(chunk.decode("ascii", "replace"))
+            elif fmt == "t":
+                out.append(chunk.decode("utf-8", "replace"))
+            else:
+                # Unpadded, like Net-SNMP (a MAC address shows as 0:c:29:...)
+                out.append(format(int.from_bytes(chunk, "big"), fmt))
+            if pos >= len(raw):
+                break
+            if terminator and n == count - 1:
+                out.append(terminator)
+            elif separator:
+                out.append(separator)
+    return "".join(out)
+
+def format_octets(raw: bytes) -> str:
+    if not raw:
+        return '""'
+    try:
+        text = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        text = None
+    if text is not None and all(c.isprintable() or c in "\r\n\t" for c in text.rstrip("\x00")):
+        return f'STRING: "{text.rstrip(chr(0))}"'
+    return "Hex-STRING: " + " ".join(f"{b:02X}" for b in raw) + " "
+
+def format_timeticks(ticks: int) -> str:
+    """Net-SNMP style uptime, e.g. '1 day, 0:00:01.23'"""
+    centis = ticks % 100
+    seconds = ticks // 100
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+
+    clock = f"{hours}:{minutes:02d}:{seconds:02d}.{centis:02d}"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {clock}"
+    return clock
+
+snmp_walker = SnmpWalker()
@@ -0,0 +1,160 @@
+import math
+import time
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SeriesBuffer:
+    """
+    Fixed-capacity ring of (timestamp, value) pairs in two float64 arrays.
+    Arrays grow up to `capacity` and are then overwritten oldest first.
+    """
+
+    __slots__ = ("capacity", "labels", "times", "values", "head")
+
+    def __init__(self, capacity: int, labels: dict):
+        self.capacity = capacity
+        self.labels = labels
+        self.times = array('d')
+        self.values = array('d')
+        self.head = 0  # oldest point once the ring is full
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def last_time(self) -> float:
+        return self.times[self.head - 1] if self.times else 0.0
+
+    def append(self, timestamp: float, value: float):
+        if self.times and timestamp <= self.last_time:
+            return
+        if len(self.times) < self.capacity:
+            self.times.append(timestamp)
+            self.values.append(value)
+        else:
+            self.times[self.head] = timestamp
+            self.values[self.head] = value
+            self.head = (self.head + 1) % self.capacity
+
+    def range(self, since: float, until: float) -> Tuple[array, array]:
+        """Points with since <= t <= until, oldest first, as new arrays"""
+        head = self.head
+        if head:
+            times = self.times[head:] + self.times[:head]
+            values = self.values[head:] + self.values[:head]
+        else:
+            times, values = self.times, self.values
+
+        lo = bisect_left(times, since)
+        hi = bisect_right(times, until)
+        return times[lo:hi], values[lo:hi]
+
+def downsample(times: array, values: array, step: float) -> Tuple[array, array, array, array]:
+    """
+    min/max/avg per `step`-second bucket, buckets aligned to multiples of
+    `step`. Empty buckets are left out. Reductions run over array slices,
+    one Python-level iteration per bucket rather than per point.
+    """
+    out_t, out_min, out_max, out_avg = array('d'), array('d'), array('d'), array('d')
+    n = len(times)
+    i = 0
+    while i < n:
+        start = math.floor(times[i] / step) * step
+        j = bisect_left(times, start + step, i)
+        bucket = values[i:j]
+        out_t.append(start)
+        out_min.append(min(bucket))
+        out_max.append(max(bucket))
+        out_avg.append(sum(bucket) / (j - i))
+        i = j
+    return out_t, out_min, out_max, out_avg
+
+class TimeSeriesStore:
+    """
+    In-memory history of polled metric rows.
+
+    One SeriesBuffer per (agent, metric, index). A series holds at most
+    enough points to cover `retention` seconds at the interval it is
+    recorded with (capped by `max_points`), so memory is bounded by
+    max_series * max_points * 16 bytes. Series that have not been updated
+    within `retention` are dropped.
+    """
+
+    def __init__(self, retention: float, max_points: int, max_series: int):
+        self.retention = retention
+        self.max_points = max_points
+        self.max_series = max_series
+        self._series: Dict[Tuple[str, str, str], SeriesBuffer] = {}
+        self._last_prune = 0.0
+
+        self.points = 0
+        self.rejected_series = 0
+
+    def capacity_for(self, interval: Optional[float]) -> int:
+        if not interval or interval <= 0:
+            return self.max_points
+        # Headroom for jittered intervals
+        return max(2, min(self.max_points, math.ceil(self.retention / interval * 1.25) + 1))
+
+    def record(self, agent: str, rows: Iterable[dict], interval: float = None, timestamp: float = None):
+        """Append the numeric values of flattened WalkParser rows"""
+        timestamp = time.time() if timestamp is None else timestamp
+        series = self._series
+
+        for row in rows:
+            value = row["value"]
+            # NaN and +-inf have no JSON form and would break min/max/avg
+            if not isinstance(value, (int, float)) or not math.isfinite(value):
+                continue
+
+            key = (agent, row["metric_name"], row["labels"].get("snmp_index", ""))
+            buf = series.get(key)
+            if buf is None:
+                if len(series) >= self.max_series:
+                    self.rejected_series += 1
+                    continue
+                buf = series[key] = SeriesBuffer(self.capacity_for(interval), row["labels"])
+            buf.append(timestamp, float(value))
+            self.points += 1
+
+        if timestamp - self._last_prune > 60:
+            self.prune(timestamp)
+
+    def prune(self, now: float = None) -> int:
+        """Drop series with no point newer than the retention window"""
+        now = time.time() if now is None else now
+        self._last_prune = now
+        cutoff = now - self.retention
+        stale = [key for key, buf in self._series.items() if buf.last_time < cutoff]
+        for key in stale:
+            del self._series[key]
+        return len(stale)
+
+    def find(self, metric: str = None, agent: str = None, index: str = None) -> List[Tuple[tuple, SeriesBuffer]]:
+        return [
+            (key, buf) for key, buf in self._series.items()
+            if (metric is None or key[1] == metric)
+            and (agent is None or key[0] == agent)
+            and (index is None or key[2] == index)
+        ]
+
+    def clear(self):
+        self._series.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "series": len(self._series),
+            "max_series": self.max_series,
+            "points": sum(len(buf) for buf in self._series.values()),
+            "max_points": self.max_points,
+            "retention": self.retention,
+            "recorded": self.points,
+            "rejected_series": self.rejected_series
+        }
+
+timeseries_store = TimeSeriesStore(settings.TS_RETENTION, settings.TS_MAX_POINTS, settings.TS_MAX_SERIES)
@@ -0,0 +1,237 @@
+import io
+import os
+import re
+import gzip
+import time
+import shutil
+import logging
+from collections import deque
+from typing import Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+
+class TrapLog:
+    """
+    Segmented JSONL trap log.
+
+    Records are appended to an active segment (e.g. traps.jsonl). When it is
+    sealed it is renamed to "<stem>-<epoch_ms>.jsonl" next to it, optionally
+    compressed to .gz/.zst, and old sealed segments are pruned by count,
+    total size and age. Readers see the active and sealed segments as one
+    log, newest records last.
+    """
+
+    def __init__(self, path: str, compression: str = "none", retention_segments: int = 0,
+                 retention_bytes: int = 0, retention_age: float = 0):
+        self.path = path
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.stem, self.ext = os.path.splitext(os.path.basename(path))
+
+        if compression == "zstd" and zstandard is None:
+            logger.warning("zstandard is not installed, compressing trap segments with gzip")
+            compression = "gzip"
+        self.compression = compression if compression in COMPRESSION_SUFFIXES else "none"
+
+        self.retention_segments = retention_segments
+        self.retention_bytes = retention_bytes
+        self.retention_age = retention_age
+
+        self._segment_re = re.compile(
+            rf"^{re.escape(self.stem)}-(\d{{13}}){re.escape(self.ext)}(\.gz|\.zst)?$"
+        )
+
+    # ==================== Segments ====================
+
+    def sealed_segments(self) -> List[str]:
+        """Sealed segment paths, oldest first"""
+        segments = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+
+        for name in names:
+            match = self._segment_re.match(name)
+            if not match:
+                continue
+            # While a segment is being compressed both copies exist; prefer the plain one
+            stamp = match.group(1)
+            if stamp not in segments or not match.group(2):
+                segments[stamp] = os.path.join(self.directory, name)
+
+        return [segments[stamp] for stamp in sorted(segments)]
+
+    def seal(self) -> Optional[str]:
+        """Rename the active segment to a sealed one. Caller must have closed it."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+
+        stamp = int(time.time() * 1000)
+        while True:
+            sealed = os.path.join(self.directory, f"{self.stem}-{stamp:013d}{self.ext}")
+            if not any(os.path.exists(sealed + s) for s in ("", ".gz", ".zst")):
+                break
+            stamp += 1
+
+        os.rename(self.path, sealed)
+        logger.info(f"Sealed trap segment {os.path.basename(sealed)}")
+        return sealed
+
+    def compress(self, path: str) -> str:
+        """Compress a sealed segment in place (atomically). Returns the new path"""
+        if self.compression == "none":
+            return path
+
+        target = path + COMPRESSION_SUFFIXES[self.compression]
+        tmp_path = target + ".tmp"
+        try:
+            with open(path, 'rb') as src:
+                if self.compression == "zstd":
+                    with open(tmp_path, 'wb') as dst:
+                        zstandard.ZstdCompressor().copy_stream(src, dst)
+                else:
+                    with gzip.open(tmp_path, 'wb') as dst:
+                        shutil.copyfileobj(src, dst)
+            os.replace(tmp_path, target)
+            os.remove(path)
+            return target
+        except Exception as e:
+            logger.error(f"Failed to compress trap segment {path}: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return path
+
+    def apply_retention(self) -> int:
+        """Delete the oldest sealed segments beyond the retention limits"""
+        segments = self.sealed_segments()
+        now = time.time()
+        removed = 0
+
+        sizes = {}
+        for path in segments:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                sizes[path] = 0
+        total_bytes = sum(sizes.values())
+
+        for path in list(segments):
+            over_count = self.retention_segments and len(segments) > self.retention_segments
+            over_bytes = self.retention_bytes and total_bytes > self.retention_bytes
+            over_age = self.retention_age and now - self._sealed_at(path) > self.retention_age
+            if not (over_count or over_bytes or over_age):
+                break
+
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove trap segment {path}: {e}")
+            segments.remove(path)
+            total_bytes -= sizes[path]
+
+        if removed:
+            logger.info(f"Trap log retention removed {removed} segment(s)")
+        return removed
+
+    def _sealed_at(self, path: str) -> float:
+        match = self._segment_re.match(os.path.basename(path))
+        return int(match.group(1)) / 1000.0
+
+    # ==================== Reading ====================
+
+    def tail(self, limit: int) -> List[str]:
+        """Last `limit` lines across all segments, oldest first"""
+        if limit <= 0:
+            return []
+
+        lines = tail_lines(self.path, limit) if os.path.exists(self.path) else []
+
+        for segment in reversed(self.sealed_segments()):
+            needed = limit - len(lines)
+            if needed <= 0:
+                break
+            try:
+                lines = self._segment_tail(segment, needed) + lines
+            except (OSError, EOFError) as e:
+                logger.debug(f"Skipping unreadable trap segment {segment}: {e}")
+
+        return lines[-limit:]
+
+    def _segment_tail(self, path: str, limit: int) -> List[str]:
+        if path.endswith((".gz", ".zst")):
+            with self._open_segment(path) as f:
+                return [line.rstrip("\n") for line in deque(f, maxlen=limit)]
+
+        return tail_lines(path, limit)
+
+    def _open_segment(self, path: str):
+        """Open any segment (plain or compressed) as text"""
+        if path.endswith(".gz"):
+            return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+
+        if path.endswith(".zst"):
+            if zstandard is None:
+                raise OSError("zstandard is not installed")
+            raw = open(path, 'rb')
+            return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True),
+                                    encoding='utf-8', errors='replace')
+
+        return open(path, 'r', encoding='utf-8', errors='replace')
+
+    def iter_lines(self) -> Iterator[str]:
+        """Every line across all segments, oldest first"""
+        segments = self.sealed_segments()
+        if os.path.exists(self.path):
+            segments.append(self.path)
+
+        for segment in segments:
+            try:
+                with self._open_segment(segment) as f:
+                    for line in f:
+                        yield line.rstrip("\n")
+            except (OSError, EOFError) as e:
+                logger.debug(f"Skipping unreadable trap segment {segment}: {e}")
+
+    def clear(self):
+        """Truncate the active segment and delete all sealed segments"""
+        open(self.path, 'w').close()
+        for segment in self.sealed_segments():
+            try:
+                os.remove(segment)
+            except OSError as e:
+                logger.warning(f"Could not remove trap segment {segment}: {e}")
+
+def tail_lines(path: str, limit: int, block_size: int = 65536) -> List[str]:
+    """Return the last `limit` lines of a file, reading backwards in blocks"""
+    if limit <= 0:
+        return []
+
+    chunks = []
+    newlines = 0
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+
+        # limit + 1 newlines guarantee `limit` complete lines
+        while pos > 0 and newlines <= limit:
+            read_size = min(block_size, pos)
+            pos -= read_size
+            f.seek(pos)
+            chunk = f.read(read_size)
+            newlines += chunk.count(b"\n")
+            chunks.append(chunk)
+
+    lines = b"".join(reversed(chunks)).splitlines()
+    if pos > 0:
+        # First line may start before the data we read
+        lines = lines[1:]
+
+    return [line.decode('utf-8', errors='replace') for line in lines[-limit:]]
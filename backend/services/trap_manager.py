@@ -3,7 +3,17 @@ import os
 import signal
 import json
 import sys
+import logging
+import threading
+import time
 from core.config import settings
+from services.trap_log import TrapLog
+from services.trap_store import TrapStore
+
+logger = logging.getLogger(__name__)
+
+class TrapStoreUnavailable(Exception):
+    """The indexed store cannot answer a query the log alone cannot answer correctly"""
 
 class TrapManager:
     def __init__(self):
@@ -13,6 +23,25 @@ class TrapManager:
         self.resolve_mibs = True
         
         os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
+        self.trap_log = TrapLog(self.log_file)
+        self.store = TrapStore(settings.TRAPS_DB_FILE)
+        self._import = None
+        self._init_store()
+    
+    def _init_store(self):
+        """Create the indexed store from any existing JSONL history, in the background"""
+        if self.store.exists:
+            return
+        self._import = threading.Thread(target=self._backfill, name="trap-store-import", daemon=True)
+        self._import.start()
+    
+    def _backfill(self):
+        try:
+            imported = self.store.backfill(self.trap_log.iter_lines())
+            if imported:
+                logger.info(f"Imported {imported} traps from {self.log_file} into the trap store")
+        except Exception as e:
+            logger.error(f"Trap store initialization failed: {e}")
     
     def start(self, port=1162, community="public", resolve_mibs=True):
         if self.process and self.process.poll() is None:
@@ -20,15 +49,40 @@ class TrapManager:
         
         self.resolve_mibs = resolve_mibs
         
+        if self._import is not None and self._import.is_alive():
+            # The receiver writes to the store, which the import is still creating
+            logger.info("Waiting for the trap history import to finish")
+            self._import.join()
+        
         cmd = [
             sys.executable, "workers/trap_receiver.py",
             "--port", str(port),
             "--community", community,
             "--mib-path", self.mib_path,
             "--output", self.log_file,
-            "--resolve-mibs", "true" if resolve_mibs else "false"
+            "--resolve-mibs", "true" if resolve_mibs else "false",
+            "--flush-batch", str(settings.TRAP_FLUSH_BATCH),
+            "--flush-interval", str(settings.TRAP_FLUSH_INTERVAL),
+            "--fsync", "true" if settings.TRAP_FSYNC else "false",
+            "--segment-max-bytes", str(settings.TRAP_SEGMENT_MAX_BYTES),
+            "--segment-max-age", str(settings.TRAP_SEGMENT_MAX_AGE),
+            "--compress", settings.TRAP_SEGMENT_COMPRESSION,
+            "--retention-segments", str(settings.TRAP_RETENTION_SEGMENTS),
+            "--retention-bytes", str(settings.TRAP_RETENTION_BYTES),
+            "--retention-age", str(settings.TRAP_RETENTION_AGE),
+            "--db", str(settings.TRAPS_DB_FILE),
+            "--store-max-rows", str(settings.TRAP_STORE_MAX_ROWS),
+            "--stream-port", str(settings.TRAP_STREAM_PORT),
+            "--stats-file", str(settings.TRAP_STATS_FILE),
+            "--stats-interval", str(settings.TRAP_STATS_INTERVAL)
         ]
         
+        # Stats of a previous run would pass for this one's until it writes its own
+        try:
+            os.remove(settings.TRAP_STATS_FILE)
+        except FileNotFoundError:
+            pass
+        
         self.process = subprocess.Popen(
             cmd,
             cwd=settings.BASE_DIR,
@@ -41,9 +95,10 @@ class TrapManager:
     def stop(self):
         if self.process:
             if self.process.poll() is None:
+                # SIGTERM lets the receiver drain its write buffer
                 self.process.terminate()
                 try:
-                    self.process.wait(timeout=2)
+                    self.process.wait(timeout=5)
                 except subprocess.TimeoutExpired:
                     self.process.kill()
             self.process = None
@@ -59,24 +114,61 @@ class TrapManager:
             "resolve_mibs": self.resolve_mibs if running else None
         }
     
+    def get_stats(self):
+        """
+        Receiver counters (resolution cache, log writer, stream) from the
+        snapshot it writes every TRAP_STATS_INTERVAL seconds, or None if it
+        has not written one
+        """
+        try:
+            with open(settings.TRAP_STATS_FILE) as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            return None
+        stats["age"] = round(time.time() - stats.get("updated", 0), 1)
+        return stats
+    
     def get_traps(self, limit=50):
+        return self.query_traps(limit=limit)["data"]
+    
+    def query_traps(self, limit=50, source=None, trap_type=None, since=None, until=None, cursor=None):
+        """
+        Filtered, cursor-paginated traps from the indexed store, newest first.
+        Without the store only an unfiltered first page can be answered (from
+        the log); filters or a cursor raise TrapStoreUnavailable instead.
+        """
+        try:
+            data, next_cursor = self.store.query(
+                limit=limit, source=source, trap_type=trap_type,
+                since=since, until=until, cursor=cursor
+            )
+            return {"data": data, "next_cursor": next_cursor}
+        except Exception as e:
+            logger.error(f"Trap store query failed: {e}")
+            if source or trap_type or any(v is not None for v in (since, until, cursor)):
+                raise TrapStoreUnavailable(f"Trap store unavailable: {e}")
+        
+        # Store unavailable: unfiltered tail of the segmented log
         data = []
-        if not os.path.exists(self.log_file):
-            return []
         try:
-            with open(self.log_file, 'r') as f:
-                lines = f.readlines()
-                for line in reversed(lines[-limit:]):
-                    if line.strip():
-                        try:
-                            data.append(json.loads(line))
-                        except: 
-                            pass
+            for line in reversed(self.trap_log.tail(limit)):
+                if line.strip():
+                    try:
+                        data.append(json.loads(line))
+                    except: 
+                        pass
         except Exception:
             pass
-        return data
+        return {"data": data, "next_cursor": None}
+    
+    def count_traps(self, source=None, trap_type=None, since=None, until=None):
+        try:
+            return self.store.count(source=source, trap_type=trap_type, since=since, until=until)
+        except Exception as e:
+            raise TrapStoreUnavailable(f"Trap store unavailable: {e}")
     
     def clear_traps(self):
-        open(self.log_file, 'w').close()
+        self.trap_log.clear()
+        self.store.clear()
 
 trap_manager = TrapManager()
@@ -0,0 +1,218 @@
+import os
+import json
+import sqlite3
+import logging
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS traps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp REAL NOT NULL,
+    source TEXT NOT NULL,
+    source_host TEXT NOT NULL,
+    trap_type TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_traps_timestamp ON traps (timestamp);
+CREATE INDEX IF NOT EXISTS idx_traps_source ON traps (source, id);
+CREATE INDEX IF NOT EXISTS idx_traps_source_host ON traps (source_host, id);
+CREATE INDEX IF NOT EXISTS idx_traps_trap_type ON traps (trap_type, id);
+"""
+
+class TrapStore:
+    """
+    Indexed trap store backed by SQLite in WAL mode.
+
+    The trap receiver is the only writer; the API opens short-lived read
+    connections, which WAL lets run concurrently with inserts. Results are
+    returned newest first and paginated with an id cursor.
+
+    Only writer connections set up WAL and the schema. Read connections
+    open the file read-only, so a GET takes no write lock, and they fail
+    if the store has not been created yet.
+    """
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Writer connection: creates the store and its schema if needed"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        return conn
+
+    def connect_read(self) -> sqlite3.Connection:
+        """Read-only connection, with no schema or journal setup"""
+        uri = Path(self.path).absolute().as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, timeout=10)
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    # ==================== Writing ====================
+
+    def insert_many(self, records: Iterable[Tuple[dict, str]]):
+        """Insert (record, serialized_record) pairs in a single transaction"""
+        if self._conn is None:
+            self._conn = self.connect()
+
+        rows = []
+        for record, line in records:
+            source = record.get("source", "")
+            rows.append((
+                record.get("timestamp", 0),
+                source,
+                source.rsplit(":", 1)[0],
+                record.get("trap_type"),
+                line
+            ))
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO traps (timestamp, source, source_host, trap_type, record) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def prune(self, max_rows: int) -> int:
+        """Keep only the newest max_rows traps"""
+        if not max_rows or self._conn is None:
+            return 0
+        with self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM traps WHERE id <= (SELECT MAX(id) FROM traps) - ?", (max_rows,)
+            )
+        return cur.rowcount
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ==================== Reading ====================
+
+    @staticmethod
+    def _where(source=None, trap_type=None, since=None, until=None, cursor=None):
+        clauses, params = [], []
+
+        if source:
+            # "host:port" matches one sender socket, a bare host matches all its ports
+            clauses.append("source = ?" if ":" in source else "source_host = ?")
+            params.append(source)
+        if trap_type:
+            clauses.append("trap_type = ?")
+            params.append(trap_type)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(cursor)
+
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query(self, limit: int = 50, source: str = None, trap_type: str = None,
+              since: float = None, until: float = None, cursor: int = None) -> Tuple[List[dict], Optional[int]]:
+        """Return (traps newest first, cursor for the next page or None)"""
+        if limit <= 0:
+            return [], None
+
+        where, params = self._where(source, trap_type, since, until, cursor)
+        conn = self.connect_read()
+        try:
+            rows = conn.execute(
+                f"SELECT id, record FROM traps{where} ORDER BY id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+        finally:
+            conn.close()
+
+        data = []
+        for trap_id, line in rows[:limit]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            record["id"] = trap_id
+            data.append(record)
+
+        next_cursor = rows[limit - 1][0] if len(rows) > limit else None
+        return data, next_cursor
+
+    def count(self, source: str = None, trap_type: str = None,
+              since: float = None, until: float = None) -> int:
+        where, params = self._where(source, trap_type, since, until)
+        conn = self.connect_read()
+        try:
+            return conn.execute(f"SELECT COUNT(*) FROM traps{where}", params).fetchone()[0]
+        finally:
+            conn.close()
+
+    def clear(self):
+        conn = self.connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM traps")
+        finally:
+            conn.close()
+
+    def backfill(self, lines: Iterable[str], batch_size: int = 5000) -> int:
+        """
+        Create the store from JSONL trap records (oldest first). The import
+        is built in a side file that replaces the store only once complete,
+        so an interrupted import leaves no store and is simply redone.
+        """
+        staging = TrapStore(self.path + ".import")
+        staging.remove_files()
+        try:
+            staging._conn = staging.connect()
+            imported = 0
+            batch = []
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                batch.append((record, line))
+                if len(batch) >= batch_size:
+                    staging.insert_many(batch)
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                staging.insert_many(batch)
+                imported += len(batch)
+            # Closing the last connection checkpoints the WAL into the file
+            staging.close()
+        except BaseException:
+            staging.close()
+            staging.remove_files()
+            raise
+
+        if self.exists:
+            # A writer created the store meanwhile; keep what it has
+            logger.warning(f"{self.path} appeared during the import, discarding the {imported} imported traps")
+            staging.remove_files()
+            return 0
+        os.replace(staging.path, self.path)
+        return imported
+
+    def remove_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(self.path + suffix)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,122 @@
+import json
+import socket
+import asyncio
+import logging
+import itertools
+from typing import Dict, Optional
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Largest trap record that fits in one loopback datagram
+MAX_DATAGRAM = 65507
+
+class TrapPublisher:
+    """
+    Fire-and-forget sender used by the trap receiver process.
+    Each record goes out as one JSON datagram on loopback; nothing blocks
+    and nothing fails if no API process is listening.
+    """
+
+    def __init__(self, port: int, host: str = "127.0.0.1"):
+        self.address = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, record: dict):
+        payload = json.dumps(record).encode()
+        if len(payload) > MAX_DATAGRAM:
+            self.dropped += 1
+            return
+        try:
+            self.sock.sendto(payload, self.address)
+            self.published += 1
+        except OSError:
+            # Socket buffer full or nobody listening
+            self.dropped += 1
+
+    def close(self):
+        self.sock.close()
+
+class Subscriber:
+    """One streaming client with its own bounded queue"""
+
+    def __init__(self, sub_id: int, queue_size: int):
+        self.id = sub_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=queue_size)
+        self.delivered = 0
+        self.dropped = 0
+
+    def offer(self, payload: str):
+        # Slow client: discard its oldest pending trap rather than block others
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(payload)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "pending": self.queue.qsize(),
+            "delivered": self.delivered,
+            "dropped": self.dropped
+        }
+
+class TrapBroadcaster(asyncio.DatagramProtocol):
+    """
+    Receives trap records published by the receiver process and fans them
+    out to every subscribed streaming client. The listener is started on
+    the first subscription.
+    """
+
+    def __init__(self, port: int, queue_size: int = 256):
+        self.port = port
+        self.queue_size = queue_size
+        self.subscribers: Dict[int, Subscriber] = {}
+        self._ids = itertools.count(1)
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+        self.received = 0
+
+    async def ensure_started(self):
+        # Created lazily so it binds to the server's event loop
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._transport is not None:
+                return
+            loop = asyncio.get_running_loop()
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: self, local_addr=("127.0.0.1", self.port)
+            )
+            logger.info(f"Trap stream listening on 127.0.0.1:{self.port}")
+
+    def datagram_received(self, data, addr):
+        self.received += 1
+        payload = data.decode("utf-8", errors="replace")
+        for subscriber in list(self.subscribers.values()):
+            subscriber.offer(payload)
+
+    def subscribe(self) -> Subscriber:
+        subscriber = Subscriber(next(self._ids), self.queue_size)
+        self.subscribers[subscriber.id] = subscriber
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self.subscribers.pop(subscriber.id, None)
+
+    def get_stats(self) -> dict:
+        return {
+            "listening": self._transport is not None,
+            "received": self.received,
+            "subscribers": [s.to_dict() for s in self.subscribers.values()]
+        }
+
+trap_broadcaster = TrapBroadcaster(settings.TRAP_STREAM_PORT, settings.TRAP_STREAM_QUEUE_SIZE)
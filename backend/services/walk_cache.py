@@ -0,0 +1,137 @@
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class WalkCache:
+    """
+    TTL + LRU cache for walk results with request coalescing.
+
+    Identical walks issued while one is already running wait for that one
+    instead of walking the agent again. Only successful results are stored.
+    The cache is bounded both by entry count and by the total number of
+    rows held, whichever is hit first.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256, max_rows: int = 0):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._entries: "OrderedDict[tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._rows = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(target, port, community, oid, use_mibs, parse) -> tuple:
+        # The community string is a credential; keep only a digest of it
+        community_hash = hashlib.sha256(str(community).encode()).hexdigest()[:16]
+        return (str(target).strip(), int(port), community_hash, str(oid).strip(), bool(use_mibs), bool(parse))
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0
+
+    async def get_or_run(self, key: tuple, run: Callable[[], Awaitable[Tuple[Any, int]]],
+                         mode: str = "use") -> Tuple[Any, str]:
+        """
+        Return (result, status). `run` returns (result, rows); status is hit,
+        miss, coalesced or bypass.
+
+        mode "use" serves a fresh cached result when there is one, "refresh"
+        always walks and stores the new result, "bypass" neither reads nor
+        writes the cache.
+        """
+        if mode == "bypass" or not self.enabled:
+            result, _ = await run()
+            return result, "bypass"
+
+        if mode != "refresh":
+            cached = self._get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached, "hit"
+
+            pending = self._inflight.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                result, _ = await asyncio.shield(pending)
+                return result, "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(run())
+        self._inflight[key] = task
+        try:
+            result, rows = await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+
+        self._put(key, result, rows)
+        return result, "miss"
+
+    def _get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires, rows, result = entry
+        if time.monotonic() >= expires:
+            self._remove(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def _put(self, key: tuple, result, rows: int):
+        if self.max_rows and rows > self.max_rows:
+            # Would evict everything else and still not fit
+            return
+
+        self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, rows, result)
+        self._rows += rows
+
+        while self._entries and (len(self._entries) > self.max_entries or
+                                 (self.max_rows and self._rows > self.max_rows)):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._rows -= entry[1]
+
+    def clear(self):
+        """Drop all cached results"""
+        self._entries.clear()
+        self._rows = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "rows": self._rows,
+            "max_rows": self.max_rows,
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0
+        }
+
+walk_cache = WalkCache(settings.WALK_CACHE_TTL, settings.WALK_CACHE_MAX_ENTRIES, settings.WALK_CACHE_MAX_ROWS)
@@ -0,0 +1,76 @@
+import time
+import asyncio
+import logging
+from collections import defaultdict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class TokenBucket:
+    """Async token bucket: `rate` acquisitions per second, bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class WalkScheduler:
+    """
+    Runs walk jobs with bounded concurrency.
+
+    At most `concurrency` jobs run at once overall and at most
+    `host_concurrency` against the same host. With `host_rate` set, SNMP
+    requests to one host are also paced to that many per second. A job
+    waiting on a busy host does not hold one of the global slots.
+    """
+
+    def __init__(self, concurrency: int, host_concurrency: int = 1, host_rate: float = 0):
+        self._slots = asyncio.Semaphore(max(1, concurrency))
+        self._host_slots: Dict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(max(1, host_concurrency))
+        )
+        self.host_rate = host_rate
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def throttle(self, host: str) -> Optional[Callable[[], Awaitable[None]]]:
+        """Per-request pacing hook for `host`, or None when unlimited"""
+        if not self.host_rate or self.host_rate <= 0:
+            return None
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.host_rate)
+        return self._buckets[host].acquire
+
+    async def _run_one(self, job: T, host: str, worker: Callable[[T, Optional[Callable]], Awaitable[R]]) -> R:
+        async with self._host_slots[host]:
+            async with self._slots:
+                return await worker(job, self.throttle(host))
+
+    async def run(self, jobs: Iterable[T], host_of: Callable[[T], str],
+                  worker: Callable[[T, Optional[Callable]], Awaitable[R]]) -> AsyncIterator[R]:
+        """Yield worker results in completion order. Pending jobs are cancelled if the caller stops early."""
+        tasks = [
+            asyncio.ensure_future(self._run_one(job, host_of(job), worker))
+            for job in jobs
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,10 +1,23 @@
 import sys
 import os
+import gc
+import signal
 import random
 import json
 import logging
 import asyncio
 import argparse
+import bisect
+import ipaddress
+import socket
+import math
+import time
+import zlib
+import mmap
+import struct
+import hashlib
+import itertools
+from array import array
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,8 +25,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from pysnmp.entity import engine, config
 from pysnmp.entity.rfc3413 import cmdrsp, context
 from pysnmp.carrier.asyncio.dgram import udp
-from pysnmp.smi import builder, compiler
 from pysnmp.proto.api import v2c
+from pyasn1.type import univ
+from pyasn1.codec.ber import encoder, decoder
+from services.mib_cache import MibCache
+from core.config import settings
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -22,22 +38,128 @@ HIDE_DEPRECATED = True
 HIDE_NOT_ACCESSIBLE = True 
 SYSTEM_MIB_DIR = "/usr/share/snmp/mibs"
 
+# Bytes reserved in a GETBULK response for message/PDU headers, and the
+# slack added to each varbind's size estimate
+BULK_PDU_OVERHEAD = 64
+VARBIND_SIZE_MARGIN = 2
+
+OID_TYPE_HINTS = ("Oid", "ObjectIdentifier", "AutonomousType")
+
+def syntax_kind(type_name):
+    """Value kind for a syntax class name, in the order the substring checks must apply"""
+    if any(x in type_name for x in OID_TYPE_HINTS): return "oid"
+    if "Integer" in type_name: return "integer"
+    if "Unsigned" in type_name: return "unsigned"
+    if "Gauge" in type_name: return "gauge"
+    if "Counter64" in type_name: return "counter64"
+    if "Counter" in type_name: return "counter32"
+    if "TimeTicks" in type_name: return "timeticks"
+    if "IpAddress" in type_name: return "ipaddress"
+    if "PhysAddress" in type_name or "MacAddress" in type_name: return "macaddress"
+    if "String" in type_name: return "string"
+    return "other"
+
+class PooledValues:
+    """Values from a small domain, built once as ready SNMP objects"""
+
+    def __init__(self, build):
+        self._build = build
+        self._pool = None
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            self._pool = self._build()
+        return self._pool
+
+    def batch(self, count):
+        pool = self.pool
+        if len(pool) == 1:
+            return pool * count
+        return random.choices(pool, k=count)
+
+    def at(self, seed):
+        pool = self.pool
+        return pool[seed % len(pool)]
+
+class RangedValues:
+    """Integers in [low, high] wrapped in an SNMP type on demand"""
+
+    def __init__(self, cls, low, high):
+        self.cls = cls
+        self.low = low
+        self.values = range(low, high + 1)
+
+    def batch(self, count):
+        cls = self.cls
+        return [cls(v) for v in random.choices(self.values, k=count)]
+
+    def at(self, seed):
+        return self.cls(self.low + seed % len(self.values))
+
+class MacValues:
+    def batch(self, count):
+        bits = random.getrandbits(48 * count).to_bytes(6 * count, "big") if count else b""
+        return [v2c.OctetString(bits[i:i + 6]) for i in range(0, len(bits), 6)]
+
+    def at(self, seed):
+        return v2c.OctetString((seed & 0xFFFFFFFFFFFF).to_bytes(6, "big"))
+
 class MibDataGenerator:
+    """
+    Random and custom values for MIB objects.
+
+    The syntax class is classified once and mapped to a value source.
+    `batch(count)` draws random values in one go (small domains are a
+    pool of ready SNMP objects sampled with random.choices; large ones
+    draw all their numbers in one call before wrapping them), `at(seed)`
+    gives the value for a seed, used for table rows built on demand.
+    """
+
+    def __init__(self):
+        self._kinds = {}
+        self._sources = {
+            "oid": PooledValues(lambda: [v2c.ObjectIdentifier(f"1.3.6.1.2.1.{i}") for i in range(1, 101)]),
+            "integer": PooledValues(lambda: [v2c.Integer32(i) for i in range(1, 101)]),
+            "unsigned": PooledValues(lambda: [v2c.Unsigned32(i) for i in range(1, 10001)]),
+            "gauge": PooledValues(lambda: [v2c.Gauge32(i) for i in range(1, 101)]),
+            "counter64": RangedValues(v2c.Counter64, 1000000, 999999999),
+            "counter32": RangedValues(v2c.Counter32, 1000, 999999),
+            "timeticks": RangedValues(v2c.TimeTicks, 0, 5000000),
+            "ipaddress": PooledValues(lambda: [v2c.IpAddress("127.0.0.1")]),
+            "macaddress": MacValues(),
+            "string": PooledValues(lambda: [v2c.OctetString(f"Sim-{i}") for i in range(1, 100)]),
+            "other": PooledValues(lambda: [v2c.Integer32(0)])
+        }
+
+    def kind_of(self, syntax_obj):
+        cls = syntax_obj.__class__
+        kind = self._kinds.get(cls)
+        if kind is None:
+            kind = self._kinds[cls] = syntax_kind(cls.__name__)
+        return kind
+
+    def source_for(self, syntax_obj):
+        """Value source (batch/at) for this syntax"""
+        return self._sources[self.kind_of(syntax_obj)]
+
+    def get_values(self, syntax_obj, count):
+        return self.source_for(syntax_obj).batch(count)
 
     def get_value(self, syntax_obj, custom_val=None):
         # 1. Custom Value
         if custom_val is not None:
             try:
-                type_name = syntax_obj.__class__.__name__
-                if "Integer" in type_name: return v2c.Integer32(int(custom_val))
-                elif "Unsigned" in type_name: return v2c.Unsigned32(int(custom_val))
-                elif "Gauge" in type_name: return v2c.Gauge32(int(custom_val))
-                elif "Counter64" in type_name: return v2c.Counter64(int(custom_val))
-                elif "Counter" in type_name: return v2c.Counter32(int(custom_val))
-                elif "String" in type_name: return v2c.OctetString(str(custom_val))
-                elif "IpAddress" in type_name: return v2c.IpAddress(str(custom_val))
-                elif any(x in type_name for x in ["Oid", "ObjectIdentifier", "AutonomousType"]):
-                    return v2c.ObjectIdentifier(str(custom_val))
+                kind = self.kind_of(syntax_obj)
+                if kind == "integer": return v2c.Integer32(int(custom_val))
+                elif kind == "unsigned": return v2c.Unsigned32(int(custom_val))
+                elif kind == "gauge": return v2c.Gauge32(int(custom_val))
+                elif kind == "counter64": return v2c.Counter64(int(custom_val))
+                elif kind == "counter32": return v2c.Counter32(int(custom_val))
+                elif kind == "string" or "String" in syntax_obj.__class__.__name__:
+                    return v2c.OctetString(str(custom_val))
+                elif kind == "ipaddress": return v2c.IpAddress(str(custom_val))
+                elif kind == "oid": return v2c.ObjectIdentifier(str(custom_val))
                 
                 # Try generic digit parsing if no type matched
                 if str(custom_val).isdigit(): return v2c.Integer32(int(custom_val))
@@ -46,61 +168,1050 @@ class MibDataGenerator:
 
         # 2. Random Fallback
         try:
-            type_name = syntax_obj.__class__.__name__
-
-            if any(x in type_name for x in ["Oid", "ObjectIdentifier", "AutonomousType"]):
-                return v2c.ObjectIdentifier(f"1.3.6.1.2.1.{random.randint(1,100)}")
-            elif "Integer" in type_name: return v2c.Integer32(random.randint(1, 100))
-            elif "Unsigned" in type_name: return v2c.Unsigned32(random.randint(1, 10000))
-            elif "Gauge" in type_name: return v2c.Gauge32(random.randint(1, 100))
-            elif "Counter64" in type_name: return v2c.Counter64(random.randint(1000000, 999999999))
-            elif "Counter" in type_name: return v2c.Counter32(random.randint(1000, 999999))
-            elif "TimeTicks" in type_name: return v2c.TimeTicks(random.randint(0, 5000000))
-            elif "IpAddress" in type_name: return v2c.IpAddress("127.0.0.1")
-            
-            # Handle PhysAddress/MacAddress
-            elif "PhysAddress" in type_name or "MacAddress" in type_name:
-                mac_bytes = bytes([random.randint(0, 255) for _ in range(6)])
-                return v2c.OctetString(mac_bytes)
-
-            elif "String" in type_name: return v2c.OctetString(f"Sim-{random.randint(1,99)}")
-            
-            else: return v2c.Integer32(0)
-        except: 
+            return self.source_for(syntax_obj).batch(1)[0]
+        except Exception:
             return v2c.Integer32(0)
 
+# ==================== Virtual Tables ====================
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+
+def mix_seed(a, b):
+    """splitmix64 of two integers: stable per-instance seed"""
+    z = (a * 0x9E3779B97F4A7C15 + b) & MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+class IntegerIndex:
+    """INTEGER index component: row n -> n"""
+    max_rows = 2 ** 31 - 1
+
+    def encode(self, row):
+        return (row,)
+
+    def value(self, row):
+        return row
+
+class IpAddressIndex:
+    """IpAddress index component: row n -> 10.x.y.z"""
+    max_rows = 2 ** 24 - 1
+
+    def encode(self, row):
+        return (10, (row >> 16) & 255, (row >> 8) & 255, row & 255)
+
+    def value(self, row):
+        return ".".join(map(str, self.encode(row)))
+
+class OctetIndex:
+    """OCTET STRING index component from fixed-width bytes, length-prefixed unless IMPLIED"""
+
+    def __init__(self, implied, width, render):
+        self.implied = implied
+        self.width = width
+        self.render = render
+        self.max_rows = 2 ** 31 - 1
+
+    def encode(self, row):
+        octets = tuple(self.render(row, self.width))
+        return octets if self.implied else (len(octets),) + octets
+
+    def value(self, row):
+        return self.render(row, self.width)
+
+class ObjectIdentifierIndex:
+    """OBJECT IDENTIFIER index component: row n -> 1.3.n"""
+    max_rows = 2 ** 31 - 1
+
+    def __init__(self, implied):
+        self.implied = implied
+
+    def encode(self, row):
+        return (1, 3, row) if self.implied else (3, 1, 3, row)
+
+    def value(self, row):
+        return f"1.3.{row}"
+
+def index_component(syntax_obj, implied, rows):
+    """
+    Codec for one INDEX component. Every codec maps row numbers to fixed
+    length, strictly increasing suffixes, so rows sort in OID order and a
+    suffix can be found again by binary search over row numbers.
+    """
+    type_name = syntax_obj.__class__.__name__
+    if isinstance(syntax_obj, v2c.IpAddress):
+        return IpAddressIndex()
+    if "PhysAddress" in type_name or "MacAddress" in type_name:
+        return OctetIndex(implied, 6, lambda row, width: row.to_bytes(width, "big"))
+    if isinstance(syntax_obj, univ.ObjectIdentifier):
+        return ObjectIdentifierIndex(implied)
+    if isinstance(syntax_obj, univ.OctetString):
+        return OctetIndex(implied, len(str(rows)), lambda row, width: f"row{row:0{width}d}".encode())
+    return IntegerIndex()
+
+class TableIndex:
+    """Row number <-> instance suffix for a table's INDEX clause"""
+
+    def __init__(self, components):
+        self.components = components or [IntegerIndex()]
+        self.max_rows = min(c.max_rows for c in self.components)
+
+    def encode(self, row):
+        if len(self.components) == 1:
+            return self.components[0].encode(row)
+        suffix = ()
+        for component in self.components:
+            suffix += component.encode(row)
+        return suffix
+
+    def first_row_at_or_after(self, suffix, rows):
+        """Smallest row whose suffix is >= `suffix` (rows + 1 if none)"""
+        lo, hi = 1, rows + 1
+        encode = self.encode
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if encode(mid) < suffix:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+class VirtualColumn:
+    """
+    One table column whose instances are produced when they are read.
+    Values are derived from a per-instance seed, so repeated reads agree
+    and no per-row state is kept.
+    """
+
+    __slots__ = ("oid", "rows", "index", "source", "seed", "index_value")
+
+    def __init__(self, oid, rows, index, source, seed, index_value=None):
+        self.oid = oid
+        self.rows = rows
+        self.index = index
+        self.source = source
+        self.seed = seed
+        self.index_value = index_value  # row -> value, for columns that are part of the INDEX
+
+    def instance(self, row):
+        return self.oid + self.index.encode(row)
+
+    def value(self, row, salt=0):
+        if self.index_value is not None:
+            return self.index_value(row)
+        return self.source.at(mix_seed(self.seed ^ salt, row))
+
+    def find_row(self, suffix):
+        """Row number for an exact instance suffix, or None"""
+        row = self.index.first_row_at_or_after(suffix, self.rows)
+        if row <= self.rows and self.index.encode(row) == suffix:
+            return row
+        return None
+
+    def first_row_after(self, suffix):
+        row = self.index.first_row_at_or_after(suffix, self.rows)
+        if row <= self.rows and self.index.encode(row) == suffix:
+            row += 1
+        return row
+
+# ==================== Dynamic Values ====================
+
+# Dynamic values are measured from simulator start, which is also what sysUpTime reports
+STARTED = time.monotonic()
+
+SYS_UPTIME_OID = (1, 3, 6, 1, 2, 1, 1, 3, 0)
+
+def elapsed():
+    return time.monotonic() - STARTED
+
+def unit_float(h):
+    """[0, 1) from the top 53 bits of a 64-bit hash"""
+    return (h >> 11) / 9007199254740992.0
+
+def seeded_normal(h):
+    """Standard normal deviate from a 64-bit hash (Box-Muller)"""
+    u1 = ((h >> 32) + 1) / 4294967296.0
+    u2 = (h & 0xFFFFFFFF) / 4294967296.0
+    return math.sqrt(-2.0 * math.log(u1)) * math.cos(2.0 * math.pi * u2)
+
+def walk_position(seed, tick):
+    """
+    Position after `tick` steps of a Gaussian random walk (unit variance
+    per step) fixed by `seed`, in O(log tick) without stored state: the
+    path is pinned at powers of two by independent increments, then
+    bisected with Brownian-bridge midpoints down to `tick`.
+    """
+    if tick <= 0:
+        return 0.0
+    lo, w_lo = 0, 0.0
+    hi, w_hi = 1, seeded_normal(mix_seed(seed, 0))
+    while hi < tick:
+        lo, w_lo = hi, w_hi
+        w_hi += seeded_normal(mix_seed(seed + 1, hi)) * math.sqrt(hi)
+        hi *= 2
+    # [lo, hi] has power-of-two length, so the midpoint deviation halves in variance per level
+    scale = math.sqrt(hi - lo) / 2
+    while hi - lo > 1:
+        mid = (lo + hi) >> 1
+        w_mid = (w_lo + w_hi) / 2 + seeded_normal(mix_seed(seed, (lo << 32) | hi)) * scale
+        if tick <= mid:
+            hi, w_hi = mid, w_mid
+        else:
+            lo, w_lo = mid, w_mid
+        scale *= 0.7071067811865476
+    return w_hi if tick == hi else w_lo
+
+class CounterValues:
+    """Counters rising at `rate`/s (per instance within +-`spread`), wrapping at `wrap`"""
+
+    def __init__(self, cls, rate, spread, wrap, start=None):
+        self.cls = cls
+        self.rate = float(rate)
+        self.spread = min(max(float(spread), 0.0), 1.0)
+        self.wrap = int(wrap)
+        self.start = start
+
+    def at(self, seed):
+        rate = self.rate * (1.0 + self.spread * (2.0 * unit_float(seed) - 1.0))
+        start = seed % min(self.wrap, 2 ** 32) if self.start is None else int(self.start)
+        return self.cls(int(start + rate * elapsed()) % self.wrap)
+
+    def to_spec(self):
+        return {"type": "counter", "cls": self.cls.__name__, "rate": self.rate, "spread": self.spread,
+                "wrap": self.wrap, "start": self.start}
+
+class RandomWalkValues:
+    """Gauges taking a random step of std dev `step` every `interval` seconds, reflected into [low, high]"""
+
+    def __init__(self, cls, low, high, step, interval):
+        self.cls = cls
+        self.low = int(low)
+        self.span = max(int(high) - self.low, 1)
+        self.step = float(step)
+        self.interval = max(float(interval), 0.001)
+
+    def at(self, seed):
+        start = seed % (self.span + 1)
+        x = (start + self.step * walk_position(seed, int(elapsed() / self.interval))) % (2 * self.span)
+        if x > self.span:
+            x = 2 * self.span - x
+        return self.cls(self.low + int(round(x)))
+
+    def to_spec(self):
+        return {"type": "gauge", "cls": self.cls.__name__, "min": self.low, "max": self.low + self.span,
+                "step": self.step, "interval": self.interval}
+
+class UptimeValues:
+    """TimeTicks since simulator start, plus `offset` ticks"""
+
+    def __init__(self, offset=0):
+        self.offset = int(offset)
+
+    def at(self, seed):
+        return v2c.TimeTicks((self.offset + int(elapsed() * 100)) % 2 ** 32)
+
+    def to_spec(self):
+        return {"type": "uptime", "offset": self.offset}
+
+class ReplayValues:
+    """
+    Recorded samples played back in a loop (or holding the last one):
+    `values` evenly `interval` seconds apart, or at the offsets in `times`
+    (seconds, e.g. the "t" of a /metrics/query series).
+    """
+
+    def __init__(self, values, interval=60, times=None, loop=True):
+        if not values:
+            raise ValueError("replay needs at least one sample")
+        self.values = values
+        if times:
+            if len(times) != len(values):
+                raise ValueError("replay times and samples differ in length")
+            self.offsets = [t - times[0] for t in times]
+            step = self.offsets[-1] / (len(times) - 1) if len(times) > 1 else float(interval)
+            self.duration = self.offsets[-1] + step
+        else:
+            self.offsets = [i * float(interval) for i in range(len(values))]
+            self.duration = len(values) * float(interval)
+        self.loop = loop
+
+    def at(self, seed):
+        t = elapsed()
+        t = t % self.duration if self.loop else t
+        return self.values[bisect.bisect_right(self.offsets, t) - 1]
+
+    def to_spec(self):
+        return {"type": "replay", "samples": [encode_value(v).hex() for v in self.values],
+                "times": self.offsets, "interval": self.duration - self.offsets[-1], "loop": self.loop}
+
+SOURCE_CLASSES = {cls.__name__: cls for cls in (v2c.Counter32, v2c.Counter64, v2c.Gauge32, v2c.Integer32)}
+
+def source_from_spec(spec):
+    """Rebuild a dynamic value source from its to_spec(), without the MIBs"""
+    behavior = spec["type"]
+    if behavior == "counter":
+        return CounterValues(SOURCE_CLASSES[spec["cls"]], spec["rate"], spec["spread"], spec["wrap"], spec["start"])
+    if behavior == "gauge":
+        return RandomWalkValues(SOURCE_CLASSES[spec["cls"]], spec["min"], spec["max"], spec["step"], spec["interval"])
+    if behavior == "uptime":
+        return UptimeValues(spec["offset"])
+    if behavior == "replay":
+        values = [decode_value(bytes.fromhex(v)) for v in spec["samples"]]
+        return ReplayValues(values, spec["interval"], spec["times"], spec["loop"])
+    raise ValueError(f"unknown type '{behavior}'")
+
+class DynamicValue:
+    """A static-store entry whose value comes from a dynamic source when it is read"""
+
+    __slots__ = ("source", "seed")
+
+    def __init__(self, source, seed):
+        self.source = source
+        self.seed = seed
+
+    def read(self, salt=0):
+        return self.source.at(self.seed ^ salt)
+
+class ValueBehaviors:
+    """
+    Which objects get dynamic values, from the behaviors config:
+
+        {"defaults": {"counter": {"rate": 100, "spread": 0.5}, "gauge": null, "uptime": true},
+         "objects": {"IF-MIB::ifInOctets": {"type": "counter", "rate": 125000, "wrap": 4294967296},
+                     "hrProcessorLoad": {"type": "gauge", "min": 0, "max": 100, "step": 5, "interval": 10},
+                     "MY-MIB::temp.1": {"type": "replay", "samples": [21, 22, 24], "interval": 60},
+                     "ifLastChange": {"type": "static"}}}
+
+    Objects are keyed "MODULE::object" or "object" for every instance, or
+    "MODULE::object.index" for one. Without an entry, counters rise at
+    the default rate, sysUpTime counts real time and gauges walk only if
+    a "gauge" default is given. Custom data values stay fixed.
+    """
+
+    DEFAULTS = {"counter": {"rate": 100, "spread": 0.5}, "gauge": None, "uptime": True}
+
+    def __init__(self, config=None, generator=None):
+        config = config or {}
+        self.defaults = dict(self.DEFAULTS, **config.get("defaults", {}))
+        self.objects = config.get("objects", {})
+        self.generator = generator or MibDataGenerator()
+        self.salt = random.getrandbits(64)
+
+    def seed_for(self, oid):
+        return mix_seed(self.salt, zlib.crc32(repr(tuple(oid)).encode()))
+
+    def dynamic(self, source, oid):
+        return DynamicValue(source, self.seed_for(oid))
+
+    @property
+    def instances(self):
+        """{"MODULE::object.index": spec} entries"""
+        return {k: v for k, v in self.objects.items() if "::" in k and "." in k.split("::", 1)[1]}
+
+    def instance_values(self, mib_symbols):
+        """(oid, DynamicValue) for the "MODULE::object.index" entries"""
+        for key, spec in self.instances.items():
+            resolved = resolve_custom_key(mib_symbols, key)
+            if resolved:
+                oid, symbol_obj = resolved
+                source = self.build(spec, symbol_obj.getSyntax(), key)
+                if source is not None:
+                    yield oid, self.dynamic(source, oid)
+
+    def uptime_value(self):
+        """sysUpTime.0 for agents without SNMPv2-MIB loaded, or None"""
+        return DynamicValue(UptimeValues(), 0) if self.defaults.get("uptime") else None
+
+    def source_for(self, module_name, symbol_name, syntax):
+        """Dynamic value source for every instance of an object, or None for generated static values"""
+        spec = self.objects.get(f"{module_name}::{symbol_name}", self.objects.get(symbol_name))
+        if spec is None:
+            spec = self._default_spec(symbol_name, self.generator.kind_of(syntax))
+        return self.build(spec, syntax, f"{module_name}::{symbol_name}")
+
+    def _default_spec(self, symbol_name, kind):
+        if symbol_name == "sysUpTime" and self.defaults.get("uptime"):
+            return {"type": "uptime"}
+        if kind in ("counter32", "counter64") and self.defaults.get("counter"):
+            return dict(self.defaults["counter"], type="counter")
+        if kind == "gauge" and self.defaults.get("gauge"):
+            return dict(self.defaults["gauge"], type="gauge")
+        return None
+
+    def build(self, spec, syntax, name=""):
+        if not spec or spec.get("type", "static") == "static":
+            return None
+        kind = self.generator.kind_of(syntax)
+        try:
+            return self._build(spec, syntax, kind)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Ignoring value behavior for {name}: {e}")
+            return None
+
+    def _build(self, spec, syntax, kind):
+        behavior = spec["type"]
+        if behavior == "counter":
+            cls = v2c.Counter64 if kind == "counter64" else v2c.Counter32
+            wrap = spec.get("wrap", 2 ** 64 if kind == "counter64" else 2 ** 32)
+            return CounterValues(cls, spec.get("rate", 100), spec.get("spread", 0), wrap, spec.get("start"))
+        if behavior == "gauge":
+            cls = v2c.Integer32 if kind == "integer" else v2c.Gauge32
+            return RandomWalkValues(cls, spec.get("min", 0), spec.get("max", 100),
+                                    spec.get("step", 1), spec.get("interval", 10))
+        if behavior == "uptime":
+            return UptimeValues(spec.get("offset", 0))
+        if behavior == "replay":
+            values = [self.generator.get_value(syntax, v) for v in spec.get("samples", [])]
+            return ReplayValues(values, spec.get("interval", 60), spec.get("times"), spec.get("loop", True))
+        raise ValueError(f"unknown type '{behavior}'")
+
+# ==================== Snapshot Store ====================
+
+SNAPSHOT_MAGIC = b"TSSNAP01"
+SNAPSHOT_HEADER = struct.Struct("<8sQQQQ")   # magic, instances, meta / packed OID / value bytes
+DYNAMIC_TAG = 0xFF                           # not a BER tag: a DynamicValue's source index and seed follow
+DYNAMIC_ENTRY = struct.Struct("<IQ")
+
+# The plain SNMP types are BER-coded here; anything else goes through pyasn1
+BER_TAGS = {
+    v2c.Integer32: 0x02, v2c.OctetString: 0x04, v2c.IpAddress: 0x40, v2c.Counter32: 0x41,
+    v2c.Gauge32: 0x42, v2c.Unsigned32: 0x42, v2c.TimeTicks: 0x43, v2c.Counter64: 0x46
+}
+BER_TYPES = {
+    0x02: v2c.Integer32, 0x04: v2c.OctetString, 0x40: v2c.IpAddress, 0x41: v2c.Counter32,
+    0x42: v2c.Gauge32, 0x43: v2c.TimeTicks, 0x44: v2c.Opaque, 0x46: v2c.Counter64
+}
+
+def encode_value(value):
+    tag = BER_TAGS.get(value.__class__)
+    if tag is None:
+        return encoder.encode(value)
+    if tag == 0x04 or tag == 0x40:
+        content = value.asOctets()
+    else:
+        n = int(value)
+        content = n.to_bytes((n + (n < 0)).bit_length() // 8 + 1, "big", signed=True)
+    size = len(content)
+    if size < 0x80:
+        return bytes((tag, size)) + content
+    length = size.to_bytes((size.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(length))) + length + content
+
+def decode_value(data):
+    cls = BER_TYPES.get(data[0])
+    if cls is None:
+        return decoder.decode(bytes(data))[0]
+    size, pos = data[1], 2
+    if size & 0x80:
+        pos += size & 0x7F
+        size = int.from_bytes(data[2:pos], "big")
+    content = data[pos:pos + size]
+    if cls is v2c.OctetString or cls is v2c.IpAddress or cls is v2c.Opaque:
+        return cls(content)
+    return cls(int.from_bytes(content, "big", signed=cls is v2c.Integer32))
+
+def pack_arc(arc):
+    if arc < 0x80:
+        return bytes((arc,))
+    if arc < 0x4000:
+        return (0x8000 | arc).to_bytes(2, "big")
+    if arc < 0x200000:
+        return (0xC00000 | arc).to_bytes(3, "big")
+    if arc < 0x10000000:
+        return (0xE0000000 | arc).to_bytes(4, "big")
+    return b"\xf0" + arc.to_bytes(4, "big")
+
+SMALL_ARCS = [pack_arc(arc) for arc in range(0x4000)]
+
+def pack_oid(oid):
+    """
+    OID as bytes that sort like the tuples: each arc takes 1 to 5 bytes
+    and its first byte gives the length, so larger arcs sort after
+    smaller ones of any length. Arcs below 128, most of them, take one.
+    """
+    small = SMALL_ARCS
+    return b"".join([small[arc] if arc < 0x4000 else pack_arc(arc) for arc in oid])
+
+def unpack_oid(packed):
+    if not packed or max(packed) < 0x80:
+        return tuple(packed)
+    arcs = []
+    i, n = 0, len(packed)
+    while i < n:
+        b = packed[i]
+        if b < 0x80:
+            arcs.append(b)
+            i += 1
+        elif b < 0xC0:
+            arcs.append(((b & 0x3F) << 8) | packed[i + 1])
+            i += 2
+        elif b < 0xE0:
+            arcs.append(int.from_bytes(packed[i:i + 3], "big") & 0x1FFFFF)
+            i += 3
+        elif b < 0xF0:
+            arcs.append(int.from_bytes(packed[i:i + 4], "big") & 0x0FFFFFFF)
+            i += 4
+        else:
+            arcs.append(int.from_bytes(packed[i + 1:i + 5], "big"))
+            i += 5
+    return tuple(arcs)
+
+def write_snapshot(path, data_store, fingerprint, info=None):
+    """Write a static store as a snapshot file, replacing `path` atomically. Returns the file size."""
+    oids = sorted(data_store)
+    packed, values = [], []
+    sources, specs = {}, []
+    small = SMALL_ARCS
+    prefix, packed_prefix = None, b""
+    for oid in oids:
+        # Sorted neighbours mostly differ in the last arc only
+        if oid[:-1] != prefix:
+            prefix = oid[:-1]
+            packed_prefix = pack_oid(prefix)
+        arc = oid[-1]
+        packed.append(packed_prefix + (small[arc] if arc < 0x4000 else pack_arc(arc)))
+
+        value = data_store[oid]
+        if value.__class__ is DynamicValue:
+            index = sources.get(id(value.source))
+            if index is None:
+                index = sources[id(value.source)] = len(specs)
+                specs.append(value.source.to_spec())
+            values.append(bytes((DYNAMIC_TAG,)) + DYNAMIC_ENTRY.pack(index, value.seed))
+        else:
+            values.append(encode_value(value))
+
+    meta = json.dumps({"fingerprint": fingerprint, "info": info or {}, "sources": specs}).encode()
+    oid_offsets = array("Q", itertools.accumulate(map(len, packed), initial=0))
+    value_offsets = array("Q", itertools.accumulate(map(len, values), initial=0))
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, len(oids), len(meta), oid_offsets[-1], value_offsets[-1])
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(meta)
+        f.write(b"\0" * (-(len(header) + len(meta)) % 8))
+        f.write(oid_offsets.tobytes())
+        f.write(value_offsets.tobytes())
+        f.write(b"".join(packed))
+        f.write(b"".join(values))
+        size = f.tell()
+    os.replace(tmp_path, path)
+    logger.info(f"Wrote snapshot of {len(oids)} OID instances ({size} bytes) to {path}")
+    return size
+
+class SnapshotOids:
+    """The sorted OIDs of a SnapshotStore as a sequence of tuples"""
+
+    __slots__ = ("store",)
+
+    def __init__(self, store):
+        self.store = store
+
+    def __len__(self):
+        return self.store.count
+
+    def __getitem__(self, i):
+        return self.store.oid_at(i)
+
+    def bisect_right(self, oid):
+        return self.store.bisect_right(pack_oid(oid))
+
+class SnapshotStore:
+    """
+    Read-only static store in a memory-mapped snapshot file:
+
+        header | meta (JSON) | OID offsets | value offsets | packed OIDs | BER values
+
+    Both offset arrays are count + 1 native uint64s. OIDs are sorted in
+    pack_oid form, so GET and GETNEXT binary-search the mapped bytes and
+    only build Python objects for the answer. A DynamicValue is stored as
+    DYNAMIC_TAG, the index of its source in the meta "sources" and its
+    seed. Pages come from the page cache, shared by worker processes and
+    only read in where requests land.
+    """
+
+    def __init__(self, path, mm, count, meta, index, oid_size):
+        self.path = path
+        self.count = count
+        self.size = len(mm)
+        self.fingerprint = meta.get("fingerprint")
+        self.info = meta.get("info", {})
+        self.sources = [source_from_spec(spec) for spec in meta.get("sources", [])]
+        self.oids = SnapshotOids(self)
+
+        self._mm = mm
+        view = memoryview(mm)
+        width = 8 * (count + 1)
+        self._oid_offsets = view[index:index + width].cast("Q")
+        self._value_offsets = view[index + width:index + 2 * width].cast("Q")
+        self._oid_base = index + 2 * width
+        self._value_base = self._oid_base + oid_size
+
+    @classmethod
+    def open(cls, path, fingerprint=None):
+        """The snapshot at path, or None if it is missing, damaged or (given a fingerprint) made from other inputs"""
+        try:
+            with open(path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            magic, count, meta_size, oid_size, value_size = SNAPSHOT_HEADER.unpack_from(mm, 0)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError("not a simulator snapshot")
+            start = SNAPSHOT_HEADER.size
+            meta = json.loads(mm[start:start + meta_size])
+            if fingerprint is not None and meta.get("fingerprint") != fingerprint:
+                mm.close()
+                return None
+            index = start + meta_size + (-(start + meta_size) % 8)
+            if index + 16 * (count + 1) + oid_size + value_size != len(mm):
+                raise ValueError("truncated")
+            return cls(path, mm, count, meta, index, oid_size)
+        except (struct.error, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring snapshot {path}: {e}")
+            mm.close()
+            return None
+
+    def _packed(self, i):
+        base, offsets = self._oid_base, self._oid_offsets
+        return self._mm[base + offsets[i]:base + offsets[i + 1]]
+
+    def bisect_left(self, packed):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if self._packed(mid) < packed:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, packed):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if packed < self._packed(mid):
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def index(self, oid):
+        """Position of oid, or -1"""
+        packed = pack_oid(oid)
+        i = self.bisect_left(packed)
+        return i if i < self.count and self._packed(i) == packed else -1
+
+    def oid_at(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        return unpack_oid(self._packed(i))
+
+    def value_at(self, i):
+        base, offsets = self._value_base, self._value_offsets
+        data = self._mm[base + offsets[i]:base + offsets[i + 1]]
+        if data[0] == DYNAMIC_TAG:
+            source, seed = DYNAMIC_ENTRY.unpack_from(data, 1)
+            return DynamicValue(self.sources[source], seed)
+        return decode_value(data)
+
+    def get(self, oid, default=None):
+        i = self.index(oid)
+        return default if i < 0 else self.value_at(i)
+
+    def __getitem__(self, oid):
+        i = self.index(oid)
+        if i < 0:
+            raise KeyError(oid)
+        return self.value_at(i)
+
+    def __contains__(self, oid):
+        return self.index(oid) >= 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return (self.oid_at(i) for i in range(self.count))
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        return ((self.oid_at(i), self.value_at(i)) for i in range(self.count))
+
+class RequestStats:
+    """SNMP requests answered by this process"""
+
+    __slots__ = ("get", "getnext", "getbulk", "varbinds")
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+request_stats = RequestStats()
+
+def sorted_keys(store):
+    """Sorted OIDs of a static store, as a list or (for a snapshot) a view of its index"""
+    return store.oids if store.__class__ is SnapshotStore else sorted(store.keys())
+
+# Marks an instance of the snapshot deleted by a live edit
+REMOVED = object()
+
 class MockController:
-    def __init__(self, data_dict):
+    """
+    Answers GET/GETNEXT/GETBULK from the static store (scalars and custom
+    instances) merged with the virtual table columns. A static instance
+    overrides a virtual one at the same OID. DynamicValues are evaluated
+    as they are read.
+
+    With a `base`, this controller holds only its own instances and
+    serves everything else from the base (shared, never copied), with
+    `salt` giving it its own generated table and dynamic values.
+
+    The static store is a dict or a read-only SnapshotStore. Live changes
+    to a snapshot go into `edits`, a small overlay of new values and
+    REMOVED markers that is searched before the snapshot, so an edit
+    costs O(log n) however large the store is.
+    """
+
+    def __init__(self, data_dict, columns=(), base=None, salt=0):
+        self.db = data_dict
+        self.sorted_oids = sorted_keys(data_dict)
+        self.columns = sorted(columns, key=lambda c: c.oid)
+        self._column_oids = [c.oid for c in self.columns]
+        self.base = base
+        self.salt = salt
+
+        self.edits = {}
+        self._edit_oids = []
+        self._edit_delta = 0
+
+    # ==================== Live Updates ====================
+
+    @property
+    def instances(self):
+        """Number of static instances, live edits included"""
+        return len(self.db) + self._edit_delta
+
+    def set(self, oid, value):
+        """Add or replace a static instance: O(log n) search plus a list insert for new OIDs"""
+        oid = tuple(oid)
+        if self.db.__class__ is SnapshotStore:
+            previous = self.edits.get(oid)
+            if previous is None:
+                bisect.insort(self._edit_oids, oid)
+                if oid not in self.db:
+                    self._edit_delta += 1
+            elif previous is REMOVED:
+                self._edit_delta += 1
+            self.edits[oid] = value
+            return
+        if oid not in self.db:
+            bisect.insort(self.sorted_oids, oid)
+        self.db[oid] = value
+
+    def remove(self, oid):
+        oid = tuple(oid)
+        if self.db.__class__ is SnapshotStore:
+            previous = self.edits.get(oid)
+            if previous is REMOVED:
+                return
+            if oid in self.db:
+                if previous is None:
+                    bisect.insort(self._edit_oids, oid)
+                self.edits[oid] = REMOVED
+            elif previous is not None:
+                del self.edits[oid]
+                del self._edit_oids[bisect.bisect_left(self._edit_oids, oid)]
+            else:
+                return
+            self._edit_delta -= 1
+            return
+        if self.db.pop(oid, None) is not None:
+            del self.sorted_oids[bisect.bisect_left(self.sorted_oids, oid)]
+
+    def replace(self, data_dict, columns):
+        """Swap in a whole new store (dropping live edits) and/or set of table columns"""
+        if data_dict is not self.db:
+            self.sorted_oids = sorted_keys(data_dict)
+            self.edits, self._edit_oids, self._edit_delta = {}, [], 0
+        columns = sorted(columns, key=lambda c: c.oid)
         self.db = data_dict
-        self.sorted_oids = sorted(self.db.keys())
+        self.columns, self._column_oids = columns, [c.oid for c in columns]
+
+    # ==================== Lookups ====================
+
+    @staticmethod
+    def _resolve(value, salt):
+        return value.read(salt) if value.__class__ is DynamicValue else value
+
+    def _lookup(self, key, salt=None):
+        salt = self.salt if salt is None else salt
+        value = self.edits.get(key) if self.edits else None
+        if value is None:
+            value = self.db.get(key)
+        elif value is REMOVED:
+            value = None
+        if value is not None:
+            return self._resolve(value, salt)
+        if self.base is not None:
+            return self.base._lookup(key, salt)
+
+        pos = bisect.bisect_right(self._column_oids, key) - 1
+        if pos >= 0:
+            column = self.columns[pos]
+            if key[:len(column.oid)] == column.oid:
+                row = column.find_row(key[len(column.oid):])
+                if row is not None:
+                    return column.value(row, salt)
+        return None
+
+    def _virtual_after(self, oid, salt):
+        """Yield (oid, value) of virtual instances strictly after oid, in order"""
+        columns = self.columns
+        pos = bisect.bisect_right(self._column_oids, oid) - 1
+        row = 1
+        if pos < 0:
+            pos = 0
+        else:
+            column = columns[pos]
+            if oid[:len(column.oid)] == column.oid:
+                row = column.first_row_after(oid[len(column.oid):])
+            else:
+                pos += 1
+
+        while pos < len(columns):
+            column = columns[pos]
+            while row <= column.rows:
+                yield column.instance(row), column.value(row, salt)
+                row += 1
+            pos += 1
+            row = 1
+
+    def _static_after(self, oid):
+        """Yield (oid, stored value) of static instances strictly after oid, in order, live edits applied"""
+        static = self.sorted_oids
+        if static.__class__ is SnapshotOids:
+            i = static.bisect_right(oid)
+            value_at = self.db.value_at
+        else:
+            i = bisect.bisect_right(static, oid)
+            value_at = lambda j, db=self.db: db[static[j]]
+        count = len(static)
+
+        edit_oids = self._edit_oids
+        if not edit_oids:
+            while i < count:
+                i += 1
+                yield static[i - 1], value_at(i - 1)
+            return
+
+        edits = self.edits
+        j = bisect.bisect_right(edit_oids, oid)
+        while i < count or j < len(edit_oids):
+            key = static[i] if i < count else None
+            if j < len(edit_oids) and (key is None or edit_oids[j] <= key):
+                edited = edit_oids[j]
+                j += 1
+                if edited == key:
+                    i += 1
+                value = edits[edited]
+                if value is not REMOVED:
+                    yield edited, value
+                continue
+            i += 1
+            yield key, value_at(i - 1)
+
+    def _successors(self, oid, salt=None):
+        """Yield (oid, value) of every instance strictly after oid, in order"""
+        salt = self.salt if salt is None else salt
+        resolve = self._resolve
+        static = self._static_after(oid)
+        if self.base is not None:
+            lower = self.base._successors(oid, salt)
+        else:
+            lower = self._virtual_after(oid, salt) if self.columns else iter(())
+        found = next(static, None)
+        pending = next(lower, None)
+
+        while True:
+            if found is not None and (pending is None or found[0] <= pending[0]):
+                if pending is not None and found[0] == pending[0]:
+                    pending = next(lower, None)
+                yield found[0], resolve(found[1], salt)
+                found = next(static, None)
+                continue
+            if pending is None:
+                return
+            yield pending
+            pending = next(lower, None)
 
     def read_variables(self, *var_binds, **kwargs):
-        logger.debug(f"RX GET: {var_binds}")
+        logger.debug("RX GET: %s", var_binds)
         rsp = []
         for oid, val in var_binds:
-            key = tuple(oid)
-            if key in self.db:
-                rsp.append((v2c.ObjectIdentifier(oid), self.db[key]))
+            value = self._lookup(tuple(oid))
+            if value is not None:
+                rsp.append((v2c.ObjectIdentifier(oid), value))
             else:
                 rsp.append((v2c.ObjectIdentifier(oid), v2c.NoSuchObject()))
+        request_stats.get += 1
+        request_stats.varbinds += len(rsp)
         return rsp
 
+    def _successor(self, oid):
+        """Return the first (oid, value) strictly after oid, or None"""
+        return next(self._successors(oid), None)
+
     def read_next_variables(self, *var_binds, **kwargs):
-        logger.debug(f"RX WALK/NEXT: {var_binds}")
+        logger.debug("RX WALK/NEXT: %s", var_binds)
         rsp = []
         for oid, val in var_binds:
-            current_oid = tuple(oid)
-            next_oid = None
-            for db_oid in self.sorted_oids:
-                if db_oid > current_oid:
-                    next_oid = db_oid
-                    break
-            if next_oid:
-                rsp.append((v2c.ObjectIdentifier(next_oid), self.db[next_oid]))
+            found = self._successor(tuple(oid))
+            if found:
+                rsp.append((v2c.ObjectIdentifier(found[0]), found[1]))
             else:
                 rsp.append((v2c.ObjectIdentifier(oid), v2c.EndOfMibView()))
+        request_stats.getnext += 1
+        request_stats.varbinds += len(rsp)
         return rsp
 
+    def read_bulk_variables(self, non_repeaters, max_repetitions, var_binds, max_size=65507):
+        """
+        Answer a GETBULK in one pass over the instances.
+        Each repeater is positioned once and then advanced sequentially;
+        the response stops growing when max_size is reached.
+        """
+        logger.debug("RX BULK: N=%s M=%s %s", non_repeaters, max_repetitions, var_binds)
+        rsp = self._read_bulk(non_repeaters, max_repetitions, list(var_binds), max_size)
+        request_stats.getbulk += 1
+        request_stats.varbinds += len(rsp)
+        return rsp
+
+    def _read_bulk(self, non_repeaters, max_repetitions, var_binds, max_size):
+        non_repeaters = min(max(non_repeaters, 0), len(var_binds))
+        budget = max_size - BULK_PDU_OVERHEAD
+
+        rsp = []
+        for oid, val in var_binds[:non_repeaters]:
+            found = self._successor(tuple(oid))
+            if found:
+                var_bind = (v2c.ObjectIdentifier(found[0]), found[1])
+            else:
+                var_bind = (v2c.ObjectIdentifier(oid), v2c.EndOfMibView())
+            rsp.append(var_bind)
+            budget -= _encoded_size(found[0] if found else tuple(oid), var_bind[1])
+
+        repeaters = var_binds[non_repeaters:]
+        if not repeaters or max_repetitions <= 0:
+            return rsp
+
+        cursors = [self._successors(tuple(oid)) for oid, val in repeaters]
+        exhausted = [False] * len(repeaters)
+
+        for _ in range(max_repetitions):
+            for i, (oid, val) in enumerate(repeaters):
+                found = None if exhausted[i] else next(cursors[i], None)
+                if found:
+                    var_bind = (v2c.ObjectIdentifier(found[0]), found[1])
+                else:
+                    exhausted[i] = True
+                    var_bind = (v2c.ObjectIdentifier(oid), v2c.EndOfMibView())
+
+                budget -= _encoded_size(found[0] if found else tuple(oid), var_bind[1])
+                # Truncate at the PDU limit, but always answer with something
+                if budget < 0 and rsp:
+                    return rsp
+                rsp.append(var_bind)
+
+            # Nothing left to walk for any repeater
+            if all(exhausted):
+                break
+
+        return rsp
+
+def _ber_header(length):
+    """Tag plus definite length bytes"""
+    return 2 if length < 0x80 else 2 + (length.bit_length() + 7) // 8
+
+def _oid_content_size(arcs):
+    if len(arcs) < 2:
+        return 1
+    first = arcs[0] * 40 + arcs[1]
+    size = 1 if first < 0x80 else (first.bit_length() + 6) // 7
+    for arc in arcs[2:]:
+        size += 1 if arc < 0x80 else (arc.bit_length() + 6) // 7
+    return size
+
+def _encoded_size(oid, value):
+    """
+    Upper bound on the BER size of a varbind, computed from the OID arcs and
+    the value's type instead of encoding it (the response is encoded once,
+    later, by the engine). Includes the varbind SEQUENCE header.
+    """
+    size = _oid_content_size(oid)
+    size += _ber_header(size)
+
+    if isinstance(value, univ.Null) or not value.isValue:
+        # Null, EndOfMibView and the other exception values have no content
+        length = 0
+    elif isinstance(value, univ.Integer):
+        n = int(value)
+        # Unsigned types may need a leading zero byte; bit_length // 8 + 1 covers it
+        length = ((n if n >= 0 else ~n).bit_length() // 8) + 1
+    elif isinstance(value, univ.OctetString):
+        length = len(value)
+    elif isinstance(value, univ.ObjectIdentifier):
+        length = _oid_content_size(tuple(value))
+    else:
+        length = len(encoder.encode(value)) - 2
+    size += length + _ber_header(length)
+
+    # Margin for encoder slack, e.g. pyasn1 spends an extra byte on some negative integers
+    return size + _ber_header(size) + VARBIND_SIZE_MARGIN
+
+class BulkCommandResponder(cmdrsp.BulkCommandResponder):
+    """
+    GETBULK responder that hands the whole request to MockController so the
+    response is built from the sorted index in one pass, sized to the
+    manager's maximum response PDU instead of a fixed varbind count.
+    """
+
+    def __init__(self, snmpEngine, snmpContext, cbCtx=None):
+        super().__init__(snmpEngine, snmpContext, cbCtx)
+        self._max_sizes = {}
+
+    def process_pdu(self, snmpEngine, messageProcessingModel, securityModel, securityName,
+                    securityLevel, contextEngineId, contextName, pduVersion, PDU,
+                    maxSizeResponseScopedPDU, stateReference):
+        self._max_sizes[stateReference] = int(maxSizeResponseScopedPDU)
+        try:
+            super().process_pdu(snmpEngine, messageProcessingModel, securityModel, securityName,
+                                securityLevel, contextEngineId, contextName, pduVersion, PDU,
+                                maxSizeResponseScopedPDU, stateReference)
+        finally:
+            self._max_sizes.pop(stateReference, None)
+
+    def handle_management_operation(self, snmpEngine, stateReference, contextName, PDU):
+        non_repeaters = int(v2c.apiBulkPDU.get_non_repeaters(PDU))
+        max_repetitions = int(v2c.apiBulkPDU.get_max_repetitions(PDU))
+        var_binds = v2c.apiPDU.get_varbinds(PDU)
+
+        controller = self.snmpContext.get_mib_instrum(contextName)
+        max_size = self._max_sizes.get(stateReference, 65507)
+
+        rsp = controller.read_bulk_variables(non_repeaters, max_repetitions, var_binds, max_size=max_size)
+
+        self.send_varbinds(snmpEngine, stateReference, 0, 0, rsp)
+        self.release_state_information(stateReference)
+
 def load_custom_data(path):
     if os.path.exists(path):
         try:
@@ -110,9 +1221,104 @@ def load_custom_data(path):
             return {}
     return {}
 
-def compile_and_generate_data(mib_dir, custom_data_path):
-    mibBuilder = builder.MibBuilder()
+def load_table_config(path):
+    """(default_rows, {"MODULE::table" or "table": rows}) from the table config file"""
+    config = load_custom_data(path) if path else {}
+    return config.get("default_rows"), config.get("tables", {})
+
+def build_table_columns(mib_symbols, columns, generator, default_rows, table_rows, behaviors=None):
+    """
+    VirtualColumns for (module, name, MibTableColumn) entries. Row counts
+    come from `table_rows` (by "MODULE::table" or "table"), then from the
+    table this one AUGMENTS, then `default_rows`. Columns with a dynamic
+    behavior (see ValueBehaviors) take their values from it.
+    """
+    rows_by_oid = {}
+    tables_by_oid = {}
+    for module_name, symbols in mib_symbols.items():
+        for symbol_name, symbol_obj in symbols.items():
+            kind = symbol_obj.__class__.__name__
+            if kind == 'MibTableRow':
+                rows_by_oid[tuple(symbol_obj.name)] = symbol_obj
+            elif kind == 'MibTable':
+                tables_by_oid[tuple(symbol_obj.name)] = (module_name, symbol_name)
+
+    def configured_rows(entry_oid):
+        module_name, table_name = tables_by_oid.get(entry_oid[:-1], ("", ""))
+        for key in (f"{module_name}::{table_name}", table_name):
+            if key in table_rows:
+                return int(table_rows[key])
+        return None
+
+    # Augmenting rows follow the row count of the table they extend
+    augmented_by = {}
+    for entry_oid, row_obj in rows_by_oid.items():
+        for module_name, symbol_name in getattr(row_obj, 'augmentingRows', {}):
+            augmenting = mib_symbols.get(module_name, {}).get(symbol_name)
+            if augmenting is not None:
+                augmented_by[tuple(augmenting.name)] = entry_oid
+
+    def row_count(entry_oid):
+        rows = configured_rows(entry_oid)
+        if rows is None and entry_oid in augmented_by:
+            rows = configured_rows(augmented_by[entry_oid])
+        return default_rows if rows is None else rows
+
+    salt = random.getrandbits(64)
+    indexes = {}
+    virtual = []
+    for module_name, symbol_name, symbol_obj in columns:
+        column_oid = tuple(symbol_obj.name)
+        entry_oid = column_oid[:-1]
+        rows = row_count(entry_oid)
+        if rows <= 0:
+            continue
+
+        if entry_oid not in indexes:
+            components, index_names = [], []
+            row_obj = rows_by_oid.get(entry_oid)
+            for implied, index_module, index_name in (row_obj.getIndexNames() if row_obj else ()):
+                index_obj = mib_symbols.get(index_module, {}).get(index_name)
+                if index_obj is None or not hasattr(index_obj, 'getSyntax'):
+                    continue
+                components.append(index_component(index_obj.getSyntax(), implied, rows))
+                index_names.append((index_module, index_name))
+            indexes[entry_oid] = (TableIndex(components), index_names)
+
+        index, index_names = indexes[entry_oid]
+        if rows > index.max_rows:
+            logger.warning(f"{module_name}::{symbol_name}: {rows} rows requested, INDEX allows {index.max_rows}")
+            rows = index.max_rows
+
+        syntax = symbol_obj.getSyntax()
+        index_value = None
+        if (module_name, symbol_name) in index_names:
+            component = index.components[index_names.index((module_name, symbol_name))]
+            index_value = index_column_value(generator, syntax, component)
+
+        source = None
+        if index_value is None and behaviors is not None:
+            source = behaviors.source_for(module_name, symbol_name, syntax)
 
+        virtual.append(VirtualColumn(
+            column_oid, rows, index, source or generator.source_for(syntax),
+            mix_seed(salt, zlib.crc32(repr(column_oid).encode())), index_value
+        ))
+
+    return virtual
+
+def index_column_value(generator, syntax, component):
+    """row -> value of a column that is itself part of the INDEX"""
+    def value(row):
+        raw = component.value(row)
+        try:
+            return syntax.clone(raw)
+        except Exception:
+            return generator.get_value(syntax, raw)
+    return value
+
+def load_mibs(mib_dir):
+    """Compile (through the shared cache) and load every MIB in mib_dir, skipping failures"""
     sources = [
         f'file://{os.path.abspath(mib_dir)}',
         f'file://{SYSTEM_MIB_DIR}',
@@ -120,18 +1326,24 @@ def compile_and_generate_data(mib_dir, custom_data_path):
         f'file://{SYSTEM_MIB_DIR}/iana'
     ]
     
-    compiler.add_mib_compiler(mibBuilder, sources=sources)
+    mib_cache = MibCache()
+    mibBuilder = mib_cache.create_builder(sources)
     
     # Load MIBs one by one, skip failures
     mibs_to_load = []
+    mib_files = {}
     if os.path.exists(mib_dir):
         for f in os.listdir(mib_dir):
             if f.endswith(".mib") or f.endswith(".my") or f.endswith(".txt"):
                 mibs_to_load.append(f.split('.')[0])
+                # Cache manifest keys are MibService's module names, so both loaders agree on them
+                mib_files[f.rsplit('.', 1)[0]] = os.path.join(mib_dir, f)
     
     if not mibs_to_load:
         logger.warning(f"No MIBs found in {mib_dir}")
     else:
+        mib_cache.sync(mib_files)
+
         # Load MIBs individually to skip failures
         loaded_count = 0
         for mib_name in mibs_to_load:
@@ -144,90 +1356,794 @@ def compile_and_generate_data(mib_dir, custom_data_path):
         
         logger.info(f"Loaded {loaded_count}/{len(mibs_to_load)} MIBs")
 
-    custom_data = load_custom_data(custom_data_path)
-    generator = MibDataGenerator()
+    return mibBuilder
+
+def is_served(symbol_obj):
+    """Whether generated instances of this object are exposed"""
+    if HIDE_DEPRECATED and hasattr(symbol_obj, 'getStatus'):
+        if symbol_obj.getStatus() in ['deprecated', 'obsolete']:
+            return False
+    
+    if HIDE_NOT_ACCESSIBLE and hasattr(symbol_obj, 'getMaxAccess'):
+        if symbol_obj.getMaxAccess() == 'not-accessible':
+            return False
+    return True
+
+def resolve_custom_key(mib_symbols, key):
+    """(oid, symbol) for a custom data key "MODULE::object.index", or None"""
+    if "::" not in key or "." not in key:
+        return None
+    try:
+        module_obj_part, index_part = key.split(".", 1)
+        module_name, obj_name = module_obj_part.split("::")
+        index_tuple = tuple(int(x) for x in index_part.split("."))
+    except ValueError:
+        return None
+
+    symbol_obj = mib_symbols.get(module_name, {}).get(obj_name)
+    if symbol_obj is None or not hasattr(symbol_obj, 'getSyntax'):
+        return None
+
+    if HIDE_NOT_ACCESSIBLE and hasattr(symbol_obj, 'getMaxAccess'):
+        if symbol_obj.getMaxAccess() == 'not-accessible':
+            return None
+
+    return tuple(symbol_obj.name) + index_tuple, symbol_obj
+
+def generate_data(mib_symbols, custom_data, generator, default_rows=2, table_rows=None, behaviors=None):
+    """(static store, virtual table columns) for the loaded MIB symbols"""
     data_store = {}
+    table_columns = []
+    pending = {}  # random-valued instances, grouped by value source and generated in one batch each
     
-    if hasattr(mibBuilder, 'mibSymbols'):
-        for module_name, symbols in mibBuilder.mibSymbols.items():
-            for symbol_name, symbol_obj in symbols.items():
-                if not hasattr(symbol_obj, 'name') or not hasattr(symbol_obj, 'getSyntax'):
-                    continue
+    for module_name, symbols in mib_symbols.items():
+        for symbol_name, symbol_obj in symbols.items():
+            if not hasattr(symbol_obj, 'name') or not hasattr(symbol_obj, 'getSyntax'):
+                continue
 
-                if HIDE_DEPRECATED and hasattr(symbol_obj, 'getStatus'):
-                    if symbol_obj.getStatus() in ['deprecated', 'obsolete']:
-                        continue
-                
-                if HIDE_NOT_ACCESSIBLE and hasattr(symbol_obj, 'getMaxAccess'):
-                    if symbol_obj.getMaxAccess() == 'not-accessible':
-                        continue
+            if not is_served(symbol_obj):
+                continue
 
-                base_oid = tuple(symbol_obj.name)
-                
-                if symbol_obj.__class__.__name__ == 'MibScalar':
-                    key_str = f"{module_name}::{symbol_name}.0"
-                    val = generator.get_value(symbol_obj.getSyntax(), custom_data.get(key_str))
-                    data_store[base_oid + (0,)] = val
-                
-                elif symbol_obj.__class__.__name__ == 'MibTableColumn':
-                    for i in [1, 2]:
-                        key_str = f"{module_name}::{symbol_name}.{i}"
-                        val = generator.get_value(symbol_obj.getSyntax(), custom_data.get(key_str))
-                        data_store[base_oid + (i,)] = val
+            base_oid = tuple(symbol_obj.name)
+            
+            if symbol_obj.__class__.__name__ == 'MibScalar':
+                custom_val = custom_data.get(f"{module_name}::{symbol_name}.0")
+                source = behaviors.source_for(module_name, symbol_name, symbol_obj.getSyntax()) if behaviors else None
+                if custom_val is not None:
+                    data_store[base_oid + (0,)] = generator.get_value(symbol_obj.getSyntax(), custom_val)
+                elif source is not None:
+                    data_store[base_oid + (0,)] = behaviors.dynamic(source, base_oid + (0,))
+                else:
+                    pending.setdefault(generator.source_for(symbol_obj.getSyntax()), []).append(base_oid + (0,))
+            
+            elif symbol_obj.__class__.__name__ == 'MibTableColumn':
+                # Rows are produced on demand; custom rows are injected below
+                table_columns.append((module_name, symbol_name, symbol_obj))
+
+    for source, oids in pending.items():
+        data_store.update(zip(oids, source.batch(len(oids))))
 
     # Inject Custom Rows
     for key, val in custom_data.items():
-        if "::" not in key or "." not in key: continue
+        resolved = resolve_custom_key(mib_symbols, key)
+        if resolved:
+            oid, symbol_obj = resolved
+            data_store[oid] = generator.get_value(symbol_obj.getSyntax(), val)
+
+    if behaviors is not None:
+        data_store.update(behaviors.instance_values(mib_symbols))
+        uptime = behaviors.uptime_value()
+        if uptime is not None:
+            data_store.setdefault(SYS_UPTIME_OID, uptime)
+
+    columns = build_table_columns(mib_symbols, table_columns, generator, default_rows, table_rows or {}, behaviors)
+    virtual_count = sum(c.rows for c in columns)
+
+    logger.info(f"Generated {len(data_store)} OID instances, {virtual_count} more on demand in {len(columns)} table columns.")
+    return data_store, columns
+
+def compile_and_generate_data(mib_dir, custom_data_path, tables_path=None, default_rows=2, behaviors_path=None):
+    mibBuilder = load_mibs(mib_dir)
+    config_default_rows, table_rows = load_table_config(tables_path)
+    if config_default_rows is not None:
+        default_rows = int(config_default_rows)
+
+    generator = MibDataGenerator()
+    behaviors = ValueBehaviors(load_custom_data(behaviors_path) if behaviors_path else {}, generator)
+    return generate_data(
+        getattr(mibBuilder, 'mibSymbols', {}), load_custom_data(custom_data_path),
+        generator, default_rows, table_rows, behaviors
+    )
+
+# ==================== Live Reload ====================
+
+def read_json_file(path, default):
+    """Like load_custom_data, but a present yet unreadable file is an error, not "empty" """
+    if not path or not os.path.exists(path):
+        return default
+    with open(path, 'r') as f:
+        return json.load(f)
+
+# Part of the snapshot fingerprint: bump when the generated store or the file layout changes
+SNAPSHOT_VERSION = 1
+
+def file_digest(path):
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class SimulatorState:
+    """
+    Everything the running simulator serves, plus what it needs to change
+    it in place: the loaded MIB symbols, the generator and the custom data
+    currently applied. Changes go straight into the MockController.
+
+    With a `snapshot_path` the static store is served from a snapshot
+    file (see SnapshotStore), rewritten whenever the store is rebuilt.
+    Custom data changes are served as live edits over it and reach the
+    file at the next start. If the snapshot on disk was made from the
+    same MIB files, custom data and behaviors, start-up serves it at once
+    and compiles the MIBs for the table columns in the background
+    (finish_load).
+    """
+
+    def __init__(self, mib_dir, data_path, tables_path=None, default_rows=2, behaviors_path=None,
+                 snapshot_path=None):
+        self.mib_dir = mib_dir
+        self.data_path = data_path
+        self.tables_path = tables_path
+        self.behaviors_path = behaviors_path
+        self.default_rows = default_rows
+
+        self.mib_symbols = {}
+        self.custom_data = {}
+        self.generator = MibDataGenerator()
+        self.behaviors = ValueBehaviors({}, self.generator)
+        self.controller = None
+        self.agents = 0
+        self.agent_salt = random.getrandbits(64)
+        self.workers = 1
+
+        self.snapshot_path = snapshot_path
+        self.worker = False     # workers open the snapshots the parent writes
+        self.pending = False    # started from a snapshot, MIBs not loaded yet
+        self.loading = None     # the finish_load task
+        self.load_seed = random.getrandbits(64)
+        self._lock = None
+
+    @property
+    def lock(self):
+        """Held while a data change runs, so changes apply one at a time (created inside the running loop)"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    @property
+    def custom_data(self):
+        """The custom data applied, kept as JSON text (a fraction of the dict) and parsed when needed"""
+        return json.loads(self._custom_json)
+
+    @custom_data.setter
+    def custom_data(self, data):
+        self._custom_json = json.dumps(data)
+        self.custom_entries = len(data)
+
+    def _table_config(self):
+        config = read_json_file(self.tables_path, {})
+        default_rows = config.get("default_rows")
+        return (self.default_rows if default_rows is None else int(default_rows)), config.get("tables", {})
+
+    def build(self):
+        """
+        Compile MIBs and generate the store with a generator of its own, so
+        it can run in a worker thread. Returns (symbols, custom data,
+        generator, behaviors, store, columns).
+        """
+        mib_symbols = getattr(load_mibs(self.mib_dir), 'mibSymbols', {})
+        custom_data = load_custom_data(self.data_path)
+        default_rows, table_rows = self._table_config()
+        generator = MibDataGenerator()
+        behaviors = ValueBehaviors(load_custom_data(self.behaviors_path) if self.behaviors_path else {}, generator)
+        data_store, columns = generate_data(mib_symbols, custom_data, generator, default_rows, table_rows, behaviors)
+        return mib_symbols, custom_data, generator, behaviors, data_store, columns
+
+    def _fingerprint(self):
+        """What the static store is generated from (table sizes only affect the columns)"""
+        mibs = []
+        if os.path.isdir(self.mib_dir):
+            for name in sorted(os.listdir(self.mib_dir)):
+                st = os.stat(os.path.join(self.mib_dir, name))
+                mibs.append([name, st.st_size, st.st_mtime_ns])
+        return {
+            "version": SNAPSHOT_VERSION,
+            "mibs": mibs,
+            "custom_data": file_digest(self.data_path),
+            "behaviors": file_digest(self.behaviors_path)
+        }
+
+    def _snapshot(self, data_store):
+        """
+        The store to serve for a freshly built one: its snapshot, if
+        snapshots are on. Workers build the same store from the parent's
+        seed, after the parent, and open the file it wrote.
+        """
+        if not self.snapshot_path:
+            return data_store
+        fingerprint = self._fingerprint()
+        if not self.worker:
+            try:
+                write_snapshot(self.snapshot_path, data_store, fingerprint, {"custom_entries": self.custom_entries})
+            except OSError as e:
+                logger.warning(f"Cannot write snapshot {self.snapshot_path}: {e}")
+                return data_store
+        store = SnapshotStore.open(self.snapshot_path, fingerprint)
+        if store is None or len(store) != len(data_store):
+            return data_store
+        return store
+
+    def load(self):
+        if self.snapshot_path:
+            store = SnapshotStore.open(self.snapshot_path, self._fingerprint())
+            if store is not None:
+                logger.info(f"Serving {len(store)} OID instances from snapshot {self.snapshot_path}")
+                # The snapshot was made from this very file (unreadable counts as empty), no need to parse it now
+                self.custom_entries = store.info.get("custom_entries", 0)
+                if self.custom_entries:
+                    with open(self.data_path, 'r') as f:
+                        self._custom_json = f.read()
+                self.controller = MockController(store)
+                self.pending = True
+                return self.controller
+
+        self.mib_symbols, self.custom_data, self.generator, self.behaviors, data_store, columns = self.build()
+        self.controller = MockController(self._snapshot(data_store), columns)
+        return self.controller
+
+    def _build_columns(self):
+        """build() for a store already served from the snapshot: (symbols, generator, behaviors, columns)"""
+        # Workers get the same table values as the parent
+        random.seed(self.load_seed)
+        mib_symbols = getattr(load_mibs(self.mib_dir), 'mibSymbols', {})
+        generator = MibDataGenerator()
+        behaviors = ValueBehaviors(load_custom_data(self.behaviors_path) if self.behaviors_path else {}, generator)
+        columns = self._table_columns(mib_symbols, generator, behaviors)
+        return mib_symbols, generator, behaviors, columns
+
+    async def finish_load(self):
+        """Compile the MIBs off the event loop and add the table columns to the snapshot being served"""
         try:
-            module_obj_part, index_part = key.split(".", 1)
-            module_name, obj_name = module_obj_part.split("::")
-            index_tuple = tuple(int(x) for x in index_part.split("."))
-            
-            if module_name in mibBuilder.mibSymbols and obj_name in mibBuilder.mibSymbols[module_name]:
-                symbol_obj = mibBuilder.mibSymbols[module_name][obj_name]
-                base_oid = tuple(symbol_obj.name)
-                
-                if HIDE_NOT_ACCESSIBLE and hasattr(symbol_obj, 'getMaxAccess'):
-                    if symbol_obj.getMaxAccess() == 'not-accessible':
-                        continue
+            built = await asyncio.get_running_loop().run_in_executor(None, self._build_columns)
+        except Exception as e:
+            logger.error(f"Loading MIBs failed, serving the snapshot only: {e}")
+            return
+        finally:
+            self.pending = False
+        self.mib_symbols, self.generator, self.behaviors, columns = built
+        self.controller.replace(self.controller.db, columns)
+        logger.info(f"MIBs loaded, {sum(c.rows for c in columns)} instances on demand in {len(columns)} table columns")
 
-                snmp_val = generator.get_value(symbol_obj.getSyntax(), val)
-                data_store[base_oid + index_tuple] = snmp_val
-        except Exception:
+    async def reload(self):
+        """Recompile everything off the event loop, then swap it in; the old data is served meanwhile"""
+        loop = asyncio.get_running_loop()
+        built = await loop.run_in_executor(None, self.build)
+        self.mib_symbols, self.custom_data, self.generator, self.behaviors, data_store, columns = built
+        store = await loop.run_in_executor(None, self._snapshot, data_store)
+        self.controller.replace(store, columns)
+        return {"instances": len(store), "columns": len(columns)}
+
+    def _generate_with_behaviors(self):
+        behaviors = ValueBehaviors(read_json_file(self.behaviors_path, {}), self.generator)
+        default_rows, table_rows = self._table_config()
+        data_store, columns = generate_data(
+            self.mib_symbols, self.custom_data, self.generator, default_rows, table_rows, behaviors
+        )
+        return behaviors, self._snapshot(data_store), columns
+
+    async def apply_behaviors(self):
+        """Regenerate the store from the loaded MIBs with the current behaviors config, off the event loop"""
+        behaviors, store, columns = await asyncio.get_running_loop().run_in_executor(
+            None, self._generate_with_behaviors
+        )
+        self.behaviors = behaviors
+        self.controller.replace(store, columns)
+        return {"instances": len(store), "columns": len(columns)}
+
+    def _custom_data_changes(self):
+        """
+        Diff the data file against the custom data applied. Returns the
+        file's text (kept as the custom data), its entry count, {oid: value
+        or REMOVED} and the numbers of keys set and removed.
+        """
+        custom_json = "{}"
+        if self.data_path and os.path.exists(self.data_path):
+            with open(self.data_path, 'r') as f:
+                custom_json = f.read()
+        new = json.loads(custom_json)
+        old = self.custom_data
+        changes = {}
+
+        for key in old.keys() - new.keys():
+            resolved = resolve_custom_key(self.mib_symbols, key)
+            if not resolved:
+                continue
+            oid, symbol_obj = resolved
+            if (symbol_obj.__class__.__name__ == 'MibScalar' and oid == tuple(symbol_obj.name) + (0,)
+                    and is_served(symbol_obj)):
+                # Back to a generated value
+                module_name, obj_name = key.split(".", 1)[0].split("::")
+                source = self.behaviors.source_for(module_name, obj_name, symbol_obj.getSyntax())
+                if source is not None:
+                    changes[oid] = self.behaviors.dynamic(source, oid)
+                else:
+                    changes[oid] = self.generator.get_value(symbol_obj.getSyntax())
+            else:
+                # Custom row removed; a generated table row at this OID shows through again
+                changes[oid] = REMOVED
+        removed = len(changes)
+
+        for key, val in new.items():
+            if key in old and old[key] == val:
+                continue
+            resolved = resolve_custom_key(self.mib_symbols, key)
+            if resolved:
+                oid, symbol_obj = resolved
+                changes[oid] = self.generator.get_value(symbol_obj.getSyntax(), val)
+        updated = len(changes) - removed
+
+        # Per-instance behaviors still take precedence
+        for oid, value in self.behaviors.instance_values(self.mib_symbols):
+            if oid in changes:
+                changes[oid] = value
+
+        return custom_json, len(new), changes, updated, removed
+
+    async def apply_custom_data(self):
+        """Apply the difference between the data file and what is served now"""
+        custom_json, entries, changes, updated, removed = await asyncio.get_running_loop().run_in_executor(
+            None, self._custom_data_changes
+        )
+
+        # Only the changes touch the controller, on the event loop, between requests
+        controller = self.controller
+        for oid, value in changes.items():
+            if value is REMOVED:
+                controller.remove(oid)
+            else:
+                controller.set(oid, value)
+
+        # A snapshot being served keeps these as live edits; the changed data file makes the next start rewrite it
+        self._custom_json, self.custom_entries = custom_json, entries
+        logger.info(f"Custom data applied: {updated} set, {removed} removed")
+        return {"updated": updated, "removed": removed}
+
+    def _table_columns(self, mib_symbols, generator, behaviors):
+        default_rows, table_rows = self._table_config()
+        table_columns = [
+            (module_name, symbol_name, symbol_obj)
+            for module_name, symbols in mib_symbols.items()
+            for symbol_name, symbol_obj in symbols.items()
+            if symbol_obj.__class__.__name__ == 'MibTableColumn' and is_served(symbol_obj)
+        ]
+        return build_table_columns(mib_symbols, table_columns, generator, default_rows, table_rows, behaviors)
+
+    async def apply_tables(self):
+        """Rebuild the virtual table columns from the table config, off the event loop"""
+        columns = await asyncio.get_running_loop().run_in_executor(
+            None, self._table_columns, self.mib_symbols, self.generator, self.behaviors
+        )
+        self.controller.replace(self.controller.db, columns)
+        return {"columns": len(columns), "rows": sum(c.rows for c in columns)}
+
+    def status(self):
+        controller = self.controller
+        return {
+            "instances": controller.instances,
+            "columns": len(controller.columns),
+            "virtual_instances": sum(c.rows for c in controller.columns),
+            "custom_entries": self.custom_entries,
+            "agents": self.agents,
+            "workers": self.workers,
+            "store": "snapshot" if controller.db.__class__ is SnapshotStore else "memory",
+            "live_edits": len(controller.edits),
+            "loading_mibs": self.pending,
+            "uptime": round(elapsed(), 2)
+        }
+
+# Commands that change data; workers repeat them with the parent's random seed
+RELAYED_OPS = ("custom_data", "tables", "behaviors", "reload")
+
+async def execute(state, msg):
+    """
+    Run one control command against this process's state. Returns its
+    result, or None for an unknown op. Callers run relayed ops one at a
+    time: the control server under state.lock, workers in arrival order.
+    """
+    op = msg.get("op")
+    if op in RELAYED_OPS and state.loading is not None:
+        # Data changes need the MIBs an instant start is still loading
+        await state.loading
+    if "seed" in msg:
+        # Generated values come out the same in every worker
+        random.seed(msg["seed"])
+
+    if op == "custom_data":
+        return await state.apply_custom_data()
+    if op == "tables":
+        return await state.apply_tables()
+    if op == "behaviors":
+        return await state.apply_behaviors()
+    if op == "reload":
+        return await state.reload()
+    if op == "status":
+        return state.status()
+    if op == "stats":
+        return dict(request_stats.to_dict(), pid=os.getpid())
+    return None
+
+def aggregate_stats(per_worker):
+    totals = {name: sum(w[name] for w in per_worker) for name in RequestStats.__slots__}
+    return dict(totals, workers=per_worker)
+
+class ControlServer:
+    """
+    Loopback control channel of a running simulator. One JSON command per
+    line ({"op": "custom_data" | "tables" | "behaviors" | "reload" |
+    "status" | "stats"}), one JSON reply per line. Data changes run one
+    at a time; their heavy part (compiling, generating, diffing) runs in a
+    thread, and only swapping the result in happens on the event loop,
+    between SNMP requests. With worker processes, data changes and
+    "stats" are passed on to every worker.
+    """
+
+    def __init__(self, state, port, workers=()):
+        self.state = state
+        self.port = port
+        self.workers = list(workers)
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+        logger.info(f"Control channel on 127.0.0.1:{self.port}")
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self._dispatch(line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
             pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, line):
+        try:
+            msg = json.loads(line)
+            op = msg.get("op")
+            if op in RELAYED_OPS:
+                # A change arriving while another runs (a reload awaiting its build, say) waits for it,
+                # so it applies to what that change swapped in, here and in the workers
+                async with self.state.lock:
+                    if self.state.loading is not None:
+                        await self.state.loading
+                    # Drawn now, so no other change's value generation shares the random stream
+                    msg["seed"] = random.getrandbits(64)
+                    return await self._run(msg, op)
+            return await self._run(msg, op)
+        except Exception as e:
+            logger.warning(f"Control command failed: {e}")
+            return {"status": "error", "error": str(e)}
+
+    async def _run(self, msg, op):
+        result = await execute(self.state, msg)
+        if result is None:
+            return {"status": "error", "error": f"Unknown op: {op}"}
+
+        if self.workers and (op in RELAYED_OPS or op == "stats"):
+            replies = await asyncio.gather(*(worker.request(msg) for worker in self.workers))
+            failed = [r for r in replies if r.get("status") != "ok"]
+            if failed:
+                return {"status": "error", "error": f"{len(failed)} worker(s) failed: {failed[0].get('error')}"}
+            if op == "stats":
+                result = aggregate_stats([result] + [
+                    {k: v for k, v in r.items() if k != "status"} for r in replies
+                ])
+        elif op == "stats":
+            result = aggregate_stats([result])
+
+        return dict(result, status="ok", op=op)
+
+# ==================== Worker Processes ====================
 
-    logger.info(f"Generated {len(data_store)} OID instances.")
-    return data_store
+class WorkerLink:
+    """The parent's end of a worker's command socket"""
 
-async def run_simulator(port, community, mib_dir, data_path):
-    mock_data = compile_and_generate_data(mib_dir, data_path)
+    def __init__(self, pid, sock):
+        self.pid = pid
+        self.sock = sock
+        self._streams = None
+        self._lock = None
+
+    async def request(self, msg):
+        if self._streams is None:
+            self._streams = await asyncio.open_connection(sock=self.sock)
+            self._lock = asyncio.Lock()
+        reader, writer = self._streams
+        async with self._lock:
+            writer.write(json.dumps(msg).encode() + b"\n")
+            await writer.drain()
+            line = await reader.readline()
+        if not line:
+            return {"status": "error", "error": f"worker {self.pid} exited"}
+        return json.loads(line)
+
+async def serve_parent(state, sock):
+    """Worker side: run the commands the parent passes on, until the parent goes away"""
+    reader, writer = await asyncio.open_connection(sock=sock)
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        try:
+            msg = json.loads(line)
+            result = await execute(state, msg)
+            if result is None:
+                reply = {"status": "error", "error": f"Unknown op: {msg.get('op')}"}
+            else:
+                reply = dict(result, status="ok")
+        except Exception as e:
+            reply = {"status": "error", "error": str(e)}
+        writer.write(json.dumps(reply).encode() + b"\n")
+        await writer.drain()
+    writer.close()
+
+def fork_workers(count):
+    """
+    Fork count - 1 workers of the current process. The store built so far
+    is shared copy-on-write. Returns (worker number, links to the workers,
+    socket to the parent): (0, links, None) in the parent.
+    """
+    links = []
+    for number in range(1, count):
+        parent_end, worker_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            for link in links:
+                link.sock.close()
+            return number, [], worker_end
+        worker_end.close()
+        links.append(WorkerLink(pid, parent_end))
+    return 0, links, None
+
+def stop_workers(links):
+    for link in links:
+        try:
+            os.kill(link.pid, signal.SIGTERM)
+            os.waitpid(link.pid, 0)
+        except (ProcessLookupError, ChildProcessError):
+            pass
+
+# ==================== Multiple Agents ====================
+
+def agent_overrides(mib_symbols, generator, agents_config, n):
+    """{oid: value} of agent n: the "template" entries ("{agent}" is replaced by n), then its own "overrides" """
+    entries = {k: str(v).replace("{agent}", str(n)) for k, v in agents_config.get("template", {}).items()}
+    entries.update(agents_config.get("overrides", {}).get(str(n), {}))
+
+    values = {}
+    for key, val in entries.items():
+        resolved = resolve_custom_key(mib_symbols, key)
+        if resolved:
+            oid, symbol_obj = resolved
+            values[oid] = generator.get_value(symbol_obj.getSyntax(), val)
+    return values
+
+def build_agents(state, agents_config):
+    """
+    Controllers of agents 1..count over the simulator's controller: the
+    compiled MIBs, the store and the table columns are shared, each agent
+    only holds its overrides and a salt for its own generated values.
+    """
+    count = int(agents_config.get("count", 0))
+    return [
+        (n, MockController(
+            agent_overrides(state.mib_symbols, state.generator, agents_config, n),
+            base=state.controller, salt=mix_seed(state.agent_salt, n)
+        ))
+        for n in range(1, count + 1)
+    ]
+
+def raise_fd_limit(needed):
+    """One socket per agent: lift the soft open-files limit towards the hard one if it is short"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+def bound_udp_socket(address, port, reuse_port=False):
+    """
+    UDP socket bound with SO_REUSEADDR, so specific addresses can share a
+    port with the wildcard bind, and with SO_REUSEPORT for worker
+    processes, so the kernel spreads requests over their sockets.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((address, port))
+    return sock
+
+class AgentRouter:
+    """
+    Context controller for agents told apart by the transport a request
+    arrived on (port and address modes): each agent's transport has its
+    own domain, read from the request's execution context.
+    """
+
+    def __init__(self, snmpEngine, default):
+        self.snmpEngine = snmpEngine
+        self.default = default
+        self.agents = {}
+
+    def _agent(self):
+        ctx = self.snmpEngine.observer.get_execution_context("rfc3412.receiveMessage:request")
+        return self.agents.get(tuple(ctx["transportDomain"]), self.default)
+
+    def read_variables(self, *var_binds, **kwargs):
+        return self._agent().read_variables(*var_binds, **kwargs)
+
+    def read_next_variables(self, *var_binds, **kwargs):
+        return self._agent().read_next_variables(*var_binds, **kwargs)
+
+    def read_bulk_variables(self, *args, **kwargs):
+        return self._agent().read_bulk_variables(*args, **kwargs)
+
+def serve_agents(snmpEngine, snmpContext, state, agents_config, port, reuse_port=False):
+    """Register the agents of the agents config on the engine. Returns how many were added."""
+    mode = agents_config.get("mode", "port")
+    if mode not in settings.SIM_AGENT_MODES:
+        logger.warning(f"Unknown agents mode {mode!r}, serving agents by port")
+        mode = "port"
+    agents = build_agents(state, agents_config)
+    if not agents:
+        return 0
+
+    if mode == "community":
+        # One community and context per agent, all on the simulator's port
+        prefix = agents_config.get("community_prefix", "agent")
+        config.add_vacm_group(snmpEngine, "sim-agents", 2, "sim-agents")
+        config.add_vacm_access(snmpEngine, "sim-agents", b"", 2, "noAuthNoPriv", "prefix", "sim-agents", "", "")
+        config.add_vacm_view(snmpEngine, "sim-agents", "included", (1, 3, 6), b"")
+        for n, controller in agents:
+            name = f"{prefix}{n}"
+            config.add_v1_system(snmpEngine, f"sim-agent-{n}", name, contextName=name, securityName="sim-agents")
+            snmpContext.register_context_name(v2c.OctetString(name), controller)
+        logger.info(f"Serving {len(agents)} agents as communities {prefix}1..{prefix}{len(agents)}")
+        return len(agents)
+
+    router = AgentRouter(snmpEngine, state.controller)
+    raise_fd_limit(len(agents) + 256)
+    for n, controller in agents:
+        domain = udp.DOMAIN_NAME + (n,)
+        if mode == "address":
+            address = str(ipaddress.ip_address(agents_config.get("base_address", "127.0.1.1")) + n - 1)
+            transport = udp.UdpTransport().open_server_mode(sock=bound_udp_socket(address, port, reuse_port))
+        else:
+            agent_port = int(agents_config.get("base_port", port + 1)) + n - 1
+            if reuse_port:
+                transport = udp.UdpTransport().open_server_mode(sock=bound_udp_socket('0.0.0.0', agent_port, True))
+            else:
+                transport = udp.UdpTransport().open_server_mode(('0.0.0.0', agent_port))
+        config.add_transport(snmpEngine, domain, transport)
+        router.agents[domain] = controller
+
+    snmpContext.unregister_context_name(v2c.OctetString(''))
+    snmpContext.register_context_name(v2c.OctetString(''), router)
+    logger.info(f"Serving {len(agents)} agents by {mode}")
+    return len(agents)
+
+async def run_simulator(state, port, community, control_port=None, agents_config=None, workers=1,
+                        worker_links=(), parent=None):
+    """
+    Serve the loaded `state` on UDP `port`. With workers > 1 this runs in
+    each worker process on its own SO_REUSEPORT socket; the parent (no
+    `parent` socket) also runs the control channel.
+    """
+    agents_config = agents_config or {}
+    reuse_port = workers > 1
     snmpEngine = engine.SnmpEngine()
 
-    config.add_transport(snmpEngine, udp.DOMAIN_NAME, udp.UdpTransport().open_server_mode(('0.0.0.0', port)))
+    if reuse_port or (agents_config.get("count") and agents_config.get("mode") == "address"):
+        # Agents bind the same port on their own addresses; workers share it
+        transport = udp.UdpTransport().open_server_mode(sock=bound_udp_socket('0.0.0.0', port, reuse_port))
+    else:
+        transport = udp.UdpTransport().open_server_mode(('0.0.0.0', port))
+    config.add_transport(snmpEngine, udp.DOMAIN_NAME, transport)
     config.add_v1_system(snmpEngine, 'my-area', community)
     config.add_vacm_user(snmpEngine, 2, 'my-area', 'noAuthNoPriv', (1, 3, 6), (1, 3, 6)) 
 
     snmpContext = context.SnmpContext(snmpEngine)
     snmpContext.unregister_context_name(v2c.OctetString('')) 
-    snmpContext.register_context_name(v2c.OctetString(''), MockController(mock_data))
+    snmpContext.register_context_name(v2c.OctetString(''), state.controller)
 
     cmdrsp.GetCommandResponder(snmpEngine, snmpContext)
     cmdrsp.NextCommandResponder(snmpEngine, snmpContext)
+    BulkCommandResponder(snmpEngine, snmpContext)
+
+    if state.pending:
+        state.loading = asyncio.ensure_future(state.finish_load())
+        if agents_config.get("template") or agents_config.get("overrides"):
+            # Agent overrides resolve against the MIBs
+            await state.loading
+
+    state.agents = serve_agents(snmpEngine, snmpContext, state, agents_config, port, reuse_port)
+    state.workers = workers
+
+    if parent is not None:
+        # Worker: serve until the parent's socket closes
+        await serve_parent(state, parent)
+        return
+
+    if control_port:
+        await ControlServer(state, control_port, worker_links).start()
 
-    logger.info(f"✅ SIMULATOR RUNNING on UDP {port}")
+    logger.info(f"✅ SIMULATOR RUNNING on UDP {port}" + (f" with {workers} workers" if reuse_port else ""))
     
     while True:
         await asyncio.sleep(1)
 
+def main(args):
+    state = SimulatorState(args.mib_dir, args.data_file, args.tables_file, args.table_rows, args.behaviors_file,
+                           args.snapshot_file)
+    state.load()
+    agents_config = load_custom_data(args.agents_file) if args.agents_file else {}
+
+    workers = max(args.workers, 1)
+    if workers > 1 and not (hasattr(os, "fork") and hasattr(socket, "SO_REUSEPORT")):
+        logger.warning("Worker processes need fork and SO_REUSEPORT, running a single process")
+        workers = 1
+    if workers > 1:
+        # Keep the store out of GC passes so workers do not copy its pages
+        gc.freeze()
+
+    number, links, parent = fork_workers(workers)
+    if number:
+        state.worker = True
+        logger.info(f"Worker {number} (pid {os.getpid()}) started")
+    elif links:
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        asyncio.run(run_simulator(state, args.port, args.community, args.control_port, agents_config,
+                                  workers, links, parent))
+    finally:
+        stop_workers(links)
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument("--port", type=int, default=1061)
     parser.add_argument("--community", type=str, default="public")
     parser.add_argument("--mib-dir", type=str, required=True)
     parser.add_argument("--data-file", type=str, required=True)
+    parser.add_argument("--tables-file", type=str, default=None)
+    parser.add_argument("--table-rows", type=int, default=2)
+    parser.add_argument("--control-port", type=int, default=None)
+    parser.add_argument("--behaviors-file", type=str, default=None)
+    parser.add_argument("--agents-file", type=str, default=None)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--snapshot-file", type=str, default=None)
     args = parser.parse_args()
 
     try:
-        asyncio.run(run_simulator(args.port, args.community, args.mib_dir, args.data_file))
+        main(args)
     except KeyboardInterrupt:
         pass
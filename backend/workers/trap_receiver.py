@@ -4,7 +4,9 @@ import logging
 import os
 import sys
 import time
+import signal
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 from pysnmp.entity import engine, config
@@ -13,11 +15,221 @@ from pysnmp.carrier.asyncio.dgram import udp
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from services.trap_log import TrapLog
+from services.trap_store import TrapStore
+from services.trap_stream import TrapPublisher
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("trap_receiver")
 
+STATS_INTERVAL = 60  # seconds between resolution cache stats log lines
+
+class TrapLogWriter:
+    """
+    Write-behind buffer for the JSONL trap log.
+    Records are queued in memory and appended in batches, either when
+    batch_size records are pending or flush_interval seconds have passed
+    since the last flush. The log file stays open between batches. A batch
+    that fails to reach the log is kept and retried on the next flush, with
+    at most max_pending records held (the oldest are dropped beyond that).
+    
+    The active segment is sealed once it exceeds segment_max_bytes or
+    segment_max_age seconds; compression and retention of sealed segments
+    run on a background thread. Each batch written to the log is then
+    inserted into the indexed TrapStore, when one is given, on a writer
+    thread of its own, so an API holding the store's write lock never
+    stalls the receiver. The store is capped at store_max_rows, pruned
+    once another tenth of that many rows has come in.
+    """
+    
+    def __init__(self, path, batch_size=256, flush_interval=1.0, fsync=False,
+                 trap_log=None, segment_max_bytes=0, segment_max_age=0,
+                 store=None, store_max_rows=0, max_pending=0):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        
+        self.trap_log = trap_log or TrapLog(path)
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = segment_max_age
+        self._segment_started = None
+        self._executor = None
+        
+        self.store = store
+        self.store_max_rows = store_max_rows
+        self._store_executor = None
+        self._unpruned = 0
+        
+        self._pending = []
+        self.max_pending = max(self.batch_size, max_pending or self.batch_size * 64)
+        self._retry_at = 0.0
+        self._file = None
+        self._last_flush = time.monotonic()
+        
+        self.records_written = 0
+        self.flushes = 0
+        self.write_errors = 0
+        self.dropped = 0
+        self.segments_sealed = 0
+        self.store_errors = 0
+    
+    def append(self, record: dict):
+        self._pending.append(record)
+        if len(self._pending) >= self.batch_size and time.monotonic() >= self._retry_at:
+            self.flush()
+    
+    def flush_if_due(self):
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        elif self._segment_expired():
+            self.rotate()
+    
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        
+        batch = self._pending
+        self._pending = []
+        lines = [json.dumps(record) for record in batch]
+        
+        try:
+            if self._file is None:
+                self._open_file()
+            
+            self._file.write("\n".join(lines) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            
+            self.records_written += len(batch)
+            self.flushes += 1
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Write Error: {e}")
+            self._close_file()
+            self._requeue(batch)
+            return
+        
+        # The log is the source of truth: only logged traps go to the store
+        if self.store is not None:
+            if self._store_executor is None:
+                # One thread, which also owns the store's SQLite connection
+                self._store_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trap-store")
+            self._store_executor.submit(self._store_batch, batch, lines)
+        
+        if (self.segment_max_bytes and self._file.tell() >= self.segment_max_bytes) or self._segment_expired():
+            self.rotate()
+    
+    def _requeue(self, batch):
+        """Put a batch that failed to reach the log back in front of newer records"""
+        pending = batch + self._pending
+        overflow = len(pending) - self.max_pending
+        if overflow > 0:
+            self.dropped += overflow
+            logger.error(f"Trap log unwritable, dropped {overflow} oldest trap(s)")
+            pending = pending[overflow:]
+        self._pending = pending
+        # Appends wait for the next interval rather than retrying on every trap
+        self._retry_at = time.monotonic() + self.flush_interval
+    
+    def rotate(self):
+        """Seal the active segment and hand it to the background thread"""
+        self._close_file()
+        try:
+            sealed = self.trap_log.seal()
+        except OSError as e:
+            logger.error(f"Failed to seal trap segment: {e}")
+            return
+        
+        self._segment_started = None
+        if sealed:
+            self.segments_sealed += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trap-segments")
+            self._executor.submit(self._finish_segment, sealed)
+    
+    def _store_batch(self, batch, lines):
+        """Insert a batch into the store (writer thread), pruning it every so often"""
+        try:
+            self.store.insert_many(zip(batch, lines))
+            self._unpruned += len(batch)
+            if self.store_max_rows and self._unpruned >= max(1, self.store_max_rows // 10):
+                self.store.prune(self.store_max_rows)
+                self._unpruned = 0
+        except Exception as e:
+            self.store_errors += 1
+            logger.error(f"Trap store error: {e}")
+    
+    def _close_store(self):
+        try:
+            if self._unpruned:
+                self.store.prune(self.store_max_rows)
+        except Exception as e:
+            logger.error(f"Trap store error: {e}")
+        self.store.close()
+    
+    def _finish_segment(self, sealed):
+        self.trap_log.compress(sealed)
+        self.trap_log.apply_retention()
+    
+    def close(self):
+        self.flush()
+        self._close_file()
+        if self._store_executor is not None:
+            # Drain queued batches, then prune and close on the thread owning the connection
+            self._store_executor.submit(self._close_store)
+            self._store_executor.shutdown(wait=True)
+            self._store_executor = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def _open_file(self):
+        self._file = open(self.path, "a")
+        if self._segment_started is None:
+            self._segment_started = self._first_record_time() or time.time()
+    
+    def _first_record_time(self):
+        """Timestamp of the first record of an existing active segment"""
+        try:
+            with open(self.path, "r") as f:
+                return float(json.loads(f.readline())["timestamp"])
+        except Exception:
+            return None
+    
+    def _segment_expired(self):
+        return bool(
+            self.segment_max_age
+            and self._segment_started is not None
+            and time.time() - self._segment_started >= self.segment_max_age
+        )
+    
+    def _close_file(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+    
+    def get_stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "records_written": self.records_written,
+            "flushes": self.flushes,
+            "write_errors": self.write_errors,
+            "dropped": self.dropped,
+            "segments_sealed": self.segments_sealed,
+            "store_errors": self.store_errors
+        }
+
 class TrapReceiver:
-    def __init__(self, port, community, mib_dir, output_file, resolve_mibs=True):
+    def __init__(self, port, community, mib_dir, output_file, resolve_mibs=True,
+                 flush_batch=256, flush_interval=1.0, fsync=False, trap_log=None,
+                 segment_max_bytes=0, segment_max_age=0, store=None, store_max_rows=0,
+                 stream_port=0, stats_file=None, stats_interval=5.0):
         self.port = port
         self.community = community
         self.mib_dir = mib_dir
@@ -25,12 +237,26 @@ class TrapReceiver:
         self.resolve_mibs = resolve_mibs
         
         self.snmp_engine = engine.SnmpEngine()
+        self.writer = TrapLogWriter(
+            output_file, flush_batch, flush_interval, fsync,
+            trap_log=trap_log,
+            segment_max_bytes=segment_max_bytes,
+            segment_max_age=segment_max_age,
+            store=store,
+            store_max_rows=store_max_rows
+        )
+        self.publisher = TrapPublisher(stream_port) if stream_port else None
+        self.stats_file = stats_file
+        self.stats_interval = stats_interval
         
         self.mib_service = None
+        self.resolution_cache = None
         if self.resolve_mibs:
             try:
-                from services.mib_service import get_mib_service
+                from core.config import settings
+                from services.mib_service import get_mib_service, ResolutionCache
                 self.mib_service = get_mib_service()
+                self.resolution_cache = ResolutionCache(self.mib_service, settings.TRAP_RESOLVE_CACHE_SIZE)
                 logger.info("MIB resolution enabled")
             except Exception as e:
                 logger.warning(f"Failed to load MIB service: {e}. Resolution disabled.")
@@ -44,11 +270,11 @@ class TrapReceiver:
             "resolved": False
         }
         
-        if not self.resolve_mibs or not self.mib_service:
+        if not self.resolve_mibs or not self.resolution_cache:
             return result
         
         try:
-            symbolic = self.mib_service.resolve_oid(oid_str, mode="name")
+            symbolic = self.resolution_cache.resolve_oid(oid_str, mode="name")
             if symbolic != oid_str:
                 result["symbolic"] = symbolic
                 result["resolved"] = True
@@ -66,9 +292,9 @@ class TrapReceiver:
             if "1.3.6.1.6.3.1.1.4.1.0" in oid or "snmpTrapOID" in name:
                 trap_oid = vb.get("value", "")
                 
-                if self.mib_service and trap_oid:
+                if self.resolution_cache and trap_oid:
                     try:
-                        trap_name = self.mib_service.resolve_oid(trap_oid, mode="name")
+                        trap_name = self.resolution_cache.resolve_oid(trap_oid, mode="name")
                         
                         if "::" in trap_name:
                             parts = trap_name.split("::")
@@ -109,14 +335,10 @@ class TrapReceiver:
         
         trap_record["trap_type"] = self._identify_trap_type(trap_record["varbinds"])
         
-        try:
-            with open(self.output_file, "a") as f:
-                f.write(json.dumps(trap_record) + "\n")
-                f.flush()
-            
-            logger.info(f"✓ Trap received: {trap_record['trap_type']} from {trap_record['source']}")
-        except Exception as e:
-            logger.error(f"Write Error: {e}")
+        self.writer.append(trap_record)
+        if self.publisher:
+            self.publisher.publish(trap_record)
+        logger.info(f"✓ Trap received: {trap_record['trap_type']} from {trap_record['source']}")
     
     async def run(self):
         config.add_transport(
@@ -131,8 +353,66 @@ class TrapReceiver:
         
         logger.info(f"🎧 Trap Receiver listening on UDP {self.port} (Resolution: {'ON' if self.resolve_mibs else 'OFF'})")
         
-        while True:
-            await asyncio.sleep(1)
+        # TrapManager.stop() sends SIGTERM: drain the write buffer before exiting
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        
+        tick = min(1.0, self.writer.flush_interval) if self.writer.flush_interval > 0 else 1.0
+        last_stats = last_snapshot = time.monotonic()
+        last_lookups = 0
+        self._write_stats()
+        try:
+            while not stop_event.is_set():
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=tick)
+                except asyncio.TimeoutError:
+                    pass
+                
+                self.writer.flush_if_due()
+                
+                if self.stats_file and time.monotonic() - last_snapshot >= self.stats_interval:
+                    last_snapshot = time.monotonic()
+                    self._write_stats()
+                
+                if self.resolution_cache and time.monotonic() - last_stats >= STATS_INTERVAL:
+                    last_stats = time.monotonic()
+                    cache_stats = self.resolution_cache.get_stats()
+                    lookups = cache_stats["hits"] + cache_stats["misses"]
+                    if lookups != last_lookups:
+                        last_lookups = lookups
+                        logger.info(f"Resolution cache: {cache_stats}")
+        finally:
+            self.writer.close()
+            self._write_stats()
+            if self.publisher:
+                self.publisher.close()
+            self.snmp_engine.close_dispatcher()
+            logger.info(f"Trap Receiver stopped ({self.writer.records_written} traps persisted)")
+    
+    def get_stats(self) -> dict:
+        """Receiver counters (resolution cache hit/miss/eviction, log writer)"""
+        return {
+            "resolution_cache": self.resolution_cache.get_stats() if self.resolution_cache else None,
+            "writer": self.writer.get_stats(),
+            "stream": {
+                "published": self.publisher.published,
+                "dropped": self.publisher.dropped
+            } if self.publisher else None
+        }
+    
+    def _write_stats(self):
+        """Snapshot get_stats() to stats_file for the API, replacing it atomically"""
+        if not self.stats_file:
+            return
+        tmp = f"{self.stats_file}.tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(dict(self.get_stats(), pid=os.getpid(), updated=time.time()), f)
+            os.replace(tmp, self.stats_file)
+        except OSError as e:
+            logger.warning(f"Failed to write receiver stats: {e}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -141,6 +421,20 @@ if __name__ == "__main__":
     parser.add_argument("--mib-path", type=str, required=True)
     parser.add_argument("--output", type=str, required=True)
     parser.add_argument("--resolve-mibs", type=str, default="true", choices=["true", "false"])
+    parser.add_argument("--flush-batch", type=int, default=256)
+    parser.add_argument("--flush-interval", type=float, default=1.0)
+    parser.add_argument("--fsync", type=str, default="false", choices=["true", "false"])
+    parser.add_argument("--segment-max-bytes", type=int, default=0)
+    parser.add_argument("--segment-max-age", type=int, default=0)
+    parser.add_argument("--compress", type=str, default="none", choices=["none", "gzip", "zstd"])
+    parser.add_argument("--retention-segments", type=int, default=0)
+    parser.add_argument("--retention-bytes", type=int, default=0)
+    parser.add_argument("--retention-age", type=int, default=0)
+    parser.add_argument("--db", type=str, default=None)
+    parser.add_argument("--store-max-rows", type=int, default=0)
+    parser.add_argument("--stream-port", type=int, default=0)
+    parser.add_argument("--stats-file", type=str, default=None)
+    parser.add_argument("--stats-interval", type=float, default=5.0)
     
     args = parser.parse_args()
     
@@ -148,7 +442,28 @@ if __name__ == "__main__":
     
     os.makedirs(os.path.dirname(args.output), exist_ok=True)
     
-    receiver = TrapReceiver(args.port, args.community, args.mib_path, args.output, resolve)
+    trap_log = TrapLog(
+        args.output,
+        compression=args.compress,
+        retention_segments=args.retention_segments,
+        retention_bytes=args.retention_bytes,
+        retention_age=args.retention_age
+    )
+    
+    receiver = TrapReceiver(
+        args.port, args.community, args.mib_path, args.output, resolve,
+        flush_batch=args.flush_batch,
+        flush_interval=args.flush_interval,
+        fsync=args.fsync == "true",
+        trap_log=trap_log,
+        segment_max_bytes=args.segment_max_bytes,
+        segment_max_age=args.segment_max_age,
+        store=TrapStore(args.db) if args.db else None,
+        store_max_rows=args.store_max_rows,
+        stream_port=args.stream_port,
+        stats_file=args.stats_file,
+        stats_interval=args.stats_interval
+    )
     try:
         asyncio.run(receiver.run())
     except KeyboardInterrupt:
@@ -1,13 +1,18 @@
 window.TrapsModule = {
     pollInterval: null,
+    trapPollInterval: null,
+    streamController: null,
+    maxTraps: 50,
     vbCount: 0,
     allTraps: [],
     allObjects: [],
+    receivedTraps: [],
 
     init: function() {
         this.checkStatus();
         this.loadTraps();
-        this.pollInterval = setInterval(() => { this.checkStatus(); this.loadTraps(); }, 3000);
+        this.pollInterval = setInterval(() => this.checkStatus(), 3000);
+        this.startStream();
         
         this.loadTrapList();
         this.loadSelectedTrap();
@@ -15,6 +20,53 @@ window.TrapsModule = {
 
     destroy: function() {
         if (this.pollInterval) clearInterval(this.pollInterval);
+        if (this.trapPollInterval) clearInterval(this.trapPollInterval);
+        this.trapPollInterval = null;
+        if (this.streamController) this.streamController.abort();
+        this.streamController = null;
+    },
+
+    // ==================== Live Trap Stream ====================
+
+    startStream: async function() {
+        const controller = new AbortController();
+        this.streamController = controller;
+        
+        try {
+            const res = await fetch('/api/traps/stream', { signal: controller.signal });
+            if (!res.ok || !res.body) throw new Error(`HTTP ${res.status}`);
+            
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                
+                buffer += decoder.decode(value, { stream: true });
+                const events = buffer.split('\n\n');
+                buffer = events.pop();
+                
+                const traps = events
+                    .map(evt => evt.split('\n').filter(l => l.startsWith('data: ')).map(l => l.slice(6)).join('\n'))
+                    .filter(data => data)
+                    .map(data => JSON.parse(data));
+                
+                if (traps.length) {
+                    this.receivedTraps = traps.reverse().concat(this.receivedTraps).slice(0, this.maxTraps);
+                    this.renderTraps(this.receivedTraps);
+                }
+            }
+        } catch(e) {
+            if (controller.signal.aborted) return;
+            console.warn('Trap stream unavailable, falling back to polling:', e);
+        }
+        
+        // Stream ended or failed while the page is still open
+        if (this.streamController === controller && !this.trapPollInterval) {
+            this.trapPollInterval = setInterval(() => this.loadTraps(), 3000);
+        }
     },
 
     // ==================== Trap List Management ====================
@@ -441,74 +493,77 @@ window.TrapsModule = {
     // ==================== Received Traps Display ====================
 
     loadTraps: async function() {
+        if (!document.getElementById("tr-table-body")) return;
+        
+        try {
+            const res = await fetch(`/api/traps/?limit=${this.maxTraps}`);
+            const json = await res.json();
+            
+            this.receivedTraps = json.data;
+            this.renderTraps(json.data);
+        } catch(e) {
+            console.error('Failed to load traps:', e);
+        }
+    },
+
+    renderTraps: function(traps) {
         const tbody = document.getElementById("tr-table-body");
         const countBadge = document.getElementById("tr-count-badge");
         
         if (!tbody) return;
         
-        try {
-            const res = await fetch('/api/traps/');
-            const json = await res.json();
+        if (traps.length === 0) {
+            tbody.innerHTML = '<tr><td colspan="5" class="text-center text-muted p-3">No traps received.</td></tr>';
+            if (countBadge) countBadge.textContent = '0';
+            return;
+        }
+        
+        if (countBadge) countBadge.textContent = traps.length;
+        
+        tbody.innerHTML = traps.map((t, idx) => {
+            let trapBadgeClass = 'bg-secondary';
+            const trapType = t.trap_type || 'Unknown';
             
-            if (json.data.length === 0) {
-                tbody.innerHTML = '<tr><td colspan="5" class="text-center text-muted p-3">No traps received.</td></tr>';
-                if (countBadge) countBadge.textContent = '0';
-                return;
+            if (trapType.toLowerCase().includes('up') || trapType.toLowerCase().includes('start')) {
+                trapBadgeClass = 'bg-success';
+            } else if (trapType.toLowerCase().includes('down')) {
+                trapBadgeClass = 'bg-danger';
+            } else if (trapType.toLowerCase().includes('auth') || trapType.toLowerCase().includes('fail')) {
+                trapBadgeClass = 'bg-warning text-dark';
             }
             
-            if (countBadge) countBadge.textContent = json.data.length;
-            
-            tbody.innerHTML = json.data.map((t, idx) => {
-                let trapBadgeClass = 'bg-secondary';
-                const trapType = t.trap_type || 'Unknown';
-                
-                if (trapType.toLowerCase().includes('up') || trapType.toLowerCase().includes('start')) {
-                    trapBadgeClass = 'bg-success';
-                } else if (trapType.toLowerCase().includes('down')) {
-                    trapBadgeClass = 'bg-danger';
-                } else if (trapType.toLowerCase().includes('auth') || trapType.toLowerCase().includes('fail')) {
-                    trapBadgeClass = 'bg-warning text-dark';
-                }
-                
-                // Transform varbinds to simple key-value format
-                const simplifiedVarbinds = this.simplifyVarbinds(t.varbinds, t.resolved);
-                const varbindsJson = JSON.stringify(simplifiedVarbinds, null, 2);
-                
-                // Truncate for preview (will be handled by CSS ellipsis)
-                const varbindsPreview = varbindsJson.length > 100 
-                    ? varbindsJson.substring(0, 100) + '...' 
-                    : varbindsJson;
-                
-                return `
-                    <tr>
-                        <td class="small text-muted">${t.time_str}</td>
-                        <td><code class="small">${t.source}</code></td>
-                        <td>
-                            <span class="badge ${trapBadgeClass}">${trapType}</span>
-                        </td>
-                        <td>
-                            <code class="small" style="cursor: pointer;" onclick="TrapsModule.showTrapDetails(${idx})" title="Click to view full JSON">
-                                ${varbindsPreview}
-                            </code>
-                        </td>
-                        <td class="text-center">
-                            <button class="btn btn-sm btn-outline-primary py-0 px-1 me-1" onclick="TrapsModule.copyTrap(${idx})" title="Copy JSON">
-                                <i class="fas fa-copy"></i>
-                            </button>
-                            <button class="btn btn-sm btn-outline-success py-0 px-1" onclick="TrapsModule.downloadTrap(${idx})" title="Download">
-                                <i class="fas fa-download"></i>
-                            </button>
-                        </td>
-                    </tr>
-                `;
-            }).join('');
+            // Transform varbinds to simple key-value format
+            const simplifiedVarbinds = this.simplifyVarbinds(t.varbinds, t.resolved);
+            const varbindsJson = JSON.stringify(simplifiedVarbinds, null, 2);
             
-            // Store traps for actions
-            this.receivedTraps = json.data;
+            // Truncate for preview (will be handled by CSS ellipsis)
+            const varbindsPreview = varbindsJson.length > 100 
+                ? varbindsJson.substring(0, 100) + '...' 
+                : varbindsJson;
             
-        } catch(e) {
-            console.error('Failed to load traps:', e);
-        }
+            return `
+                <tr>
+                    <td class="small text-muted">${t.time_str}</td>
+                    <td><code class="small">${t.source}</code></td>
+                    <td>
+                        <span class="badge ${trapBadgeClass}">${trapType}</span>
+                    </td>
+                    <td>
+                        <code class="small" style="cursor: pointer;" onclick="TrapsModule.showTrapDetails(${idx})" title="Click to view full JSON">
+                            ${varbindsPreview}
+                        </code>
+                    </td>
+                    <td class="text-center">
+                        <button class="btn btn-sm btn-outline-primary py-0 px-1 me-1" onclick="TrapsModule.copyTrap(${idx})" title="Copy JSON">
+                            <i class="fas fa-copy"></i>
+                        </button>
+                        <button class="btn btn-sm btn-outline-success py-0 px-1" onclick="TrapsModule.downloadTrap(${idx})" title="Download">
+                            <i class="fas fa-download"></i>
+                        </button>
+                    </td>
+                </tr>
+            `;
+        }).join('');
     },
 
 